@@ -0,0 +1,118 @@
+"""Full-stack load test of the bot against the fake Bot API and provider simulator.
+
+Builds the real Application with `main.build_application()`, points it at a
+local FakeBotApi, injects synthetic /ip and /start updates and reports the
+latency from update delivery to the bot's first reply:
+
+    PYTHONPATH=src python benchmarks/load.py --updates 2000 --output load.json
+
+With --webhook the bot serves a local webhook and the fake Bot API pushes
+updates to it instead of answering getUpdates.
+
+Settings of the bot are read from the environment as usual, so any option
+(e.g. CACHE_TTL or FETCH_POLICY) can be load-tested by exporting it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from run import SimulatorThread
+
+from ipbot.config import BotConfig
+from ipbot.main import build_application, webhook_options
+from ipbot.testing.bot_api import FakeBotApi
+from ipbot.testing.simulator import ENDPOINTS, EndpointProfile, ProviderSimulator, constant
+
+TOKEN = "123456:load-test"
+OWNER_ID = 1
+
+
+async def run_load(args: argparse.Namespace, provider_urls: dict[str, str]) -> dict[str, float]:
+    """Drive the bot with injected updates and summarize reply latencies."""
+    async with FakeBotApi() as api:
+        os.environ["TELEGRAM_TOKEN"] = TOKEN
+        os.environ["TELEGRAM_OWNER_ID"] = str(OWNER_ID)
+        os.environ["TELEGRAM_BASE_URL"] = api.base_url
+        os.environ["PROVIDER_URLS"] = json.dumps(provider_urls)
+        if args.webhook:
+            os.environ["WEBHOOK_URL"] = f"http://127.0.0.1:{args.webhook_port}/telegram"
+            os.environ["WEBHOOK_LISTEN"] = "127.0.0.1"
+            os.environ["WEBHOOK_PORT"] = str(args.webhook_port)
+            os.environ["WEBHOOK_PATH"] = "telegram"
+        application = build_application()
+        config: BotConfig = application.bot_data["config"]
+
+        # Mirror run_polling() and run_webhook(), which also run the post_* hooks
+        async with application:
+            await application.post_init(application)
+            await application.start()
+            if args.webhook:
+                await application.updater.start_webhook(**webhook_options(config))
+            else:
+                await application.updater.start_polling(poll_interval=0, timeout=1)
+            try:
+                started = time.perf_counter()
+                for i in range(args.updates):
+                    text = "/start" if i % args.start_every == 0 else args.command
+                    api.inject_command(text, user_id=OWNER_ID, chat_id=OWNER_ID + i % args.chats)
+                await api.wait_for_replies(timeout=args.timeout)
+                wall = time.perf_counter() - started
+            finally:
+                await application.updater.stop()
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+        await application.post_shutdown(application)
+
+    latencies = api.latencies()
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "updates": args.updates,
+        "chats": args.chats,
+        "mode": "webhook" if args.webhook else "polling",
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "updates_per_second": round(args.updates / wall, 1),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the bot end to end.")
+    parser.add_argument("--updates", type=int, default=1000, help="updates to inject")
+    parser.add_argument("--chats", type=int, default=1, help="chats the updates are spread over")
+    parser.add_argument("--command", default="/ip fresh", help="command text to inject")
+    parser.add_argument(
+        "--start-every", type=int, default=10, help="every Nth update is /start instead"
+    )
+    parser.add_argument("--webhook", action="store_true", help="push updates to a webhook")
+    parser.add_argument("--webhook-port", type=int, default=8443, help="local webhook port")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency (s)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="give up after (s)")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    profile = EndpointProfile(latency=constant(args.latency))
+    simulator = ProviderSimulator(profiles=dict.fromkeys(ENDPOINTS, profile), seed=0)
+
+    with SimulatorThread(simulator):
+        results = asyncio.run(run_load(args, simulator.urls()))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
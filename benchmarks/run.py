@@ -0,0 +1,316 @@
+"""End-to-end benchmarks of the /ip hot path against the local provider simulator.
+
+Measures latency percentiles, throughput, CPU time and allocations of
+`ParallelFetchOrchestrator.fetch_all` and `ip_command` for several provider
+counts and under concurrent load, and writes them to a JSON baseline:
+
+    PYTHONPATH=src python benchmarks/run.py --output benchmarks/baseline.json
+
+Compare a later run against that baseline to spot regressions:
+
+    PYTHONPATH=src python benchmarks/run.py --compare benchmarks/baseline.json
+
+Baselines depend on the machine, so none is committed; record one first.
+
+Scenarios and the path they measure:
+
+- `fetch_all/...`: the orchestrator's fan-out to every provider, no cache.
+- `ip_command/...`: the whole /ip handler with a fresh fetch per request,
+  including the progressive reply. With `concurrency=N` every caller still
+  runs its own fetch, so this is the fetch hot path under concurrent load.
+- `ip_command/.../coalesced`: concurrent /ip fresh commands sharing one
+  cache, so callers join the fetch in flight (single-flight coalescing).
+
+The simulator runs on its own thread and event loop, so CPU time is that of
+the bot's side only.
+"""
+
+import argparse
+import asyncio
+import datetime
+import functools
+import itertools
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from importlib import metadata
+from pathlib import Path
+from typing import Self
+
+from ipbot.bot import ip_command
+from ipbot.cache import CachedFetchOrchestrator
+from ipbot.config import BotConfig
+from ipbot.factory import create_fetchers
+from ipbot.fetchers.http_pool import HttpClientPool
+from ipbot.metrics import FetchMetrics
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.testing.simulator import ENDPOINTS, EndpointProfile, ProviderSimulator, constant
+
+OWNER_ID = 1
+# Metrics compared against a baseline; higher is worse for all of them
+COMPARED_METRICS = ("p50_ms", "p99_ms", "cpu_ms_per_request", "alloc_kib_per_request")
+
+
+class SimulatorThread:
+    """Runs a ProviderSimulator on a separate thread and event loop."""
+
+    def __init__(self, simulator: ProviderSimulator):
+        self.simulator = simulator
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> ProviderSimulator:
+        self._thread.start()
+        self._started.wait()
+        return self.simulator
+
+    def __exit__(self, *exc_info: object) -> None:
+        asyncio.run_coroutine_threadsafe(self.simulator.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self.simulator.start())
+        self._started.set()
+        self._loop.run_forever()
+
+
+class FakeMessage:
+    """Minimal stand-in for telegram.Message that discards replies."""
+
+    chat_id = OWNER_ID
+    message_id = 1
+
+    async def reply_text(self, text: str) -> Self:
+        return self
+
+    async def edit_text(self, text: str) -> Self:
+        return self
+
+
+class FakeUser:
+    """Minimal stand-in for telegram.User, the authorized owner."""
+
+    id = OWNER_ID
+    username = "benchmark"
+
+
+class FakeUpdate:
+    """Minimal stand-in for telegram.Update with an /ip message from the owner."""
+
+    effective_user = FakeUser()
+    message = FakeMessage()
+
+
+class FakeContext:
+    """Minimal stand-in for the callback context of "/ip fresh"."""
+
+    def __init__(self, orchestrator: CachedFetchOrchestrator, config: BotConfig):
+        self.args = ["fresh"]
+        self.bot_data = {"config": config, "orchestrator": orchestrator}
+
+
+async def ip_command_fresh_fetch(
+    orchestrator: ParallelFetchOrchestrator, config: BotConfig
+) -> None:
+    """Run "/ip fresh" with a cache of its own, so it never joins another request's fetch."""
+    await ip_command(FakeUpdate(), FakeContext(CachedFetchOrchestrator(orchestrator), config))
+
+
+def make_config(providers: int, urls: dict[str, str]) -> BotConfig:
+    """Return a config with `providers` strategies cycling over the simulated endpoints."""
+    names = itertools.islice(itertools.cycle(ENDPOINTS), providers)
+    return BotConfig(
+        telegram_token="benchmark",
+        telegram_owner_id=OWNER_ID,
+        fetcher_strategy_order=",".join(names),
+        provider_urls=urls,
+    )
+
+
+async def measure(
+    call: Callable[[], Awaitable[object]],
+    requests: int,
+    concurrency: int = 1,
+    alloc_requests: int = 20,
+) -> dict[str, float]:
+    """Run `call` repeatedly and summarize its performance.
+
+    Args:
+        call: Starts one request.
+        requests: Number of timed requests.
+        concurrency: Requests in flight at once.
+        alloc_requests: Requests run one at a time under tracemalloc.
+
+    Returns:
+        Latency percentiles, throughput, CPU time and allocation peak.
+    """
+    for _ in range(min(5, requests)):
+        await call()
+    alloc_requests = min(alloc_requests, requests)
+
+    latencies: list[float] = []
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    counts = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    cpu_started = time.thread_time()
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in counts))
+    wall = time.perf_counter() - wall_started
+    cpu = time.thread_time() - cpu_started
+
+    # Allocations are measured in a separate pass, tracemalloc slows everything down
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_requests):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+        "requests_per_second": round(requests / wall, 1),
+        "cpu_ms_per_request": round(cpu / requests * 1000, 3),
+        "alloc_kib_per_request": round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+async def run_scenarios(args: argparse.Namespace, urls: dict[str, str]) -> dict[str, dict]:
+    """Run every scenario against the simulator and return their results by name."""
+    results = {}
+    for providers in args.providers:
+        # Keep the number of provider requests per scenario bounded
+        requests = min(args.requests, max(5, 2000 // providers))
+        pool = HttpClientPool(
+            max_connections=max(20, providers), max_keepalive_connections=max(10, providers)
+        )
+        await pool.start()
+        try:
+            config = make_config(providers, urls)
+            orchestrator = ParallelFetchOrchestrator(
+                create_fetchers(config, pool), metrics=FetchMetrics()
+            )
+            shared = CachedFetchOrchestrator(orchestrator)
+            coalesced = functools.partial(ip_command, FakeUpdate(), FakeContext(shared, config))
+
+            command = functools.partial(ip_command_fresh_fetch, orchestrator, config)
+
+            scenarios = {
+                f"fetch_all/providers={providers}": (orchestrator.fetch_all, 1),
+                f"ip_command/providers={providers}": (command, 1),
+            }
+            if providers == args.load_providers:
+                load = f"providers={providers}/concurrency={args.concurrency}"
+                scenarios[f"fetch_all/{load}"] = (orchestrator.fetch_all, args.concurrency)
+                scenarios[f"ip_command/{load}"] = (command, args.concurrency)
+                scenarios[f"ip_command/{load}/coalesced"] = (coalesced, args.concurrency)
+
+            for name, (call, concurrency) in scenarios.items():
+                results[name] = await measure(call, max(requests, concurrency), concurrency)
+                print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+        finally:
+            await pool.close()
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict, tolerance: float) -> list[str]:
+    """Return the metrics that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, before in baseline["scenarios"].items():
+        after = results.get(name)
+        if after is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if before[metric] > 0 and after[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {before[metric]} -> {after[metric]}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the /ip hot path.")
+    parser.add_argument(
+        "--providers",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 5, 50, 500],
+        help="comma-separated provider counts (default: 1,5,50,500)",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="callers in the load test")
+    parser.add_argument(
+        "--load-providers", type=int, default=5, help="provider count of the load test"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency (s)")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed slowdown vs. baseline (0.2 = 20%%)"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.compare and not args.compare.exists():
+        print(
+            f"Baseline {args.compare} not found; record one on this machine first with "
+            f"--output {args.compare}",
+            file=sys.stderr,
+        )
+        return 2
+    profile = EndpointProfile(latency=constant(args.latency))
+    simulator = ProviderSimulator(profiles=dict.fromkeys(ENDPOINTS, profile), seed=0)
+
+    with SimulatorThread(simulator):
+        results = asyncio.run(run_scenarios(args, simulator.urls()))
+
+    report = {
+        "ipbot_version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "simulated_latency_s": args.latency,
+        "scenarios": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def _version() -> str:
+    """Return the installed ipbot version, or "unknown" when run from a checkout."""
+    try:
+        return metadata.version("ipbot")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Coalescing of stale updates delivered after downtime."""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from telegram import Update
+from telegram.ext import Application, ApplicationHandlerStop, ContextTypes
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop", "latest")
+
+
+class BacklogCoalescer:
+    """Handles updates older than `max_age` before the command handlers see them.
+
+    After a restart or an outage Telegram delivers every command sent in the
+    meantime. With the "drop" policy stale updates are ignored. With the
+    "latest" policy stale updates are collected per chat and command until
+    none has arrived for `settle` seconds; only the latest one is then
+    answered, the others are dropped. Fresh updates pass through unchanged.
+
+    Registered as a handler in a group before the command handlers, e.g.
+    `application.add_handler(TypeHandler(Update, coalescer), group=-1)`.
+    """
+
+    def __init__(
+        self,
+        max_age: float,
+        policy: str = "latest",
+        settle: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the coalescer.
+
+        Args:
+            max_age: Seconds after which an update's message is stale.
+            policy: "drop" or "latest".
+            settle: Seconds without a newer stale update before the latest is answered.
+            clock: Wall clock returning seconds since the epoch, compared to message dates.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in POLICIES:
+            raise ValueError(
+                f"Unknown backlog policy: {policy!r}. Available: {', '.join(POLICIES)}"
+            )
+        self.max_age = max_age
+        self.policy = policy
+        self.settle = settle
+        self.clock = clock
+        self.dropped = 0
+        self._latest: dict[tuple[int, str], Update] = {}
+        self._collected: Counter[tuple[int, str]] = Counter()
+        self._replaying: set[int] = set()
+
+    async def __call__(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Let fresh updates through and hold back or drop stale ones.
+
+        Args:
+            update: The incoming update.
+            context: The callback context of the application.
+
+        Raises:
+            ApplicationHandlerStop: If the update is stale, so no other handler runs for it.
+        """
+        if update.update_id in self._replaying:
+            self._replaying.discard(update.update_id)
+            return
+
+        message = update.message
+        if message is None or not message.text or update.effective_chat is None:
+            return
+        if self.clock() - message.date.timestamp() <= self.max_age:
+            return
+
+        if self.policy == "drop":
+            self.dropped += 1
+            raise ApplicationHandlerStop
+
+        key = (update.effective_chat.id, message.text.split(maxsplit=1)[0])
+        if key in self._latest:
+            self.dropped += 1
+        else:
+            context.application.create_task(
+                self._answer_latest(key, context.application), update=update
+            )
+        self._latest[key] = update
+        self._collected[key] += 1
+        raise ApplicationHandlerStop
+
+    async def _answer_latest(self, key: tuple[int, str], application: Application) -> None:
+        """Wait for the backlog of a chat and command to settle, then answer its latest update.
+
+        The update is put back on the application's update queue, so its update
+        processor keeps the order within the chat and the concurrency limit.
+        """
+        while True:
+            latest = self._latest[key]
+            await asyncio.sleep(self.settle)
+            if self._latest[key] is latest:
+                break
+
+        del self._latest[key]
+        collected = self._collected.pop(key)
+        logger.info(
+            f"Answering stale update {latest.update_id} ({key[1]} in chat {key[0]}), "
+            f"{collected - 1} older ones dropped"
+        )
+        self._replaying.add(latest.update_id)
+        await application.update_queue.put(latest)
@@ -1,13 +1,22 @@
 """Telegram bot command handlers."""
 
 import logging
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any
 
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram import Message, Update
+from telegram.ext import Application, CommandHandler, ContextTypes, TypeHandler
 
-from ipbot.config import BotConfig
+from ipbot.auth import ADMIN, AccessList, AuthorizationFilter
+from ipbot.backlog import BacklogCoalescer
+from ipbot.cache import CachedFetchOrchestrator
 from ipbot.formatter import ResultFormatter
-from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.metrics import FetchMetrics
+from ipbot.monitor import IpMonitor
+from ipbot.rate_limit import RateLimiter
+from ipbot.result import FetcherResult, FetchResult
+from ipbot.send_queue import INTERACTIVE, SendQueue
 
 logger = logging.getLogger(__name__)
 
@@ -21,23 +30,31 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     if not update.effective_user or not update.message:
         return
 
-    config = context.bot_data.get("config")
+    access = _access(context)
 
     # Optional: customize reply for authorized user
-    if config and update.effective_user.id == config.telegram_owner_id:
-        await update.message.reply_text(
+    if access and access.allows(update):
+        text = (
             "👋 Hello! You are authorized to use this bot.\n"
             "Use /ip to get the current public IP address."
         )
     else:
-        await update.message.reply_text("Unauthorized")
+        text = "Unauthorized"
+    message = update.message
+    send_queue: SendQueue | None = context.bot_data.get("send_queue")
+    await _send(send_queue, message.chat_id, partial(message.reply_text, text))
 
 
 async def ip_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle the /ip command.
 
     Fetches the public IP address from all enabled fetchers and sends
-    a formatted result to the user if they are authorized.
+    a formatted result to the user if they are authorized. The result of
+    the background monitor or a recent cached result is used unless the
+    command is sent as "/ip fresh". When a new fetch runs, the reply is sent
+    as soon as the first provider returns an IP and edited as the remaining
+    providers complete. Users over their fetch limit get the last result.
+    With a send queue the replies go ahead of queued notifications.
 
     Args:
         update: The incoming update containing the message.
@@ -47,24 +64,33 @@ async def ip_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     if not update.effective_user or not update.message:
         return
 
-    config: BotConfig = context.bot_data["config"]
-    orchestrator: ParallelFetchOrchestrator = context.bot_data["orchestrator"]
+    orchestrator: CachedFetchOrchestrator = context.bot_data["orchestrator"]
+    message = update.message
+    send_queue: SendQueue | None = context.bot_data.get("send_queue")
 
-    # Check authorization
-    if update.effective_user.id != config.telegram_owner_id:
-        logger.warning(
-            f"Unauthorized access attempt from user {update.effective_user.id} "
-            f"(username: {update.effective_user.username})"
-        )
-        await update.message.reply_text("Unauthorized")
+    # Check authorization, which only rejects anyone if no filter runs before the handlers
+    authorization = _authorization(context)
+    if not authorization or not authorization.filter(update):
+        await _send(send_queue, message.chat_id, partial(message.reply_text, "Unauthorized"))
         return
 
-    # Fetch IP addresses from all fetchers
-    fetch_result = await orchestrator.fetch_all()
-
-    # Format and send result
-    reply_message = ResultFormatter().format(fetch_result)
-    await update.message.reply_text(reply_message)
+    # Answer from the monitored state, from cache, or fetch from all fetchers
+    fresh = any(arg.lower() == "fresh" for arg in context.args or [])
+    monitor: IpMonitor | None = context.bot_data.get("monitor")
+    fetch_result = monitor.get_recent() if monitor and not fresh else None
+    if fetch_result is not None:
+        text = ResultFormatter().format(fetch_result)
+        await _send(send_queue, message.chat_id, partial(message.reply_text, text))
+    elif _over_fetch_limit(update.effective_user.id, context, orchestrator, fresh):
+        fetch_result = orchestrator.last_result
+        if fetch_result is None:
+            text = "⏳ Too many requests, try again later"
+            await _send(send_queue, message.chat_id, partial(message.reply_text, text))
+            return
+        text = ResultFormatter().format_rate_limited(fetch_result)
+        await _send(send_queue, message.chat_id, partial(message.reply_text, text))
+    else:
+        fetch_result = await _reply_progressively(message, orchestrator, fresh, send_queue)
 
     logger.info(
         f"Successfully sent IP result to authorized user {update.effective_user.id} "
@@ -72,12 +98,176 @@ async def ip_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     )
 
 
-def setup_handlers(application: Application) -> None:
+def _over_fetch_limit(
+    user_id: int,
+    context: ContextTypes.DEFAULT_TYPE,
+    orchestrator: CachedFetchOrchestrator,
+    fresh: bool,
+) -> bool:
+    """Take a token from the user's fetch limit if the request starts a fetch.
+
+    Requests answered from cache or by a fetch already in flight are free.
+
+    Returns:
+        True if the request would start a fetch but the user has no tokens left.
+    """
+    limiter: RateLimiter | None = context.bot_data.get("user_limiter")
+    if limiter is None or not orchestrator.starts_fetch(fresh):
+        return False
+    return not limiter.try_acquire(str(user_id))
+
+
+def _access(context: ContextTypes.DEFAULT_TYPE) -> AccessList | None:
+    """Return the access list, by default allowing only the configured owner."""
+    access: AccessList | None = context.bot_data.get("access")
+    if access is None and (config := context.bot_data.get("config")):
+        access = AccessList(config.telegram_owner_id)
+    return access
+
+
+def _authorization(context: ContextTypes.DEFAULT_TYPE) -> AuthorizationFilter | None:
+    """Return the authorization filter, creating one over the access list if needed.
+
+    Rejections are logged by the filter, so they are rate limited whether or
+    not it is installed in front of the handlers.
+    """
+    authorization: AuthorizationFilter | None = context.bot_data.get("authorization")
+    if authorization is None and (access := _access(context)):
+        authorization = AuthorizationFilter(access)
+        context.bot_data["authorization"] = authorization
+    return authorization
+
+
+async def _send(
+    send_queue: SendQueue | None,
+    chat_id: int,
+    call: Callable[[], Awaitable[Any]],
+    key: Hashable | None = None,
+) -> Any:
+    """Make an interactive send through the send queue, or directly without one."""
+    if send_queue is None:
+        return await call()
+    return await send_queue.send(chat_id, call, INTERACTIVE, key)
+
+
+async def _reply_progressively(
+    message: Message,
+    orchestrator: CachedFetchOrchestrator,
+    fresh: bool,
+    send_queue: SendQueue | None = None,
+) -> FetchResult:
+    """Fetch the IP address, replying as soon as the first provider returns one.
+
+    The reply shows the partial state and is edited as more providers
+    complete, ending with the final result. If no provider returns an IP
+    before the fetch ends, only the final result is sent. With a send queue
+    the partial edits are not waited for, and an edit still waiting for the
+    chat's send limit is replaced by the next one.
+
+    Args:
+        message: The message to reply to.
+        orchestrator: The cached orchestrator to fetch from.
+        fresh: Bypass cached results.
+        send_queue: Queue the replies are sent through, None sends directly.
+
+    Returns:
+        The final FetchResult.
+    """
+    formatter = ResultFormatter()
+    completed: list[FetcherResult] = []
+    reply: Message | None = None
+    reply_text = ""
+
+    chat_id = message.chat_id
+
+    async for item in orchestrator.fetch_iter(fresh=fresh):
+        if isinstance(item, FetchResult):
+            final_text = formatter.format(item)
+            if reply is None:
+                await _send(send_queue, chat_id, partial(message.reply_text, final_text))
+            elif final_text != reply_text:
+                edit = partial(reply.edit_text, final_text)
+                await _send(send_queue, chat_id, edit, key=(chat_id, reply.message_id))
+            return item
+
+        completed.append(item)
+        if reply is None and not item.success:
+            continue
+        reply_text = formatter.format_partial(completed)
+        if reply is None:
+            reply = await _send(send_queue, chat_id, partial(message.reply_text, reply_text))
+        elif send_queue is None:
+            await reply.edit_text(reply_text)
+        else:
+            edit = send_queue.submit(
+                chat_id,
+                partial(reply.edit_text, reply_text),
+                INTERACTIVE,
+                key=(chat_id, reply.message_id),
+            )
+            edit.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    raise RuntimeError("Fetch ended without a result")
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle the /stats command.
+
+    Sends latency percentiles and outcome counts for each provider to admins.
+
+    Args:
+        update: The incoming update containing the message.
+        context: The context containing bot_data with config and metrics.
+    """
+    logger.info("stats command called")
+    if not update.effective_user or not update.message:
+        return
+
+    metrics: FetchMetrics = context.bot_data["metrics"]
+
+    access = _access(context)
+    if not access or not access.allows(update, ADMIN):
+        text = "Unauthorized"
+    else:
+        text = ResultFormatter().format_stats(metrics.provider_stats())
+    message = update.message
+    send_queue: SendQueue | None = context.bot_data.get("send_queue")
+    await _send(send_queue, message.chat_id, partial(message.reply_text, text))
+
+
+async def unauthorized_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer a command rejected by the authorization filter.
+
+    Args:
+        update: The incoming update containing the message.
+        context: The callback context with the send queue in bot_data, if any.
+    """
+    message = update.message
+    if message:
+        send_queue: SendQueue | None = context.bot_data.get("send_queue")
+        await _send(send_queue, message.chat_id, partial(message.reply_text, "Unauthorized"))
+
+
+def setup_handlers(
+    application: Application,
+    authorization: AuthorizationFilter | None = None,
+    silent: bool = False,
+    backlog: BacklogCoalescer | None = None,
+) -> None:
     """Register command handlers with the application.
 
     Args:
         application: The Telegram Application instance to register handlers with.
+        authorization: Filter that rejects updates from other users before the
+                       handlers run. Without it each handler checks the user.
+        silent: Drop rejected commands without answering them.
+        backlog: Coalescer of stale updates, run before the command handlers.
     """
-    application.add_handler(CommandHandler("start", start_command))
-    application.add_handler(CommandHandler("ip", ip_command))
-    logger.info("Registered /ip command handler")
+    if backlog is not None:
+        application.add_handler(TypeHandler(Update, backlog), group=-1)
+    commands = {"start": start_command, "ip": ip_command, "stats": stats_command}
+    for command, callback in commands.items():
+        application.add_handler(CommandHandler(command, callback, filters=authorization))
+    if authorization is not None and not silent:
+        application.add_handler(CommandHandler(list(commands), unauthorized_command))
+    logger.info("Registered /ip and /stats command handlers")
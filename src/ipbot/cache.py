@@ -0,0 +1,156 @@
+"""Result cache with single-flight coalescing around the fetch orchestrator."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+
+from ipbot.orchestrator import ParallelFetchOrchestrator, stream_fetch
+from ipbot.result import FetcherResult, FetchResult
+
+logger = logging.getLogger(__name__)
+
+
+class CachedFetchOrchestrator:
+    """Caching layer in front of ParallelFetchOrchestrator.
+
+    Concurrent callers share one in-flight fetch instead of each starting its
+    own fan-out. Results with a consensus IP are served from memory for `ttl`
+    seconds, and for a further `stale_ttl` seconds the last result is returned
+    immediately while a refresh runs in the background.
+    """
+
+    def __init__(
+        self,
+        orchestrator: ParallelFetchOrchestrator,
+        ttl: float = 0.0,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            orchestrator: The orchestrator performing the actual fetches.
+            ttl: Seconds a result is served from cache. 0 disables caching.
+            stale_ttl: Extra seconds a stale result is served while refreshing.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.orchestrator = orchestrator
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._result: FetchResult | None = None
+        self._fetched_at = 0.0
+        self._inflight: asyncio.Task[FetchResult] | None = None
+
+    @property
+    def last_result(self) -> FetchResult | None:
+        """Return the most recently cached result, regardless of age."""
+        return self._result
+
+    def starts_fetch(self, fresh: bool = False) -> bool:
+        """Return True if a call with `fresh` would start a new fetch.
+
+        Calls answered from cache or by the fetch already in flight do not.
+        """
+        if self._inflight is not None:
+            return False
+        if fresh or self._result is None:
+            return True
+        return self._clock() - self._fetched_at > self.ttl + self.stale_ttl
+
+    async def fetch_all(self, fresh: bool = False, deadline: float | None = None) -> FetchResult:
+        """Return a fetch result, from cache when allowed.
+
+        Args:
+            fresh: Bypass cached results. An already running fetch is still
+                   shared, since its answer is not older than this call.
+            deadline: End-to-end budget in seconds for a fetch started by this
+                      call. Defaults to the orchestrator's deadline.
+
+        Returns:
+            The FetchResult from cache or from a new fetch.
+        """
+        cached = None if fresh else self._cached_result(deadline)
+        if cached is not None:
+            return cached
+
+        return await asyncio.shield(self._start_fetch(deadline))
+
+    async def fetch_iter(
+        self, fresh: bool = False, deadline: float | None = None
+    ) -> AsyncIterator[FetcherResult | FetchResult]:
+        """Like fetch_all(), but stream the results of a fetch started by this call.
+
+        Cached results and fetches already in flight are yielded as a single
+        FetchResult. Closing the iterator early does not cancel the fetch,
+        which may be shared with other callers.
+
+        Args:
+            fresh: Bypass cached results.
+            deadline: End-to-end budget in seconds for a fetch started by this
+                      call. Defaults to the orchestrator's deadline.
+
+        Yields:
+            The FetcherResult of each fetcher as it completes, followed by
+            the aggregated FetchResult.
+        """
+        cached = None if fresh else self._cached_result(deadline)
+        if cached is not None:
+            yield cached
+        elif self._inflight is not None:
+            yield await asyncio.shield(self._inflight)
+        else:
+            async for item in stream_fetch(
+                lambda on_result: self._start_fetch(deadline, on_result)
+            ):
+                yield item
+
+    def _cached_result(self, deadline: float | None) -> FetchResult | None:
+        """Return the cached result if it may be served, revalidating stale results."""
+        if self._result is None:
+            return None
+
+        age = self._clock() - self._fetched_at
+        if age <= self.ttl:
+            return self._result
+        if age <= self.ttl + self.stale_ttl:
+            # Serve stale result and revalidate in the background
+            self._start_fetch(deadline)
+            return self._result
+        return None
+
+    def _start_fetch(
+        self,
+        deadline: float | None = None,
+        on_result: Callable[[FetcherResult], None] | None = None,
+    ) -> asyncio.Task[FetchResult]:
+        """Return the in-flight fetch task, starting one if none is running.
+
+        Args:
+            deadline: End-to-end budget of a new fetch in seconds.
+            on_result: Receives each fetcher's result if a new fetch is started.
+        """
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._fetch(deadline, on_result))
+            # Background refreshes may have no awaiting caller; errors are logged in _fetch
+            self._inflight.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._inflight
+
+    async def _fetch(
+        self, deadline: float | None, on_result: Callable[[FetcherResult], None] | None
+    ) -> FetchResult:
+        """Run the orchestrator and store the result if it has a consensus IP."""
+        try:
+            result = await self.orchestrator.fetch_all(deadline=deadline, on_result=on_result)
+        except Exception:
+            logger.exception("Fetch failed")
+            raise
+        finally:
+            self._inflight = None
+
+        if result.consensus_ip is not None:
+            self._result = result
+            self._fetched_at = self._clock()
+
+        return result
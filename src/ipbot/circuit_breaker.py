@@ -0,0 +1,141 @@
+"""Per-provider circuit breaker to fail fast on providers that are down."""
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import StrEnum
+
+from ipbot.fetchers.exceptions import FetcherException
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    """States of a provider's circuit."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(FetcherException):
+    """Raised instead of fetching when a provider's circuit is open."""
+
+    pass
+
+
+@dataclass
+class _Circuit:
+    """Mutable circuit state of one provider."""
+
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures per provider and short-circuits broken ones.
+
+    A circuit opens after `failure_threshold` consecutive failures. While
+    open, fetches fail immediately. After `cooldown` seconds one trial fetch
+    is let through (half-open): success closes the circuit, failure opens it
+    for another cool-down.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open a circuit.
+            cooldown: Seconds a circuit stays open before a trial fetch.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._circuits: dict[str, _Circuit] = {}
+
+    def state(self, name: str) -> CircuitState:
+        """Return the current circuit state of a provider.
+
+        Args:
+            name: Provider name (from get_name()).
+        """
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            return CircuitState.CLOSED
+        if circuit.state == CircuitState.OPEN and self._cooled_down(circuit):
+            return CircuitState.HALF_OPEN
+        return circuit.state
+
+    def allow(self, name: str) -> bool:
+        """Return True if a fetch to the provider may start now.
+
+        In the half-open state only one trial fetch is allowed at a time.
+
+        Args:
+            name: Provider name.
+        """
+        circuit = self._circuits.get(name)
+        if circuit is None or circuit.state == CircuitState.CLOSED:
+            return True
+
+        if circuit.state == CircuitState.OPEN:
+            if not self._cooled_down(circuit):
+                return False
+            circuit.state = CircuitState.HALF_OPEN
+
+        if circuit.trial_in_flight:
+            return False
+        circuit.trial_in_flight = True
+        return True
+
+    def record_success(self, name: str) -> None:
+        """Close the provider's circuit after a successful fetch.
+
+        Args:
+            name: Provider name.
+        """
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            return
+        if circuit.state != CircuitState.CLOSED:
+            logger.info(f"Circuit for {name} closed")
+        self._circuits[name] = _Circuit()
+
+    def record_failure(self, name: str) -> None:
+        """Count a failed fetch, opening the circuit at the threshold.
+
+        Args:
+            name: Provider name.
+        """
+        circuit = self._circuits.setdefault(name, _Circuit())
+        circuit.failures += 1
+        circuit.trial_in_flight = False
+
+        if circuit.state == CircuitState.HALF_OPEN or circuit.failures >= self.failure_threshold:
+            if circuit.state != CircuitState.OPEN:
+                logger.warning(f"Circuit for {name} opened after {circuit.failures} failures")
+            circuit.state = CircuitState.OPEN
+            circuit.opened_at = self._clock()
+
+    def release(self, name: str) -> None:
+        """Give back a half-open trial whose fetch was cancelled before finishing.
+
+        Args:
+            name: Provider name.
+        """
+        circuit = self._circuits.get(name)
+        if circuit is not None:
+            circuit.trial_in_flight = False
+
+    def _cooled_down(self, circuit: _Circuit) -> bool:
+        """Return True if an open circuit's cool-down has elapsed."""
+        return self._clock() - circuit.opened_at >= self.cooldown
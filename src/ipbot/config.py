@@ -8,7 +8,130 @@ class BotConfig(BaseSettings):
 
     telegram_token: str
     telegram_owner_id: int
+    # Bot API base URL, the token is appended (empty uses https://api.telegram.org/bot)
+    telegram_base_url: str = ""
     fetcher_strategy_order: str = "all"
+    fetch_policy: str = "all"
+
+    # Adaptive provider ranking
+    ranking_enabled: bool = False
+    ranking_top_n: int = 0
+    ranking_alpha: float = 0.3
+    ranking_probe_interval: float = 300.0
+
+    # Hedged requests (extra requests per /ip, 0 disables)
+    hedge_max: int = 0
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+
+    # Adaptive per-provider timeouts (latency percentile x factor, clamped to floor/ceiling)
+    adaptive_timeouts: bool = False
+    timeout_percentile: float = 0.99
+    timeout_factor: float = 2.0
+    timeout_floor: float = 0.25
+    timeout_ceiling: float = 3.0
+    timeout_min_samples: int = 20
+    # Fixed timeouts in seconds by provider name, e.g. {"ident.me": 0.5}
+    provider_timeouts: dict[str, float] = {}
+
+    # Provider URL overrides by strategy name, e.g. {"ipify": "http://127.0.0.1:8080/ipify"}
+    provider_urls: dict[str, str] = {}
+
+    # Retries of transient network failures (retries per provider, 0 disables; delays in seconds)
+    retry_max: int = 0
+    retry_base_delay: float = 0.05
+    retry_max_delay: float = 1.0
+
+    # End-to-end budget of one fetch in seconds (0 disables)
+    fetch_deadline: float = 0.0
+
+    # Circuit breaker (consecutive failures that open a circuit, 0 disables)
+    circuit_breaker_threshold: int = 0
+    circuit_breaker_cooldown: float = 60.0
+
+    # Provider rate limits (token bucket per provider, honors Retry-After on 429)
+    rate_limit_enabled: bool = False
+    rate_limit_per_second: float = 1.0
+    rate_limit_burst: int = 5
+    rate_limit_default_backoff: float = 60.0
+
+    # Outbound fetches in flight at once across all providers (0 = unlimited)
+    max_concurrent_fetches: int = 0
+
+    # Result cache (seconds, 0 disables)
+    cache_ttl: float = 0.0
+    cache_stale_ttl: float = 0.0
+
+    # Additional users and chats by Telegram ID with their role, e.g. {"111": "user",
+    # "-100222": "admin"}; admins may also use /stats, the owner is always an admin
+    access_list: dict[int, str] = {}
+
+    # Fetches a user may start (token bucket per user; per minute, 0 disables), over the
+    # limit they are answered from the last result
+    user_fetches_per_minute: float = 0.0
+    user_fetch_burst: int = 3
+
+    # Unauthorized commands (dropped without a reply when silent; rejections are
+    # logged at most once per interval in seconds)
+    unauthorized_silent: bool = False
+    unauthorized_log_interval: float = 60.0
+
+    # Backlog of stale updates after downtime (seconds after which an update is stale,
+    # 0 disables; "drop" ignores them, "latest" answers only the latest per chat and command)
+    backlog_max_age: float = 0.0
+    backlog_policy: str = "latest"
+
+    # Concurrent update processing (updates handled at once, 1 handles them one after
+    # another; updates of one chat stay in order unless per-chat ordering is disabled)
+    concurrent_updates: int = 1
+    ordered_chat_updates: bool = True
+
+    # Webhook mode (public URL Telegram posts updates to, empty uses long polling;
+    # without a certificate and key TLS is expected to be offloaded to a reverse proxy)
+    webhook_url: str = ""
+    webhook_listen: str = "0.0.0.0"
+    webhook_port: int = 8443
+    webhook_path: str = ""
+    webhook_secret_token: str = ""
+    webhook_cert: str = ""
+    webhook_key: str = ""
+    webhook_max_connections: int = 40
+
+    # Background IP monitor (seconds between checks, 0 disables; chats notified of
+    # changes besides the owner)
+    monitor_interval: float = 0.0
+    monitor_debounce: int = 2
+    monitor_notify_ids: list[int] = []
+
+    # Outbound message queue (messages per second across all chats, 0 sends directly;
+    # per-chat rate in messages per second; seconds to flush queued messages on shutdown)
+    send_rate: float = 0.0
+    send_burst: int = 30
+    send_chat_rate: float = 1.0
+    send_chat_burst: int = 3
+    send_max_retries: int = 3
+    send_flush_timeout: float = 5.0
+
+    # Prometheus metrics endpoint (0 disables)
+    metrics_port: int = 0
+    metrics_host: str = "127.0.0.1"
+
+    # DNS cache for provider hostnames (seconds, refresh interval 0 disables refreshing)
+    dns_cache_enabled: bool = False
+    dns_cache_ttl: float = 300.0
+    dns_refresh_interval: float = 0.0
+
+    # Shared HTTP client pool
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 60.0
+    http2: bool = False
+    tls_session_cache: bool = False
+
+    # Connection warming (connections per provider host, 0 disables;
+    # keep-warm seconds, 0 warms only at startup)
+    http_warm_connections: int = 0
+    http_keep_warm_interval: float = 0.0
 
     def get_strategy_list(self) -> list[str]:
         return [s.strip() for s in self.fetcher_strategy_order.split(",") if s.strip()]
@@ -3,13 +3,16 @@
 from ipbot.config import BotConfig
 from ipbot.fetchers.base import FetchStrategy
 from ipbot.fetchers.custom import CustomStrategy
+from ipbot.fetchers.http_pool import HttpClientPool
 from ipbot.fetchers.identme import IdentMeStrategy
 from ipbot.fetchers.ifconfig import IfconfigStrategy
 from ipbot.fetchers.ipify import IpifyStrategy
 from ipbot.fetchers.ipinfo import IpinfoStrategy
 
 
-def create_fetchers(config: BotConfig) -> list[FetchStrategy]:
+def create_fetchers(
+    config: BotConfig, http_pool: HttpClientPool | None = None
+) -> list[FetchStrategy]:
     strategy_list = config.get_strategy_list()
 
     STRATEGIES = {
@@ -21,7 +24,10 @@ def create_fetchers(config: BotConfig) -> list[FetchStrategy]:
     }
 
     if strategy_list == ["all"]:
-        return [cls() for cls in STRATEGIES.values()]
+        return [
+            cls(http_pool=http_pool, url=config.provider_urls.get(name))
+            for name, cls in STRATEGIES.items()
+        ]
 
     unknown = set(strategy_list) - STRATEGIES.keys()
     if unknown:
@@ -29,4 +35,7 @@ def create_fetchers(config: BotConfig) -> list[FetchStrategy]:
             f"Unknown strategies: {', '.join(unknown)}. Available: {', '.join(STRATEGIES.keys())}"
         )
 
-    return [STRATEGIES[name]() for name in strategy_list]
+    return [
+        STRATEGIES[name](http_pool=http_pool, url=config.provider_urls.get(name))
+        for name in strategy_list
+    ]
@@ -2,6 +2,8 @@
 
 from abc import ABC, abstractmethod
 
+from ipbot.fetchers.http_pool import HttpClientPool
+
 
 class FetchStrategy(ABC):
     """Abstract base class for IP address fetching strategies.
@@ -10,10 +12,29 @@ class FetchStrategy(ABC):
     the public IP address (e.g., different API providers, curl, etc.).
     """
 
+    http_pool: HttpClientPool | None = None
+    url: str | None = None
+
+    def __init__(self, http_pool: HttpClientPool | None = None, url: str | None = None):
+        """Initialize the strategy.
+
+        Args:
+            http_pool: Shared HTTP client pool. If None, each request opens
+                       its own short-lived client.
+            url: Replaces the provider URL, e.g. to query a local simulator.
+        """
+        self.http_pool = http_pool
+        self.url = url
+
     @abstractmethod
-    async def get_ip(self) -> str:
+    async def get_ip(self, timeout: float | None = None) -> str:
         """Fetch and return the public IP address.
 
+        Args:
+            timeout: Seconds to wait for the provider, replacing the strategy's
+                     default. None uses the default. Only passed when a timeout
+                     policy sets one.
+
         Returns:
             str: The public IP address as a string.
 
@@ -30,3 +51,13 @@ class FetchStrategy(ABC):
             str: The name of the fetcher (e.g., "ipify", "identme").
         """
         pass
+
+    def get_url(self) -> str | None:
+        """Return the URL this fetcher queries.
+
+        Used to pre-resolve and pre-connect to provider hosts.
+
+        Returns:
+            str | None: The provider URL, or None if the fetcher does not use HTTP.
+        """
+        return None
@@ -7,9 +7,9 @@ class CustomStrategy(FetchStrategy):
     IFCONFIG_URL = "https://" + "myip" + ".elisei" + ".nl"
     TIMEOUT = 3.0
 
-    async def get_ip(self) -> str:
-        http_fetcher = HttpFetcher(timeout=self.TIMEOUT)
-        response = await http_fetcher.fetch(self.IFCONFIG_URL, self.get_name())
+    async def get_ip(self, timeout: float | None = None) -> str:
+        http_fetcher = HttpFetcher(timeout=timeout or self.TIMEOUT, pool=self.http_pool)
+        response = await http_fetcher.fetch(self.get_url(), self.get_name())
 
         ip_address = response.text.strip()
 
@@ -20,3 +20,6 @@ class CustomStrategy(FetchStrategy):
 
     def get_name(self) -> str:
         return "myip" + ".elisei" + ".nl"
+
+    def get_url(self) -> str:
+        return self.url or self.IFCONFIG_URL
@@ -0,0 +1,411 @@
+"""In-process DNS cache used by the shared HTTP client pool."""
+
+import asyncio
+import contextlib
+import ipaddress
+import logging
+import socket
+import ssl
+import time
+import typing
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DnsAnswer:
+    """Addresses a hostname resolved to.
+
+    Attributes:
+        addresses: IP addresses in the order they should be tried.
+        ttl: Seconds the answer may be cached.
+    """
+
+    addresses: list[str]
+    ttl: float
+
+
+class Resolver(ABC):
+    """Resolves hostnames for the DNS cache."""
+
+    @abstractmethod
+    async def resolve(self, host: str) -> DnsAnswer:
+        """Resolve a hostname.
+
+        Args:
+            host: The hostname to resolve.
+
+        Returns:
+            The resolved addresses and how long they may be cached.
+
+        Raises:
+            OSError: If the hostname cannot be resolved.
+        """
+        pass
+
+
+class SystemResolver(Resolver):
+    """Resolver using the operating system's getaddrinfo.
+
+    getaddrinfo does not report record TTLs, so every answer is cached for
+    the configured `ttl`.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """Initialize the resolver.
+
+        Args:
+            ttl: Seconds answers are cached.
+        """
+        self.ttl = ttl
+
+    async def resolve(self, host: str) -> DnsAnswer:
+        """Resolve a hostname with getaddrinfo.
+
+        Args:
+            host: The hostname to resolve.
+
+        Returns:
+            The resolved addresses, without duplicates.
+
+        Raises:
+            OSError: If the hostname cannot be resolved.
+        """
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        return DnsAnswer(addresses=addresses, ttl=self.ttl)
+
+
+@dataclass
+class _Entry:
+    """Cached answer of one hostname."""
+
+    addresses: list[str]
+    expires_at: float
+
+
+class DnsCache:
+    """Caches resolved addresses per hostname for the answer's TTL.
+
+    Concurrent lookups of the same hostname share one resolver call. If the
+    resolver fails, expired addresses are used rather than failing the
+    request. Hosts registered with watch() are resolved on start() and, with
+    a refresh interval, re-resolved in the background before they expire so
+    fetches never wait for DNS.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver | None = None,
+        refresh_interval: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            resolver: Resolver used on cache misses. Defaults to SystemResolver.
+            refresh_interval: Seconds between background refreshes. 0 disables them.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.resolver = resolver or SystemResolver()
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._inflight: dict[str, asyncio.Task[list[str]]] = {}
+        self._watched: set[str] = set()
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    def watch(self, hosts: Iterable[str]) -> None:
+        """Register hosts to resolve on start() and keep refreshed.
+
+        Args:
+            hosts: Hostnames, such as those of the configured providers.
+        """
+        self._watched.update(hosts)
+
+    async def start(self) -> None:
+        """Pre-resolve watched hosts and start the background refresh if enabled."""
+        await self.prefetch(self._watched)
+        if self.refresh_interval > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        """Stop the background refresh."""
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        await asyncio.gather(self._refresh_task, return_exceptions=True)
+        self._refresh_task = None
+
+    async def prefetch(self, hosts: Iterable[str]) -> None:
+        """Resolve hosts into the cache, logging failures instead of raising.
+
+        Args:
+            hosts: Hostnames to resolve.
+        """
+        hosts = list(hosts)
+        results = await asyncio.gather(
+            *(self._lookup(host) for host in hosts), return_exceptions=True
+        )
+        for host, result in zip(hosts, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to resolve {host}: {result}")
+
+    async def resolve(self, host: str) -> list[str]:
+        """Return the addresses of a hostname, from cache while they are valid.
+
+        Args:
+            host: The hostname to resolve.
+
+        Returns:
+            The IP addresses in the order they should be tried.
+
+        Raises:
+            OSError: If the hostname cannot be resolved and nothing is cached.
+        """
+        entry = self._entries.get(host)
+        if entry is not None and self._clock() < entry.expires_at:
+            return entry.addresses
+
+        try:
+            return await asyncio.shield(self._lookup(host))
+        except OSError:
+            if entry is None:
+                raise
+            logger.warning(f"Failed to resolve {host}, using expired addresses")
+            return entry.addresses
+
+    def _lookup(self, host: str) -> asyncio.Task[list[str]]:
+        """Return the running resolver call for a host, starting one if needed."""
+        task = self._inflight.get(host)
+        if task is None:
+            task = asyncio.create_task(self._resolve_and_store(host))
+            self._inflight[host] = task
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _resolve_and_store(self, host: str) -> list[str]:
+        """Query the resolver and cache its answer."""
+        try:
+            answer = await self.resolver.resolve(host)
+        finally:
+            del self._inflight[host]
+
+        if not answer.addresses:
+            raise OSError(f"No addresses found for {host}")
+
+        self._entries[host] = _Entry(
+            addresses=answer.addresses, expires_at=self._clock() + answer.ttl
+        )
+        logger.debug(f"Resolved {host} to {', '.join(answer.addresses)} (ttl {answer.ttl}s)")
+        return answer.addresses
+
+    async def _refresh_loop(self) -> None:
+        """Periodically re-resolve hosts that would expire before the next refresh."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            horizon = self._clock() + self.refresh_interval
+            expiring = {
+                host for host, entry in self._entries.items() if entry.expires_at <= horizon
+            }
+            await self.prefetch(expiring | (self._watched - self._entries.keys()))
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend connecting to addresses from a DnsCache.
+
+    Only the TCP connect uses the cached address; TLS SNI and the Host header
+    still use the original hostname. Addresses are tried in order until one
+    connects.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, dns_cache: DnsCache):
+        """Initialize the backend.
+
+        Args:
+            backend: Backend performing the actual connections.
+            dns_cache: Cache used to resolve hostnames.
+        """
+        self._backend = backend
+        self.dns_cache = dns_cache
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        """Resolve `host` through the cache and connect to it."""
+        try:
+            ipaddress.ip_address(host)
+            addresses = [host]
+        except ValueError:
+            try:
+                async with asyncio.timeout(timeout):
+                    addresses = await self.dns_cache.resolve(host)
+            except TimeoutError as e:
+                raise httpcore.ConnectTimeout(f"Timed out resolving {host}") from e
+            except OSError as e:
+                raise httpcore.ConnectError(f"Failed to resolve {host}: {e}") from e
+
+        last_error: Exception | None = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        assert last_error is not None
+        raise last_error
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        """Connect to a Unix socket without DNS."""
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep using the wrapped backend."""
+        await self._backend.sleep(seconds)
+
+
+# httpcore errors and the httpx errors they are raised as, most specific first
+_ERRORS: dict[type[Exception], type[httpx.TransportError]] = {
+    httpcore.ConnectTimeout: httpx.ConnectTimeout,
+    httpcore.ReadTimeout: httpx.ReadTimeout,
+    httpcore.WriteTimeout: httpx.WriteTimeout,
+    httpcore.PoolTimeout: httpx.PoolTimeout,
+    httpcore.TimeoutException: httpx.TimeoutException,
+    httpcore.ConnectError: httpx.ConnectError,
+    httpcore.ReadError: httpx.ReadError,
+    httpcore.WriteError: httpx.WriteError,
+    httpcore.NetworkError: httpx.NetworkError,
+    httpcore.ProxyError: httpx.ProxyError,
+    httpcore.UnsupportedProtocol: httpx.UnsupportedProtocol,
+    httpcore.LocalProtocolError: httpx.LocalProtocolError,
+    httpcore.RemoteProtocolError: httpx.RemoteProtocolError,
+    httpcore.ProtocolError: httpx.ProtocolError,
+}
+
+
+@contextlib.contextmanager
+def _httpx_errors(request: httpx.Request) -> typing.Iterator[None]:
+    """Raise httpcore errors as the matching httpx errors."""
+    try:
+        yield
+    except Exception as e:
+        error = next((_ERRORS[cls] for cls in type(e).__mro__ if cls in _ERRORS), None)
+        if error is None:
+            raise
+        raise error(str(e), request=request) from e
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    """Response body read from an httpcore response."""
+
+    def __init__(self, stream: typing.AsyncIterable[bytes], request: httpx.Request):
+        self._stream = stream
+        self._request = request
+
+    async def __aiter__(self) -> typing.AsyncIterator[bytes]:
+        with _httpx_errors(self._request):
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class DnsCacheTransport(httpx.AsyncBaseTransport):
+    """httpx transport whose connections resolve hostnames through a DnsCache.
+
+    httpx.AsyncHTTPTransport does not accept httpcore's network_backend
+    option, so this transport builds its own httpcore connection pool with a
+    CachingNetworkBackend and translates requests, responses and errors
+    between httpx and httpcore.
+    """
+
+    def __init__(
+        self,
+        dns_cache: DnsCache,
+        verify: ssl.SSLContext | bool = True,
+        limits: httpx.Limits | None = None,
+        http2: bool = False,
+        backend: httpcore.AsyncNetworkBackend | None = None,
+    ):
+        """Initialize the transport.
+
+        Args:
+            dns_cache: Cache used to resolve hostnames.
+            verify: SSL context, or whether to verify certificates with the default one.
+            limits: Connection pool limits, httpx's defaults if None.
+            http2: Enable HTTP/2 in addition to HTTP/1.1.
+            backend: Backend performing the connections, anyio's by default.
+        """
+        limits = limits or httpx.Limits()
+        ssl_context = (
+            verify if isinstance(verify, ssl.SSLContext) else httpx.create_ssl_context(verify)
+        )
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=CachingNetworkBackend(backend or httpcore.AnyIOBackend(), dns_cache),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request over a pooled connection.
+
+        Raises:
+            httpx.TransportError: If connecting, sending or receiving fails.
+        """
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=typing.cast(typing.AsyncIterable[bytes], request.stream),
+            extensions=request.extensions,
+        )
+        with _httpx_errors(request):
+            response = await self._pool.handle_async_request(core_request)
+
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(
+                typing.cast(typing.AsyncIterable[bytes], response.stream), request
+            ),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        await self._pool.aclose()
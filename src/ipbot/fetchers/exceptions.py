@@ -13,7 +13,27 @@ class FetcherHTTPError(FetcherException):
     pass
 
 
+class FetcherTimeoutError(FetcherHTTPError):
+    """Raised when a provider does not answer within the HTTP timeout."""
+
+    pass
+
+
 class FetcherParsingError(FetcherException):
     """Raised when response parsing or validation fails."""
 
     pass
+
+
+class FetcherRateLimitedError(FetcherHTTPError):
+    """Raised when a provider answers 429 Too Many Requests."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        """Initialize the error.
+
+        Args:
+            message: Error message.
+            retry_after: Seconds the provider asked us to wait, if it said so.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -1,8 +1,40 @@
 """HTTP fetcher helper for making API requests with common error handling."""
 
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
 import httpx
 
-from ipbot.fetchers.exceptions import FetcherHTTPError
+from ipbot.fetchers.exceptions import (
+    FetcherHTTPError,
+    FetcherRateLimitedError,
+    FetcherTimeoutError,
+)
+from ipbot.fetchers.http_pool import HttpClientPool
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header into seconds from now.
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date.
+
+    Returns:
+        The delay in seconds, or None if the header is missing or invalid.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except ValueError:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
 
 
 class HttpFetcher:
@@ -13,13 +45,16 @@ class HttpFetcher:
     and standardized error handling.
     """
 
-    def __init__(self, timeout: float = 3.0):
+    def __init__(self, timeout: float = 3.0, pool: HttpClientPool | None = None):
         """Initialize the HTTP fetcher with a timeout.
 
         Args:
             timeout: Request timeout in seconds. Defaults to 3.0.
+            pool: Shared client pool. If not given or not started, a short-lived
+                  client is created for each request.
         """
         self.timeout = timeout
+        self.pool = pool
 
     async def fetch(self, url: str, service_name: str) -> httpx.Response:
         """Fetch URL and return response with error handling.
@@ -32,14 +67,31 @@ class HttpFetcher:
             httpx.Response: The HTTP response object.
 
         Raises:
-            FetcherHTTPError: If the request fails due to network errors,
-                             timeouts, or HTTP errors.
+            FetcherRateLimitedError: If the service answers 429 Too Many Requests.
+            FetcherTimeoutError: If the service does not answer within the timeout.
+            FetcherHTTPError: If the request fails due to network or HTTP errors.
         """
+        shared_client = self.pool.client if self.pool else None
+
         try:
+            if shared_client is not None:
+                response = await shared_client.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                return response
+
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.get(url)
                 response.raise_for_status()
                 return response
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+                raise FetcherRateLimitedError(
+                    f"Rate limited by {service_name}",
+                    retry_after=parse_retry_after(e.response.headers.get("Retry-After")),
+                ) from e
+            raise FetcherHTTPError(f"Failed to fetch IP from {service_name}: {e}") from e
+        except httpx.TimeoutException as e:
+            raise FetcherTimeoutError(f"Failed to fetch IP from {service_name}: {e}") from e
         except httpx.HTTPError as e:
             raise FetcherHTTPError(f"Failed to fetch IP from {service_name}: {e}") from e
         except Exception as e:
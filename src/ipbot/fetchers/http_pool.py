@@ -0,0 +1,201 @@
+"""Shared, long-lived HTTP client pool used by all IP fetching strategies."""
+
+import asyncio
+import importlib.util
+import logging
+from collections.abc import Callable, Iterable
+
+import httpx
+
+from ipbot.fetchers.dns_cache import DnsCache, DnsCacheTransport
+from ipbot.fetchers.tls_sessions import TlsSessionCache
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientPool:
+    """Owns a single pooled httpx.AsyncClient shared by all fetchers.
+
+    Reusing one client keeps TCP/TLS connections alive between /ip commands,
+    so repeated fetches skip DNS lookups, connects and TLS handshakes. The
+    client is created in start() and released in close(), which are wired to
+    the Application's post_init and post_shutdown hooks.
+
+    With warming enabled, connections to the registered provider URLs are
+    opened in the background on start() and, with a keep-warm interval,
+    refreshed periodically so they do not expire between /ip commands.
+    Warming requests can be gated like fetches: providers that should not
+    be contacted are skipped and the requests share the fetches' concurrency
+    limit.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+        dns_cache: DnsCache | None = None,
+        tls_sessions: TlsSessionCache | None = None,
+        warm_connections: int = 0,
+        keep_warm_interval: float = 0.0,
+    ):
+        """Initialize the pool configuration without opening any connections.
+
+        Args:
+            max_connections: Maximum number of concurrent connections.
+            max_keepalive_connections: Maximum number of idle connections kept alive.
+            keepalive_expiry: Seconds an idle connection is kept before closing.
+            http2: Enable HTTP/2 if the optional 'h2' package is installed.
+            dns_cache: Cache used to resolve hostnames instead of resolving
+                       on every new connection. Started and closed with the pool.
+            tls_sessions: Shared SSL context resuming TLS sessions on
+                          reconnects. httpx's default context is used if None.
+            warm_connections: Connections opened to each registered URL's
+                              host on start(). 0 disables warming.
+            keep_warm_interval: Seconds between keep-warm rounds. Should be
+                                below keepalive_expiry. 0 warms only on start().
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.dns_cache = dns_cache
+        self.tls_sessions = tls_sessions
+        self.warm_connections = warm_connections
+        self.keep_warm_interval = keep_warm_interval
+        self._warm_urls: dict[tuple[str, str, int | None], str] = {}
+        self._warm_admit: Callable[[str], bool] | None = None
+        self._warm_limit: asyncio.Semaphore | None = None
+        self._warm_response: Callable[[str, httpx.Response], None] | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._warm_task: asyncio.Task[None] | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient | None:
+        """Return the shared client, or None if the pool is not started."""
+        return self._client
+
+    def keep_warm(
+        self,
+        urls: Iterable[str],
+        admit: Callable[[str], bool] | None = None,
+        limit: asyncio.Semaphore | None = None,
+        on_response: Callable[[str, httpx.Response], None] | None = None,
+    ) -> None:
+        """Register URLs whose hosts should have connections ready.
+
+        Only the first URL of each origin is used.
+
+        Args:
+            urls: Provider URLs, as returned by FetchStrategy.get_url().
+            admit: Asked before every warming request whether it may be sent,
+                   e.g. not while the provider's circuit is open. May charge
+                   the request to the provider's rate limit.
+            limit: Semaphore bounding outbound requests, shared with the fetches.
+            on_response: Called with the URL and response of every answered
+                         warming request, e.g. to honor a 429's Retry-After.
+        """
+        self._warm_admit = admit
+        self._warm_limit = limit
+        self._warm_response = on_response
+        for url in urls:
+            parsed = httpx.URL(url)
+            self._warm_urls.setdefault((parsed.scheme, parsed.host, parsed.port), url)
+
+    async def start(self) -> None:
+        """Create the shared client if it is not already running."""
+        if self._client is not None:
+            return
+
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+
+        verify = self.tls_sessions.ssl_context if self.tls_sessions else True
+        transport = None
+        if self.dns_cache is not None:
+            await self.dns_cache.start()
+            transport = DnsCacheTransport(
+                self.dns_cache, verify=verify, limits=self.limits, http2=http2
+            )
+
+        self._client = httpx.AsyncClient(
+            verify=verify, limits=self.limits, http2=http2, transport=transport
+        )
+        logger.info(
+            f"HTTP client pool started (http2: {http2}, dns cache: {transport is not None})"
+        )
+
+        if self.warm_connections > 0 and self._warm_urls:
+            self._warm_task = asyncio.create_task(self._warm_loop())
+
+    async def warm(self) -> None:
+        """Open connections to every registered URL's host.
+
+        Sends `warm_connections` concurrent HEAD requests per host, which
+        leaves that many connections (fewer with HTTP/2) idle in the pool.
+        Requests refused by the `admit` check are not sent, and responses are
+        passed to `on_response`. Failures are logged and otherwise ignored.
+        """
+        client = self._client
+        if client is None:
+            return
+
+        admit = self._warm_admit
+        urls = [
+            url
+            for url in self._warm_urls.values()
+            for _ in range(self.warm_connections)
+            if admit is None or admit(url)
+        ]
+        results = await asyncio.gather(
+            *(self._head(client, url) for url in urls), return_exceptions=True
+        )
+        failed = set()
+        for url, result in zip(urls, results, strict=True):
+            if isinstance(result, Exception):
+                failed.add(url)
+            elif self._warm_response is not None:
+                self._warm_response(url, result)
+        for url in failed:
+            logger.warning(f"Failed to warm connection to {url}")
+        hosts = set(urls)
+        logger.debug(
+            f"Warmed connections to {len(hosts - failed)} hosts "
+            f"({len(self._warm_urls) - len(hosts)} skipped)"
+        )
+
+    async def _head(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        """Send one warming request, within the shared concurrency limit."""
+        if self._warm_limit is None:
+            return await client.head(url)
+        async with self._warm_limit:
+            return await client.head(url)
+
+    async def close(self) -> None:
+        """Close the shared client and all pooled connections."""
+        if self._client is None:
+            return
+
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+            self._warm_task = None
+
+        await self._client.aclose()
+        self._client = None
+        if self.dns_cache is not None:
+            await self.dns_cache.close()
+        logger.info("HTTP client pool closed")
+
+    async def _warm_loop(self) -> None:
+        """Warm connections now and then every keep-warm interval."""
+        while True:
+            await self.warm()
+            if self.keep_warm_interval <= 0:
+                return
+            await asyncio.sleep(self.keep_warm_interval)
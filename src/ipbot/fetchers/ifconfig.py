@@ -15,9 +15,12 @@ class IfconfigStrategy(FetchStrategy):
     IFCONFIG_URL = "https://ifconfig.me/ip"
     TIMEOUT = 3.0
 
-    async def get_ip(self) -> str:
+    async def get_ip(self, timeout: float | None = None) -> str:
         """Fetch and return the public IP address from ifconfig.me.
 
+        Args:
+            timeout: Seconds to wait for the provider, TIMEOUT if None.
+
         Returns:
             str: The public IP address as a string.
 
@@ -26,8 +29,8 @@ class IfconfigStrategy(FetchStrategy):
                              timeouts, or HTTP errors.
             FetcherParsingError: If the response format is invalid.
         """
-        http_fetcher = HttpFetcher(timeout=self.TIMEOUT)
-        response = await http_fetcher.fetch(self.IFCONFIG_URL, self.get_name())
+        http_fetcher = HttpFetcher(timeout=timeout or self.TIMEOUT, pool=self.http_pool)
+        response = await http_fetcher.fetch(self.get_url(), self.get_name())
 
         ip_address = response.text.strip()
 
@@ -43,3 +46,11 @@ class IfconfigStrategy(FetchStrategy):
             str: The name "ifconfig".
         """
         return "ifconfig.me"
+
+    def get_url(self) -> str:
+        """Return the URL queried by this fetcher.
+
+        Returns:
+            str: The overridden URL or the IFCONFIG_URL endpoint.
+        """
+        return self.url or self.IFCONFIG_URL
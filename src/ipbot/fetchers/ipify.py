@@ -15,9 +15,12 @@ class IpifyStrategy(FetchStrategy):
     IPIFY_URL = "https://api.ipify.org?format=json"
     TIMEOUT = 3.0
 
-    async def get_ip(self) -> str:
+    async def get_ip(self, timeout: float | None = None) -> str:
         """Fetch and return the public IP address from ipify.org.
 
+        Args:
+            timeout: Seconds to wait for the provider, TIMEOUT if None.
+
         Returns:
             str: The public IP address as a string.
 
@@ -26,8 +29,8 @@ class IpifyStrategy(FetchStrategy):
                              timeouts, or HTTP errors.
             FetcherParsingError: If the response format is invalid.
         """
-        http_fetcher = HttpFetcher(timeout=self.TIMEOUT)
-        response = await http_fetcher.fetch(self.IPIFY_URL, self.get_name())
+        http_fetcher = HttpFetcher(timeout=timeout or self.TIMEOUT, pool=self.http_pool)
+        response = await http_fetcher.fetch(self.get_url(), self.get_name())
 
         data = response.json()
 
@@ -45,3 +48,11 @@ class IpifyStrategy(FetchStrategy):
             str: The name "ipify".
         """
         return "ipify.org"
+
+    def get_url(self) -> str:
+        """Return the URL queried by this fetcher.
+
+        Returns:
+            str: The overridden URL or the IPIFY_URL endpoint.
+        """
+        return self.url or self.IPIFY_URL
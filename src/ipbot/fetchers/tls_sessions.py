@@ -0,0 +1,94 @@
+"""Shared SSL context that resumes TLS sessions across reconnects."""
+
+import os
+import ssl
+
+import certifi
+
+
+class _ResumingSSLObject(ssl.SSLObject):
+    """SSLObject reporting handshakes and new session tickets to the cache."""
+
+    def do_handshake(self) -> None:
+        """Complete the handshake and report it to the session cache."""
+        super().do_handshake()
+        self.context.tls_sessions._handshake_done(self)
+
+    def read(self, len: int = 1024, buffer: bytearray | None = None) -> bytes | int:
+        """Read decrypted data, caching any session ticket received with it."""
+        data = super().read(len, buffer)
+        # TLS 1.3 tickets arrive after the handshake, with the first records read
+        self.context.tls_sessions._store(self)
+        return data
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """SSLContext offering the cached session of a host on every new connection."""
+
+    sslobject_class = _ResumingSSLObject
+
+    def wrap_bio(
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: str | bytes | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLObject:
+        """Wrap a connection's BIOs, offering the host's cached session unless one is given."""
+        if session is None and not server_side and server_hostname:
+            if isinstance(server_hostname, bytes):
+                server_hostname = server_hostname.decode("ascii")
+            session = self.tls_sessions.get(server_hostname)
+        return super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+
+
+class TlsSessionCache:
+    """One SSL context for all provider connections that caches TLS sessions per host.
+
+    A new connection to a host offers the last session ticket received from
+    it, turning the full handshake into a resumption when the server accepts
+    it. Full and resumed handshakes are counted to verify that it works.
+    """
+
+    def __init__(self, cafile: str | None = None):
+        """Create the shared SSL context.
+
+        Args:
+            cafile: CA bundle used to verify servers. Defaults to $SSL_CERT_FILE
+                    or certifi's bundle, like httpx.
+        """
+        self.full_handshakes = 0
+        self.resumed_handshakes = 0
+        self._sessions: dict[str, ssl.SSLSession] = {}
+
+        context = _ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.verify_flags |= ssl.VERIFY_X509_STRICT | ssl.VERIFY_X509_PARTIAL_CHAIN
+        context.load_verify_locations(
+            cafile=cafile or os.environ.get("SSL_CERT_FILE") or certifi.where()
+        )
+        context.tls_sessions = self
+        self.ssl_context: ssl.SSLContext = context
+
+    def get(self, host: str) -> ssl.SSLSession | None:
+        """Return the cached session of a host, if any.
+
+        Args:
+            host: Server hostname (SNI).
+        """
+        return self._sessions.get(host)
+
+    def _handshake_done(self, ssl_object: ssl.SSLObject) -> None:
+        """Count a completed handshake and cache its session."""
+        if ssl_object.session_reused:
+            self.resumed_handshakes += 1
+        else:
+            self.full_handshakes += 1
+        self._store(ssl_object)
+
+    def _store(self, ssl_object: ssl.SSLObject) -> None:
+        """Cache the connection's session, preferring sessions with a resumption ticket."""
+        host = ssl_object.server_hostname
+        session = ssl_object.session
+        if host and session is not None and (session.has_ticket or host not in self._sessions):
+            self._sessions[host] = session
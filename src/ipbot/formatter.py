@@ -1,6 +1,7 @@
 """Formatter for displaying IP fetching results."""
 
-from ipbot.result import FetchResult
+from ipbot.metrics import SUCCESS, ProviderStats
+from ipbot.result import FetcherResult, FetchResult
 
 
 class ResultFormatter:
@@ -35,8 +36,90 @@ class ResultFormatter:
                 else:
                     # Just show success when all agree
                     lines.append(f"🟢 {fetcher_result.fetcher_name}")
+            elif fetcher_result.skipped:
+                # Fetcher was not needed to answer this request
+                lines.append(f"⚪ {fetcher_result.fetcher_name}: {fetcher_result.error_type}")
             else:
                 # Show error
                 lines.append(f"❌ {fetcher_result.fetcher_name}: {fetcher_result.error_type}")
 
         return "\n".join(lines)
+
+    def format_partial(self, results: list[FetcherResult]) -> str:
+        """Format the results of a fetch that is still running.
+
+        The IP address is shown once the completed fetchers agree on it.
+
+        Args:
+            results: Results of the fetchers completed so far.
+
+        Returns:
+            A formatted string with the IP address so far, the statuses of the
+            completed fetchers and a note that others are still pending.
+        """
+        ips = {r.ip for r in results if r.success and r.ip}
+        partial = FetchResult(
+            results=results,
+            consensus_ip=next(iter(ips)) if len(ips) == 1 else None,
+            has_conflicts=len(ips) > 1,
+        )
+        return f"{self.format(partial)}\n⏳ Waiting for other providers…"
+
+    def format_rate_limited(self, result: FetchResult) -> str:
+        """Format the last result for a user who is over their fetch limit.
+
+        Args:
+            result: The most recent FetchResult.
+
+        Returns:
+            The formatted result with a note that it is not a new fetch.
+        """
+        return f"{self.format(result)}\n⏳ Rate limited, showing the last result"
+
+    def format_change(self, previous_ip: str, result: FetchResult) -> str:
+        """Format an IP change notification.
+
+        Args:
+            previous_ip: The previously confirmed IP address.
+            result: The FetchResult that confirmed the new IP address.
+
+        Returns:
+            A formatted notification message followed by the fetcher statuses.
+        """
+        return f"🔔 IP address changed (was {previous_ip})\n\n{self.format(result)}"
+
+    def format_stats(self, stats: list[ProviderStats]) -> str:
+        """Format per-provider latency percentiles and outcome counts.
+
+        Args:
+            stats: Statistics for each provider.
+
+        Returns:
+            A formatted statistics message.
+        """
+        if not stats:
+            return "📊 No fetches recorded yet"
+
+        lines = ["📊 Provider statistics (p50 / p95 / p99)", ""]
+        for provider in stats:
+            percentiles = " / ".join(
+                _format_ms(value) for value in (provider.p50, provider.p95, provider.p99)
+            )
+            total = sum(provider.outcomes.values())
+            successes = provider.outcomes.get(SUCCESS, 0)
+            lines.append(f"{provider.name}: {percentiles} ({successes}/{total} ok)")
+
+            errors = [
+                f"{outcome}: {count}"
+                for outcome, count in provider.outcomes.items()
+                if outcome != SUCCESS
+            ]
+            if errors:
+                lines.append(f"   {', '.join(errors)}")
+
+        return "\n".join(lines)
+
+
+def _format_ms(seconds: float | None) -> str:
+    """Format a latency in seconds as whole milliseconds."""
+    return "n/a" if seconds is None else f"{seconds * 1000:.0f}ms"
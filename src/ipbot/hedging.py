@@ -0,0 +1,92 @@
+"""Hedged requests: duplicate a slow fetch and keep whichever answers first."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to hedge a slow fetch and how many hedges a request may use.
+
+    Attributes:
+        percentile: A fetch is hedged once it runs longer than this percentile
+                    of the provider's observed latency (e.g. 0.95 for p95).
+        max_hedges: Maximum extra requests per fetch_all() call.
+        min_samples: Latency samples required before a provider is hedged.
+    """
+
+    percentile: float = 0.95
+    max_hedges: int = 1
+    min_samples: int = 20
+
+
+class HedgeBudget:
+    """Counts hedges still allowed within a single fetch_all() call."""
+
+    def __init__(self, remaining: int):
+        """Initialize the budget.
+
+        Args:
+            remaining: Number of hedged requests allowed.
+        """
+        self.remaining = remaining
+
+    def try_acquire(self) -> bool:
+        """Take one hedge from the budget.
+
+        Returns:
+            True if a hedge may be started, False if the budget is spent.
+        """
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+async def hedged_call(
+    call: Callable[[], Awaitable[str]],
+    delay: float,
+    budget: HedgeBudget,
+    on_hedge: Callable[[], None] | None = None,
+) -> str:
+    """Run `call`, starting a duplicate if it has not finished after `delay` seconds.
+
+    The first successful answer wins and the other attempt is cancelled. If
+    one attempt fails, the other is still awaited; if both fail, the error of
+    the original attempt is raised.
+
+    Args:
+        call: Factory starting one fetch attempt.
+        delay: Seconds to wait before hedging.
+        budget: Hedge budget of the current request.
+        on_hedge: Called when the duplicate is started.
+
+    Returns:
+        The IP address from the first successful attempt.
+    """
+    primary = asyncio.ensure_future(call())
+    attempts = {primary}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=delay)
+        if done or not budget.try_acquire():
+            return await primary
+
+        if on_hedge:
+            on_hedge()
+        attempts.add(asyncio.ensure_future(call()))
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+
+        # Both attempts failed
+        return primary.result()
+    finally:
+        unfinished = [attempt for attempt in attempts if not attempt.done()]
+        for attempt in unfinished:
+            attempt.cancel()
+        if unfinished:
+            await asyncio.gather(*unfinished, return_exceptions=True)
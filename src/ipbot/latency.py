@@ -0,0 +1,54 @@
+"""Rolling per-provider latency observations."""
+
+import math
+from collections import defaultdict, deque
+
+
+class LatencyTracker:
+    """Keeps the most recent successful fetch latencies for each provider.
+
+    Percentiles are computed over a fixed-size window so they follow
+    changing network conditions.
+    """
+
+    def __init__(self, window: int = 100):
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent samples kept per provider.
+        """
+        self.window = window
+        self._samples: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.window)
+        )
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a latency sample.
+
+        Args:
+            name: Provider name (from get_name()).
+            seconds: Observed latency in seconds.
+        """
+        self._samples[name].append(seconds)
+
+    def count(self, name: str) -> int:
+        """Return the number of samples currently kept for a provider."""
+        return len(self._samples.get(name, ()))
+
+    def percentile(self, name: str, q: float) -> float | None:
+        """Return the q-th percentile latency using the nearest-rank method.
+
+        Args:
+            name: Provider name.
+            q: Percentile as a fraction between 0 and 1 (e.g. 0.95).
+
+        Returns:
+            The latency in seconds, or None if there are no samples.
+        """
+        samples = self._samples.get(name)
+        if not samples:
+            return None
+
+        ordered = sorted(samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
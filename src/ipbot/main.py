@@ -1,18 +1,110 @@
 """Main entry point for the Telegram IP bot application."""
 
 import logging
+from typing import Any
+from urllib.parse import urlsplit
 
 from telegram.ext import Application, ApplicationBuilder
 
+from ipbot.auth import AccessList, AuthorizationFilter
+from ipbot.backlog import BacklogCoalescer
 from ipbot.bot import setup_handlers
+from ipbot.cache import CachedFetchOrchestrator
+from ipbot.circuit_breaker import CircuitBreaker
 from ipbot.config import BotConfig
 from ipbot.factory import create_fetchers
+from ipbot.fetchers.dns_cache import DnsCache, SystemResolver
+from ipbot.fetchers.http_pool import HttpClientPool
+from ipbot.fetchers.tls_sessions import TlsSessionCache
+from ipbot.hedging import HedgePolicy
 from ipbot.logger import setup_logging
+from ipbot.metrics import FetchMetrics, MetricsServer
+from ipbot.monitor import IpMonitor
 from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.policy import FetchPolicy
+from ipbot.ranking import ProviderScorer
+from ipbot.rate_limit import RateLimiter
+from ipbot.retry import RetryPolicy
+from ipbot.send_queue import SendQueue
+from ipbot.timeouts import TimeoutPolicy
+from ipbot.update_processor import ChatOrderedUpdateProcessor
 
 logger = logging.getLogger(__name__)
 
 
+async def post_init(application: Application) -> None:
+    """Start shared resources once the application is initialized.
+
+    Args:
+        application: The initialized Telegram Application.
+    """
+    http_pool: HttpClientPool = application.bot_data["http_pool"]
+    await http_pool.start()
+
+    metrics_server: MetricsServer | None = application.bot_data.get("metrics_server")
+    if metrics_server:
+        await metrics_server.start()
+
+    send_queue: SendQueue | None = application.bot_data.get("send_queue")
+    if send_queue:
+        await send_queue.start()
+
+
+async def post_shutdown(application: Application) -> None:
+    """Release shared resources after the application has shut down.
+
+    Args:
+        application: The Telegram Application being shut down.
+    """
+    metrics_server: MetricsServer | None = application.bot_data.get("metrics_server")
+    if metrics_server:
+        await metrics_server.close()
+
+    http_pool: HttpClientPool = application.bot_data["http_pool"]
+    await http_pool.close()
+
+
+async def post_stop(application: Application) -> None:
+    """Flush queued messages and unregister the webhook while the bot can still send.
+
+    Args:
+        application: The Telegram Application being stopped.
+    """
+    config: BotConfig = application.bot_data["config"]
+
+    send_queue: SendQueue | None = application.bot_data.get("send_queue")
+    if send_queue:
+        await send_queue.close(timeout=config.send_flush_timeout)
+
+    if config.webhook_url:
+        await application.bot.delete_webhook()
+        logger.info("Webhook deleted")
+
+
+def webhook_options(config: BotConfig) -> dict[str, Any]:
+    """Return the webhook server options of `run_webhook()` and `start_webhook()`.
+
+    Without a certificate and key the server speaks plain HTTP, for a reverse
+    proxy that terminates TLS in front of it.
+
+    Args:
+        config: Bot configuration with the webhook settings.
+
+    Returns:
+        Keyword arguments for `Application.run_webhook()` or `Updater.start_webhook()`.
+    """
+    return {
+        "listen": config.webhook_listen,
+        "port": config.webhook_port,
+        "url_path": config.webhook_path,
+        "webhook_url": config.webhook_url,
+        "secret_token": config.webhook_secret_token or None,
+        "cert": config.webhook_cert or None,
+        "key": config.webhook_key or None,
+        "max_connections": config.webhook_max_connections,
+    }
+
+
 def build_application() -> Application:
     """Build and configure the Telegram bot application.
 
@@ -23,24 +115,206 @@ def build_application() -> Application:
     config = BotConfig()
     logger.info("Configuration loaded successfully")
 
+    # Create shared HTTP client pool, started and closed with the application
+    dns_cache = (
+        DnsCache(
+            SystemResolver(ttl=config.dns_cache_ttl),
+            refresh_interval=config.dns_refresh_interval,
+        )
+        if config.dns_cache_enabled
+        else None
+    )
+    tls_sessions = TlsSessionCache() if config.tls_session_cache else None
+    http_pool = HttpClientPool(
+        max_connections=config.http_max_connections,
+        max_keepalive_connections=config.http_max_keepalive_connections,
+        keepalive_expiry=config.http_keepalive_expiry,
+        http2=config.http2,
+        dns_cache=dns_cache,
+        tls_sessions=tls_sessions,
+        warm_connections=config.http_warm_connections,
+        keep_warm_interval=config.http_keep_warm_interval,
+    )
+
     # Create IP fetchers for all strategies from config
-    fetchers = create_fetchers(config)
+    fetchers = create_fetchers(config, http_pool)
     fether_names = (f.get_name() for f in fetchers)
     logger.info(f"IP fetchers initialized with strategies: {', '.join(fether_names)}")
 
+    # Resolve provider hostnames at startup
+    provider_urls = [url for fetcher in fetchers if (url := fetcher.get_url())]
+    if dns_cache:
+        dns_cache.watch(host for url in provider_urls if (host := urlsplit(url).hostname))
+
     # Create orchestrator for parallel fetching
-    orchestrator = ParallelFetchOrchestrator(fetchers)
-    logger.info(f"Parallel fetch orchestrator created with {len(fetchers)} fetchers")
+    policy = FetchPolicy.parse(config.fetch_policy)
+    hedging = (
+        HedgePolicy(
+            percentile=config.hedge_percentile,
+            max_hedges=config.hedge_max,
+            min_samples=config.hedge_min_samples,
+        )
+        if config.hedge_max > 0
+        else None
+    )
+    ranking = (
+        ProviderScorer(alpha=config.ranking_alpha, probe_interval=config.ranking_probe_interval)
+        if config.ranking_enabled
+        else None
+    )
+    circuit_breaker = (
+        CircuitBreaker(
+            failure_threshold=config.circuit_breaker_threshold,
+            cooldown=config.circuit_breaker_cooldown,
+        )
+        if config.circuit_breaker_threshold > 0
+        else None
+    )
+    timeouts = (
+        TimeoutPolicy(
+            percentile=config.timeout_percentile,
+            factor=config.timeout_factor,
+            floor=config.timeout_floor,
+            ceiling=config.timeout_ceiling,
+            min_samples=config.timeout_min_samples,
+            adaptive=config.adaptive_timeouts,
+            overrides=config.provider_timeouts,
+        )
+        if config.adaptive_timeouts or config.provider_timeouts
+        else None
+    )
+    retry = (
+        RetryPolicy(
+            max_retries=config.retry_max,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+        )
+        if config.retry_max > 0
+        else None
+    )
+    rate_limiter = (
+        RateLimiter(
+            rate=config.rate_limit_per_second,
+            burst=config.rate_limit_burst,
+            default_backoff=config.rate_limit_default_backoff,
+        )
+        if config.rate_limit_enabled
+        else None
+    )
+    access = AccessList(config.telegram_owner_id, config.access_list)
+    authorization = AuthorizationFilter(access, log_interval=config.unauthorized_log_interval)
+    metrics = FetchMetrics(tls_sessions=tls_sessions, authorization=authorization)
+    orchestrator = ParallelFetchOrchestrator(
+        fetchers,
+        policy=policy,
+        hedging=hedging,
+        metrics=metrics,
+        ranking=ranking,
+        top_n=config.ranking_top_n,
+        circuit_breaker=circuit_breaker,
+        deadline=config.fetch_deadline or None,
+        timeouts=timeouts,
+        retry=retry,
+        rate_limiter=rate_limiter,
+        max_concurrency=config.max_concurrent_fetches,
+    )
+    logger.info(
+        f"Parallel fetch orchestrator created with {len(fetchers)} fetchers "
+        f"(policy: {config.fetch_policy})"
+    )
+
+    # Open connections to providers the orchestrator may fetch from, within its limits
+    http_pool.keep_warm(
+        provider_urls,
+        admit=orchestrator.admit_warm,
+        limit=orchestrator.outbound,
+        on_response=orchestrator.observe_warm,
+    )
+
+    # Share in-flight fetches and serve recent results from memory
+    cached_orchestrator = CachedFetchOrchestrator(
+        orchestrator, ttl=config.cache_ttl, stale_ttl=config.cache_stale_ttl
+    )
 
     # Build application
-    application = ApplicationBuilder().token(config.telegram_token).build()
+    builder = (
+        ApplicationBuilder()
+        .token(config.telegram_token)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if config.telegram_base_url:
+        builder = builder.base_url(config.telegram_base_url)
+    if config.webhook_url or config.send_rate > 0:
+        builder = builder.post_stop(post_stop)
+    if config.concurrent_updates > 1:
+        builder = builder.concurrent_updates(
+            ChatOrderedUpdateProcessor(config.concurrent_updates)
+            if config.ordered_chat_updates
+            else config.concurrent_updates
+        )
+    application = builder.build()
 
     # Store config and orchestrator in bot_data for access in handlers
     application.bot_data["config"] = config
-    application.bot_data["orchestrator"] = orchestrator
+    application.bot_data["orchestrator"] = cached_orchestrator
+    application.bot_data["http_pool"] = http_pool
+    application.bot_data["metrics"] = metrics
+    application.bot_data["access"] = access
+    application.bot_data["authorization"] = authorization
+
+    # Limit how often each user can start a fetch
+    if config.user_fetches_per_minute > 0:
+        application.bot_data["user_limiter"] = RateLimiter(
+            rate=config.user_fetches_per_minute / 60, burst=config.user_fetch_burst
+        )
+
+    # Expose metrics over HTTP for Prometheus scraping
+    if config.metrics_port > 0:
+        application.bot_data["metrics_server"] = MetricsServer(
+            metrics, host=config.metrics_host, port=config.metrics_port
+        )
+
+    # Send replies and notifications within Telegram's send limits
+    send_queue = (
+        SendQueue(
+            rate=config.send_rate,
+            burst=config.send_burst,
+            chat_rate=config.send_chat_rate,
+            chat_burst=config.send_chat_burst,
+            max_retries=config.send_max_retries,
+        )
+        if config.send_rate > 0
+        else None
+    )
+    if send_queue:
+        application.bot_data["send_queue"] = send_queue
+
+    # Schedule background IP monitor
+    if config.monitor_interval > 0:
+        if application.job_queue is None:
+            logger.warning(
+                "IP monitor disabled: install 'python-telegram-bot[job-queue]' to use it"
+            )
+        else:
+            monitor = IpMonitor(
+                cached_orchestrator,
+                owner_id=config.telegram_owner_id,
+                interval=config.monitor_interval,
+                debounce=config.monitor_debounce,
+                notify_ids=config.monitor_notify_ids,
+                send_queue=send_queue,
+            )
+            monitor.schedule(application.job_queue)
+            application.bot_data["monitor"] = monitor
 
-    # Register command handlers
-    setup_handlers(application)
+    # Register command handlers, behind the coalescer of stale updates
+    backlog = (
+        BacklogCoalescer(config.backlog_max_age, policy=config.backlog_policy)
+        if config.backlog_max_age > 0
+        else None
+    )
+    setup_handlers(application, authorization, silent=config.unauthorized_silent, backlog=backlog)
 
     return application
 
@@ -48,16 +322,25 @@ def build_application() -> Application:
 def main() -> None:
     """Run the Telegram bot application.
 
-    This is the main entry point that starts the bot using long polling.
+    This is the main entry point that starts the bot using long polling, or
+    a webhook server when WEBHOOK_URL is configured.
     """
     logger.info("Starting Telegram IP Bot...")
 
     # Build the application
     application = build_application()
+    config: BotConfig = application.bot_data["config"]
 
-    # Start polling
+    # Receive updates pushed to the webhook, or poll for them
     logger.info("Bot is running. Press Ctrl+C to stop.")
-    application.run_polling()
+    if config.webhook_url:
+        logger.info(
+            f"Receiving updates on webhook {config.webhook_url} "
+            f"(listening on {config.webhook_listen}:{config.webhook_port})"
+        )
+        application.run_webhook(**webhook_options(config))
+    else:
+        application.run_polling()
 
     logger.info("Bot shutdown complete")
 
@@ -0,0 +1,271 @@
+"""Per-provider fetch metrics with Prometheus text exposition."""
+
+import asyncio
+import logging
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from ipbot.auth import AuthorizationFilter
+from ipbot.fetchers.tls_sessions import TlsSessionCache
+from ipbot.latency import LatencyTracker
+from ipbot.result import FetchResult
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+
+
+@dataclass
+class ProviderStats:
+    """Summary of one provider's recent performance.
+
+    Attributes:
+        name: Provider name (from get_name()).
+        p50: Median latency in seconds over the recent window, None if unknown.
+        p95: 95th percentile latency in seconds, None if unknown.
+        p99: 99th percentile latency in seconds, None if unknown.
+        outcomes: Total fetch count per outcome ("success" or an error category).
+    """
+
+    name: str
+    p50: float | None
+    p95: float | None
+    p99: float | None
+    outcomes: dict[str, int]
+
+
+class FetchMetrics:
+    """Collects latency histograms and outcome counters for each provider.
+
+    Outcomes are "success" or the error category from the orchestrator
+    ("Timeout", "Network error", ...). Durations are per attempt; retries and
+    hedged requests are counted separately. Aggregated results are counted as
+    consensus, conflict or no answer. If the HTTP pool resumes TLS sessions,
+    its full and resumed handshake counts are exported as well, and so are
+    the updates rejected by the authorization filter.
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(
+        self,
+        window: int = 1000,
+        tls_sessions: TlsSessionCache | None = None,
+        authorization: AuthorizationFilter | None = None,
+    ):
+        """Initialize empty metrics.
+
+        Args:
+            window: Number of recent samples used for percentile summaries.
+            tls_sessions: TLS session cache whose handshake counters are exported.
+            authorization: Authorization filter whose rejections are exported.
+        """
+        self.tls_sessions = tls_sessions
+        self.authorization = authorization
+        self.latency = LatencyTracker(window=window)
+        self._buckets: defaultdict[str, list[int]] = defaultdict(lambda: [0] * len(self.BUCKETS))
+        self._duration_sum: defaultdict[str, float] = defaultdict(float)
+        self._duration_count: Counter[str] = Counter()
+        self._outcomes: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self._retries: Counter[str] = Counter()
+        self._hedges: Counter[str] = Counter()
+        self._results: Counter[str] = Counter()
+
+    def observe_fetch(
+        self, name: str, seconds: float, outcome: str, retries: int = 0, hedges: int = 0
+    ) -> None:
+        """Record one completed provider fetch.
+
+        Args:
+            name: Provider name.
+            seconds: Duration of the fetch's last attempt in seconds.
+            outcome: "success" or the error category.
+            retries: Retries the fetch made.
+            hedges: Hedged requests the fetch made.
+        """
+        self.latency.record(name, seconds)
+        buckets = self._buckets[name]
+        for i, upper_bound in enumerate(self.BUCKETS):
+            if seconds <= upper_bound:
+                buckets[i] += 1
+        self._duration_sum[name] += seconds
+        self._duration_count[name] += 1
+        self._outcomes[name][outcome] += 1
+        self._retries[name] += retries
+        self._hedges[name] += hedges
+
+    def observe_result(self, result: FetchResult) -> None:
+        """Record the outcome of an aggregated fetch.
+
+        Args:
+            result: The FetchResult returned by the orchestrator.
+        """
+        if result.has_conflicts:
+            self._results["conflict"] += 1
+        if result.consensus_ip is not None:
+            self._results["consensus"] += 1
+        elif not result.has_conflicts:
+            self._results["no_answer"] += 1
+
+    def provider_stats(self) -> list[ProviderStats]:
+        """Return latency percentiles and outcome counts per provider.
+
+        Returns:
+            One ProviderStats per provider, in the order they were first seen.
+        """
+        return [
+            ProviderStats(
+                name=name,
+                p50=self.latency.percentile(name, 0.50),
+                p95=self.latency.percentile(name, 0.95),
+                p99=self.latency.percentile(name, 0.99),
+                outcomes=dict(outcomes),
+            )
+            for name, outcomes in self._outcomes.items()
+        ]
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics document.
+        """
+        lines = [
+            "# HELP ipbot_fetch_duration_seconds Duration of provider fetches.",
+            "# TYPE ipbot_fetch_duration_seconds histogram",
+        ]
+        for name, buckets in self._buckets.items():
+            provider = _escape(name)
+            for upper_bound, count in zip(self.BUCKETS, buckets, strict=True):
+                lines.append(
+                    f'ipbot_fetch_duration_seconds_bucket{{provider="{provider}",'
+                    f'le="{upper_bound}"}} {count}'
+                )
+            total = self._duration_count[name]
+            lines.append(
+                f'ipbot_fetch_duration_seconds_bucket{{provider="{provider}",le="+Inf"}} {total}'
+            )
+            lines.append(
+                f'ipbot_fetch_duration_seconds_sum{{provider="{provider}"}} '
+                f"{self._duration_sum[name]}"
+            )
+            lines.append(f'ipbot_fetch_duration_seconds_count{{provider="{provider}"}} {total}')
+
+        lines.append("# HELP ipbot_fetch_total Provider fetches by outcome.")
+        lines.append("# TYPE ipbot_fetch_total counter")
+        for name, outcomes in self._outcomes.items():
+            for outcome, count in outcomes.items():
+                lines.append(
+                    f'ipbot_fetch_total{{provider="{_escape(name)}",'
+                    f'outcome="{_label(outcome)}"}} {count}'
+                )
+
+        lines.append("# HELP ipbot_fetch_retries_total Retries of provider fetches.")
+        lines.append("# TYPE ipbot_fetch_retries_total counter")
+        for name in self._outcomes:
+            lines.append(
+                f'ipbot_fetch_retries_total{{provider="{_escape(name)}"}} {self._retries[name]}'
+            )
+
+        lines.append("# HELP ipbot_fetch_hedges_total Hedged requests to providers.")
+        lines.append("# TYPE ipbot_fetch_hedges_total counter")
+        for name in self._outcomes:
+            lines.append(
+                f'ipbot_fetch_hedges_total{{provider="{_escape(name)}"}} {self._hedges[name]}'
+            )
+
+        lines.append("# HELP ipbot_fetch_results_total Aggregated fetch results.")
+        lines.append("# TYPE ipbot_fetch_results_total counter")
+        for result_type in ("consensus", "conflict", "no_answer"):
+            lines.append(
+                f'ipbot_fetch_results_total{{result="{result_type}"}} {self._results[result_type]}'
+            )
+
+        if self.tls_sessions:
+            lines.append("# HELP ipbot_tls_handshakes_total TLS handshakes by type.")
+            lines.append("# TYPE ipbot_tls_handshakes_total counter")
+            lines.append(
+                f'ipbot_tls_handshakes_total{{type="full"}} {self.tls_sessions.full_handshakes}'
+            )
+            lines.append(
+                f'ipbot_tls_handshakes_total{{type="resumed"}} '
+                f"{self.tls_sessions.resumed_handshakes}"
+            )
+
+        if self.authorization:
+            lines.append("# HELP ipbot_unauthorized_updates_total Updates from unauthorized users.")
+            lines.append("# TYPE ipbot_unauthorized_updates_total counter")
+            lines.append(f"ipbot_unauthorized_updates_total {self.authorization.rejected}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Minimal HTTP server exposing FetchMetrics at /metrics."""
+
+    def __init__(self, metrics: FetchMetrics, host: str = "127.0.0.1", port: int = 9100):
+        """Initialize the server without binding.
+
+        Args:
+            metrics: Metrics to expose.
+            host: Address to listen on.
+            port: TCP port to listen on. 0 picks a free port.
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """Start listening for scrape requests."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve a single HTTP request."""
+        try:
+            request_line = await reader.readline()
+            # Drain request headers
+            while (await reader.readline()).strip():
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = self.metrics.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not found\n"
+
+            header = (
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(header.encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label(outcome: str) -> str:
+    """Convert an outcome category such as "Network error" to "network_error"."""
+    return re.sub(r"[^a-z0-9]+", "_", outcome.lower()).strip("_")
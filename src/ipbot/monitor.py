@@ -0,0 +1,140 @@
+"""Background IP monitor that notifies the owner when the public IP changes."""
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from functools import partial
+
+from telegram.error import TelegramError
+from telegram.ext import ContextTypes, JobQueue
+
+from ipbot.cache import CachedFetchOrchestrator
+from ipbot.formatter import ResultFormatter
+from ipbot.result import FetchResult
+from ipbot.send_queue import BULK, SendQueue
+
+logger = logging.getLogger(__name__)
+
+
+class IpMonitor:
+    """Periodically fetches the public IP and tracks consensus changes.
+
+    The latest FetchResult is kept in memory so /ip can answer without
+    waiting on providers. The owner is notified only after a new consensus
+    IP has been observed on `debounce` consecutive checks, so short flaps
+    between addresses do not produce messages. Notifications also go to the
+    `notify_ids` chats; with a send queue they are sent as bulk messages
+    within Telegram's send limits instead of one after another.
+    """
+
+    JOB_NAME = "ip_monitor"
+
+    def __init__(
+        self,
+        orchestrator: CachedFetchOrchestrator,
+        owner_id: int,
+        interval: float,
+        debounce: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        notify_ids: Iterable[int] = (),
+        send_queue: SendQueue | None = None,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            orchestrator: Orchestrator used for the periodic fetches.
+            owner_id: Telegram chat ID that receives change notifications.
+            interval: Seconds between checks.
+            debounce: Consecutive checks a new IP must be seen before notifying.
+            clock: Monotonic time source, replaceable in tests.
+            notify_ids: Further Telegram chat IDs that receive change notifications.
+            send_queue: Queue the notifications are sent through, None sends directly.
+        """
+        self.orchestrator = orchestrator
+        self.owner_id = owner_id
+        self.notify_ids = [owner_id, *(i for i in dict.fromkeys(notify_ids) if i != owner_id)]
+        self.send_queue = send_queue
+        self.interval = interval
+        self.debounce = max(1, debounce)
+        self._clock = clock
+        self.current_ip: str | None = None
+        self._latest: FetchResult | None = None
+        self._checked_at = 0.0
+        self._candidate_ip: str | None = None
+        self._candidate_count = 0
+
+    def schedule(self, job_queue: JobQueue) -> None:
+        """Register the periodic check with the application's job queue.
+
+        Args:
+            job_queue: The Application's JobQueue.
+        """
+        job_queue.run_repeating(self.check, interval=self.interval, first=0, name=self.JOB_NAME)
+        logger.info(f"IP monitor scheduled every {self.interval}s (debounce: {self.debounce})")
+
+    def get_recent(self) -> FetchResult | None:
+        """Return the latest monitored result if it is recent and has a consensus IP.
+
+        Returns:
+            The latest FetchResult, or None if it is missing or older than two intervals.
+        """
+        if self._latest is None or self._latest.consensus_ip is None:
+            return None
+        if self._clock() - self._checked_at > 2 * self.interval:
+            return None
+        return self._latest
+
+    async def check(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Fetch the current IP and notify the owner and the other chats if it changed.
+
+        Args:
+            context: The job callback context.
+        """
+        result = await self.orchestrator.fetch_all(fresh=True)
+        self._latest = result
+        self._checked_at = self._clock()
+
+        ip_address = result.consensus_ip
+        if ip_address is None:
+            # No reliable answer, keep the current state
+            return
+
+        if self.current_ip is None:
+            # First observation establishes the baseline without notifying
+            self.current_ip = ip_address
+            logger.info(f"IP monitor baseline: {ip_address}")
+            return
+
+        if ip_address == self.current_ip:
+            self._candidate_ip = None
+            self._candidate_count = 0
+            return
+
+        if ip_address == self._candidate_ip:
+            self._candidate_count += 1
+        else:
+            self._candidate_ip = ip_address
+            self._candidate_count = 1
+
+        if self._candidate_count < self.debounce:
+            return
+
+        previous_ip = self.current_ip
+        self.current_ip = ip_address
+        self._candidate_ip = None
+        self._candidate_count = 0
+
+        logger.info(f"IP address changed from {previous_ip} to {ip_address}")
+        message = ResultFormatter().format_change(previous_ip, result)
+        for chat_id in self.notify_ids:
+            if self.send_queue is None:
+                try:
+                    await context.bot.send_message(chat_id=chat_id, text=message)
+                except TelegramError as e:
+                    logger.warning(f"Failed to notify chat {chat_id}: {e}")
+                continue
+            # Failures are logged by the queue, the check does not wait for the fan-out
+            sent = self.send_queue.submit(
+                chat_id, partial(context.bot.send_message, chat_id=chat_id, text=message), BULK
+            )
+            sent.add_done_callback(lambda f: f.cancelled() or f.exception())
@@ -1,72 +1,457 @@
 """Orchestrator for parallel IP fetching from multiple sources."""
 
 import asyncio
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass, field, replace
+from functools import partial
+from urllib.parse import urlsplit
 
+import httpx
+
+from ipbot.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
 from ipbot.fetchers.base import FetchStrategy
-from ipbot.fetchers.exceptions import FetcherHTTPError, FetcherParsingError
+from ipbot.fetchers.exceptions import (
+    FetcherHTTPError,
+    FetcherParsingError,
+    FetcherRateLimitedError,
+    FetcherTimeoutError,
+)
+from ipbot.fetchers.http_fetcher import parse_retry_after
+from ipbot.hedging import HedgeBudget, HedgePolicy, hedged_call
+from ipbot.latency import LatencyTracker
+from ipbot.metrics import SUCCESS, FetchMetrics
+from ipbot.policy import FetchPolicy, PolicyMode
+from ipbot.ranking import ProviderScorer
+from ipbot.rate_limit import ProviderThrottledError, RateLimiter
 from ipbot.result import FetcherResult, FetchResult
+from ipbot.retry import RetryPolicy, retry_call
+from ipbot.timeouts import TimeoutPolicy
+
+
+@dataclass
+class _Request:
+    """State shared by the fetches of one fetch_all() call.
+
+    Attributes:
+        budget: Hedge budget of the request.
+        deadline_at: Event loop time at which unfinished fetchers are
+                     cancelled, None without a deadline.
+        retries: Retries made per fetcher name.
+        hedges: Hedged requests made per fetcher name.
+        latency: Seconds of the latest attempt per fetcher name. When a hedged
+                 attempt succeeds, the latency of the request that answered.
+        on_result: Called with each fetcher's result as soon as it completes.
+        expired: Set when the deadline has passed, before unfinished fetches
+                 are cancelled, so those are recorded as failures.
+    """
+
+    budget: HedgeBudget
+    deadline_at: float | None
+    retries: Counter[str] = field(default_factory=Counter)
+    hedges: Counter[str] = field(default_factory=Counter)
+    latency: dict[str, float] = field(default_factory=dict)
+    on_result: Callable[[FetcherResult], None] | None = None
+    expired: bool = False
+
+    def remaining(self) -> float | None:
+        """Return the seconds left until the deadline, or None without a deadline."""
+        if self.deadline_at is None:
+            return None
+        return max(0.0, self.deadline_at - asyncio.get_running_loop().time())
+
+
+async def stream_fetch(
+    start: Callable[[Callable[[FetcherResult], None]], asyncio.Future[FetchResult]],
+) -> AsyncIterator[FetcherResult | FetchResult]:
+    """Yield the fetcher results of a fetch as they complete, then its FetchResult.
+
+    Args:
+        start: Starts the fetch, passing each completed fetcher result to the
+               given callback, and returns the future of the aggregated result.
+
+    Yields:
+        Each completed FetcherResult, followed by the aggregated FetchResult.
+
+    Raises:
+        Exception: Any exception raised by the fetch.
+    """
+    queue: asyncio.Queue[FetcherResult | asyncio.Future[FetchResult]] = asyncio.Queue()
+    fetch = start(queue.put_nowait)
+    fetch.add_done_callback(queue.put_nowait)
+    while True:
+        item = await queue.get()
+        if isinstance(item, FetcherResult):
+            yield item
+        else:
+            yield item.result()
+            return
 
 
 class ParallelFetchOrchestrator:
     """Orchestrates parallel IP fetching from multiple fetcher strategies.
 
-    This class runs all configured fetchers in parallel, collects their results,
-    and determines consensus by comparing successful fetcher outputs.
+    This class runs the configured fetchers according to a FetchPolicy, collects
+    their results, and determines consensus by comparing successful fetcher outputs.
     """
 
-    def __init__(self, fetchers: list[FetchStrategy]):
+    def __init__(
+        self,
+        fetchers: list[FetchStrategy],
+        policy: FetchPolicy | None = None,
+        hedging: HedgePolicy | None = None,
+        latency: LatencyTracker | None = None,
+        metrics: FetchMetrics | None = None,
+        ranking: ProviderScorer | None = None,
+        top_n: int = 0,
+        circuit_breaker: CircuitBreaker | None = None,
+        deadline: float | None = None,
+        timeouts: TimeoutPolicy | None = None,
+        retry: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_concurrency: int = 0,
+    ):
         """Initialize the orchestrator with a list of fetcher strategies.
 
         Args:
             fetchers: List of FetchStrategy instances to run in parallel.
+            policy: Fetch policy to apply. Defaults to waiting for all fetchers.
+            hedging: Hedge slow fetches with a duplicate request. Disabled if None.
+            latency: Tracker receiving successful fetch latencies. A new one is
+                     created if not given.
+            metrics: Collector for per-provider latency and outcome metrics.
+            ranking: Scorer used to query the best providers first. If None,
+                     fetchers run in configured order.
+            top_n: With ranking, only query the N best providers plus any due
+                   for a probe. 0 queries all providers.
+            circuit_breaker: Breaker that skips providers failing repeatedly.
+                             Disabled if None.
+            deadline: Default end-to-end budget of fetch_all() in seconds.
+                      No deadline if None.
+            timeouts: Per-provider timeouts applied around each fetch. If None,
+                      only the strategies' own timeouts apply.
+            retry: Retry transient network failures with backoff. Disabled if None.
+            rate_limiter: Per-provider rate limiter. Throttled providers are
+                          skipped, and ranked last with ranking. Disabled if None.
+            max_concurrency: Maximum outbound fetches in flight at once, hedges
+                             included. 0 means unlimited.
         """
         self.fetchers = fetchers
+        self.policy = policy or FetchPolicy()
+        self.hedging = hedging
+        self.latency = latency or LatencyTracker()
+        self.metrics = metrics
+        self.ranking = ranking
+        self.top_n = top_n
+        self.circuit_breaker = circuit_breaker
+        self.deadline = deadline
+        self.timeouts = timeouts
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self._outbound = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
 
-    async def fetch_all(self) -> FetchResult:
-        """Execute all fetchers in parallel and aggregate results.
+    async def fetch_all(
+        self,
+        deadline: float | None = None,
+        on_result: Callable[[FetcherResult], None] | None = None,
+    ) -> FetchResult:
+        """Execute fetchers according to the policy and aggregate results.
 
-        Runs all fetchers concurrently, categorizes results and errors,
-        and determines consensus IP by comparing successful results.
+        Runs fetchers, categorizes results and errors, and determines consensus
+        IP by comparing successful results. Fetchers cancelled or never started
+        because the policy was already satisfied or they ranked below the top N
+        are reported as skipped. Results are always in configured order.
+
+        Args:
+            deadline: End-to-end budget in seconds. Fetchers still running when
+                      it runs out are cancelled and reported as "Deadline
+                      exceeded". Defaults to the orchestrator's deadline.
+            on_result: Called with each fetcher's result as soon as the fetcher
+                       completes. Fetchers that are skipped or cancelled are
+                       not reported.
 
         Returns:
             FetchResult containing all individual results, consensus IP,
             and conflict status.
         """
-        # Run all fetchers in parallel, capturing exceptions
-        results_or_exceptions = await asyncio.gather(
-            *[self._fetch_with_name(fetcher) for fetcher in self.fetchers],
-            return_exceptions=True,
+        if deadline is None:
+            deadline = self.deadline
+        request = _Request(
+            budget=HedgeBudget(self.hedging.max_hedges if self.hedging else 0),
+            deadline_at=(
+                None if deadline is None else asyncio.get_running_loop().time() + deadline
+            ),
+            on_result=on_result,
         )
+        active = self._select_fetchers()
 
-        # Process results
-        fetcher_results = []
-        successful_ips = []
-
-        for i, result_or_exception in enumerate(results_or_exceptions):
-            fetcher = self.fetchers[i]
-            fetcher_name = fetcher.get_name()
-
-            if isinstance(result_or_exception, Exception):
-                # Fetcher failed
-                error_type = self._categorize_error(result_or_exception)
-                fetcher_results.append(
-                    FetcherResult(
-                        fetcher_name=fetcher_name,
-                        success=False,
-                        error_type=error_type,
-                    )
-                )
-            else:
-                # Fetcher succeeded
-                ip_address = result_or_exception
-                fetcher_results.append(
-                    FetcherResult(
-                        fetcher_name=fetcher_name,
-                        success=True,
-                        ip=ip_address,
-                    )
+        if self.policy.mode == PolicyMode.FALLBACK:
+            active_results = await self._fetch_sequential(active, request)
+        elif self.policy.required_agreement is None:
+            active_results = await self._fetch_parallel(active, request)
+        else:
+            active_results = await self._fetch_until_agreement(
+                active, self.policy.required_agreement, request
+            )
+
+        results_by_fetcher = {
+            fetcher: replace(fetcher_result, retries=request.retries[fetcher.get_name()])
+            for fetcher, fetcher_result in zip(active, active_results, strict=True)
+        }
+        fetcher_results = [
+            results_by_fetcher.get(fetcher) or self._skipped_result(fetcher, "Skipped (low rank)")
+            for fetcher in self.fetchers
+        ]
+
+        result = self._build_result(fetcher_results)
+        if self.metrics:
+            self.metrics.observe_result(result)
+        return result
+
+    async def fetch_iter(
+        self, deadline: float | None = None
+    ) -> AsyncIterator[FetcherResult | FetchResult]:
+        """Fetch like fetch_all(), yielding each fetcher's result as it completes.
+
+        Closing the iterator early cancels the fetch.
+
+        Args:
+            deadline: End-to-end budget in seconds. Defaults to the
+                      orchestrator's deadline.
+
+        Yields:
+            The FetcherResult of each fetcher as soon as it completes, in
+            completion order, followed by the aggregated FetchResult.
+        """
+        fetch: asyncio.Task[FetchResult] | None = None
+
+        def start(on_result: Callable[[FetcherResult], None]) -> asyncio.Task[FetchResult]:
+            nonlocal fetch
+            fetch = asyncio.create_task(self.fetch_all(deadline, on_result=on_result))
+            return fetch
+
+        try:
+            async for item in stream_fetch(start):
+                yield item
+        finally:
+            if fetch is not None and not fetch.done():
+                fetch.cancel()
+
+    def _select_fetchers(self) -> list[FetchStrategy]:
+        """Return the fetchers to query for this request, best ranked first.
+
+        Returns:
+            All fetchers in configured order without ranking, otherwise the
+            fetchers ordered by score and limited to the top N plus those due
+            for a probe.
+        """
+        if self.ranking is None:
+            return self.fetchers
+
+        ranking = self.ranking
+        limiter = self.rate_limiter
+        names = [fetcher.get_name() for fetcher in self.fetchers]
+        position = {name: index for index, name in enumerate(ranking.rank(names))}
+
+        def sort_key(fetcher: FetchStrategy) -> tuple[bool, int]:
+            name = fetcher.get_name()
+            throttled = limiter is not None and limiter.is_throttled(name)
+            return throttled, position[name]
+
+        ranked = sorted(self.fetchers, key=sort_key)
+        if self.top_n <= 0:
+            return ranked
+
+        return [
+            fetcher
+            for position, fetcher in enumerate(ranked)
+            if position < self.top_n or ranking.needs_probe(fetcher.get_name())
+        ]
+
+    async def _fetch_parallel(
+        self, fetchers: list[FetchStrategy], request: _Request
+    ) -> list[FetcherResult]:
+        """Run fetchers concurrently and wait for every one of them.
+
+        Args:
+            fetchers: Fetchers to run.
+            request: State of this fetch_all() call.
+
+        Returns:
+            One FetcherResult per fetcher, in the given order.
+        """
+        if not fetchers:
+            return []
+
+        tasks = [self._start_fetch(fetcher, request) for fetcher in fetchers]
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=request.remaining())
+            request.expired = bool(pending)
+        finally:
+            await self._cancel_pending(tasks)
+
+        return [
+            self._task_result(fetcher, task, "Deadline exceeded")
+            for fetcher, task in zip(fetchers, tasks, strict=True)
+        ]
+
+    async def _fetch_until_agreement(
+        self,
+        fetchers: list[FetchStrategy],
+        required: int,
+        request: _Request,
+    ) -> list[FetcherResult]:
+        """Run fetchers concurrently until `required` of them agree on an IP.
+
+        Fetchers still running once agreement is reached or the deadline
+        passes are cancelled.
+
+        Args:
+            fetchers: Fetchers to run.
+            required: Number of identical successful answers needed.
+            request: State of this fetch_all() call.
+
+        Returns:
+            One FetcherResult per fetcher, in the given order.
+        """
+        tasks = {
+            self._start_fetch(fetcher, request): index for index, fetcher in enumerate(fetchers)
+        }
+        fetcher_results: list[FetcherResult | None] = [None] * len(fetchers)
+        votes: Counter[str] = Counter()
+        pending = set(tasks)
+        reason = "Cancelled"
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=request.remaining(),
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-                successful_ips.append(ip_address)
+                if not done:
+                    reason = "Deadline exceeded"
+                    request.expired = True
+                    break
+
+                for task in done:
+                    index = tasks[task]
+                    fetcher_result = self._task_result(fetchers[index], task, reason)
+                    fetcher_results[index] = fetcher_result
+                    if fetcher_result.success and fetcher_result.ip:
+                        votes[fetcher_result.ip] += 1
+
+                if votes and votes.most_common(1)[0][1] >= required:
+                    break
+        finally:
+            await self._cancel_pending(pending)
+
+        return [
+            fetcher_result if fetcher_result else self._skipped_result(fetchers[index], reason)
+            for index, fetcher_result in enumerate(fetcher_results)
+        ]
+
+    async def _fetch_sequential(
+        self, fetchers: list[FetchStrategy], request: _Request
+    ) -> list[FetcherResult]:
+        """Try fetchers one at a time in the given order until one succeeds.
+
+        Args:
+            fetchers: Fetchers to try, in order.
+            request: State of this fetch_all() call.
+
+        Returns:
+            One FetcherResult per fetcher, in the given order. Fetchers after
+            the first success are reported as skipped, fetchers not finished
+            by the deadline as "Deadline exceeded".
+        """
+        fetcher_results = []
+        skip_reason = None
+
+        for fetcher in fetchers:
+            if skip_reason:
+                fetcher_results.append(self._skipped_result(fetcher, skip_reason))
+                continue
+
+            task = self._start_fetch(fetcher, request)
+            try:
+                done, _ = await asyncio.wait({task}, timeout=request.remaining())
+                request.expired = not done
+            finally:
+                await self._cancel_pending([task])
+
+            fetcher_result = self._task_result(fetcher, task, "Deadline exceeded")
+            fetcher_results.append(fetcher_result)
+            if fetcher_result.success:
+                skip_reason = "Skipped"
+            elif task.cancelled():
+                skip_reason = "Deadline exceeded"
+
+        return fetcher_results
+
+    def _start_fetch(self, fetcher: FetchStrategy, request: _Request) -> asyncio.Task[str]:
+        """Start a fetch task that reports its result to the request's callback.
+
+        Args:
+            fetcher: The fetcher strategy to execute.
+            request: State of this fetch_all() call.
+
+        Returns:
+            The started task.
+        """
+        task = asyncio.create_task(self._fetch_with_name(fetcher, request))
+        on_result = request.on_result
+        if on_result is not None:
+
+            def report(task: asyncio.Task[str]) -> None:
+                if not task.cancelled():
+                    fetcher_result = self._task_result(fetcher, task, "Cancelled")
+                    on_result(replace(fetcher_result, retries=request.retries[fetcher.get_name()]))
+
+            task.add_done_callback(report)
+        return task
+
+    async def _cancel_pending(self, tasks: Iterable[asyncio.Task[str]]) -> None:
+        """Cancel unfinished fetch tasks and wait until they have stopped."""
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def _task_result(
+        self, fetcher: FetchStrategy, task: asyncio.Task[str], cancelled_reason: str
+    ) -> FetcherResult:
+        """Convert a finished fetch task into a FetcherResult.
+
+        Args:
+            fetcher: The fetcher the task ran.
+            task: The finished task.
+            cancelled_reason: Skip reason reported if the task was cancelled.
+
+        Returns:
+            The corresponding FetcherResult.
+        """
+        if task.cancelled():
+            return self._skipped_result(fetcher, cancelled_reason)
+        exception = task.exception()
+        return self._to_fetcher_result(fetcher, exception if exception else task.result())
+
+    def _build_result(self, fetcher_results: list[FetcherResult]) -> FetchResult:
+        """Determine consensus over the collected fetcher results.
+
+        With an agreement-based policy, the IP reported by at least the required
+        number of fetchers is the consensus even if another fetcher disagreed.
+        Otherwise all successful fetchers must agree.
+
+        Args:
+            fetcher_results: Results for each fetcher.
+
+        Returns:
+            The aggregated FetchResult.
+        """
+        successful_ips = [r.ip for r in fetcher_results if r.success and r.ip]
 
         # Determine consensus
         consensus_ip = None
@@ -74,13 +459,14 @@ class ParallelFetchOrchestrator:
 
         if successful_ips:
             # Check if all successful IPs are the same
-            unique_ips = set(successful_ips)
-            if len(unique_ips) == 1:
-                # All successful fetchers agree
-                consensus_ip = successful_ips[0]
-            else:
+            votes = Counter(successful_ips)
+            top_ip, top_votes = votes.most_common(1)[0]
+            required = self.policy.required_agreement
+            if len(votes) > 1:
                 # Conflicting IPs
                 has_conflicts = True
+            if len(votes) == 1 or (required is not None and top_votes >= required):
+                consensus_ip = top_ip
 
         return FetchResult(
             results=fetcher_results,
@@ -88,24 +474,291 @@ class ParallelFetchOrchestrator:
             has_conflicts=has_conflicts,
         )
 
-    async def _fetch_with_name(self, fetcher: FetchStrategy) -> str:
+    def _to_fetcher_result(
+        self, fetcher: FetchStrategy, result_or_exception: str | BaseException
+    ) -> FetcherResult:
+        """Convert a fetcher outcome into a FetcherResult.
+
+        Args:
+            fetcher: The fetcher that produced the outcome.
+            result_or_exception: The IP address or the exception raised.
+
+        Returns:
+            The corresponding FetcherResult.
+        """
+        fetcher_name = fetcher.get_name()
+
+        if isinstance(result_or_exception, BaseException):
+            # Fetcher failed or was short-circuited
+            return FetcherResult(
+                fetcher_name=fetcher_name,
+                success=False,
+                error_type=self._categorize_error(result_or_exception),
+                skipped=isinstance(result_or_exception, CircuitOpenError | ProviderThrottledError),
+            )
+
+        # Fetcher succeeded
+        return FetcherResult(fetcher_name=fetcher_name, success=True, ip=result_or_exception)
+
+    def _skipped_result(self, fetcher: FetchStrategy, reason: str) -> FetcherResult:
+        """Build the result for a fetcher that was not run to completion.
+
+        Args:
+            fetcher: The skipped fetcher.
+            reason: Why the fetcher was skipped ("Skipped", "Cancelled", etc.).
+
+        Returns:
+            A FetcherResult marked as skipped.
+        """
+        return FetcherResult(
+            fetcher_name=fetcher.get_name(), success=False, error_type=reason, skipped=True
+        )
+
+    @property
+    def outbound(self) -> asyncio.Semaphore | None:
+        """Semaphore bounding outbound requests, None if they are unlimited."""
+        return self._outbound
+
+    def admit_warm(self, url: str) -> bool:
+        """Return True if a connection warming request may be sent to a provider URL now.
+
+        Providers whose circuit is not closed or that are rate limited get no
+        warming requests, so warming neither probes a failing provider nor
+        adds to the traffic of one that asked us to back off. An admitted
+        request takes a rate limit token like a fetch.
+
+        Args:
+            url: Provider URL registered for connection warming.
+        """
+        limiter = self.rate_limiter
+        return any(
+            self._available(name) and (limiter is None or limiter.try_acquire(name))
+            for name in self._names_at(url)
+        )
+
+    def observe_warm(self, url: str, response: httpx.Response) -> None:
+        """Throttle the providers at a URL that answered a warming request with 429.
+
+        Args:
+            url: Provider URL the warming request was sent to.
+            response: The provider's response.
+        """
+        if self.rate_limiter is None or response.status_code != httpx.codes.TOO_MANY_REQUESTS:
+            return
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        for name in self._names_at(url):
+            self.rate_limiter.throttle(name, retry_after)
+
+    def _names_at(self, url: str) -> list[str]:
+        """Return the names of the fetchers querying the same origin as a URL."""
+        origin = urlsplit(url)[:2]
+        return [
+            fetcher.get_name()
+            for fetcher in self.fetchers
+            if (fetcher_url := fetcher.get_url()) and urlsplit(fetcher_url)[:2] == origin
+        ]
+
+    def _available(self, fetcher_name: str) -> bool:
+        """Return True if a fetcher's circuit is closed and it is not rate limited."""
+        breaker = self.circuit_breaker
+        if breaker and breaker.state(fetcher_name) != CircuitState.CLOSED:
+            return False
+        return not (self.rate_limiter and self.rate_limiter.is_throttled(fetcher_name))
+
+    async def _fetch_with_name(self, fetcher: FetchStrategy, request: _Request) -> str:
         """Fetch IP from a single fetcher.
 
-        This wrapper method exists to allow proper exception propagation
-        in asyncio.gather.
+        Records the latency of successful fetches and, if metrics or ranking
+        are enabled, the duration and outcome of every completed fetch. The
+        duration is that of the last attempt, without retry backoff or the wait
+        before a hedge; retries and hedges are counted separately. With hedging enabled, a
+        fetch still running after the provider's observed latency percentile
+        is duplicated while the hedge budget allows it. With a circuit breaker,
+        providers whose circuit is open fail immediately without a request and
+        without using a rate limit token. Every request sent, retries and
+        hedges included, takes a token from the rate limiter; a fetch that
+        finds the provider throttled stops without being recorded. A fetch
+        cancelled by the request's deadline counts as a failure, one cancelled
+        because the policy was satisfied does not, but with ranking its
+        duration so far is still observed.
+        With a timeout policy, attempts exceeding the provider's timeout fail
+        with a TimeoutError. With a retry policy, transient network failures
+        are retried while the request's deadline allows it.
 
         Args:
             fetcher: The fetcher strategy to execute.
+            request: State of this fetch_all() call.
 
         Returns:
             The IP address as a string.
 
         Raises:
+            CircuitOpenError: If the provider's circuit is open.
+            ProviderThrottledError: If the provider is rate limited.
             Exception: Any exception raised by the fetcher.
         """
-        return await fetcher.get_ip()
+        fetcher_name = fetcher.get_name()
+        breaker = self.circuit_breaker
+        if breaker and not breaker.allow(fetcher_name):
+            raise CircuitOpenError(f"Circuit open for {fetcher_name}")
+
+        try:
+            if self.retry is None:
+                ip_address = await self._attempt(fetcher, request)
+            else:
+                ip_address = await retry_call(
+                    lambda: self._attempt(fetcher, request),
+                    self.retry,
+                    time_left=request.remaining,
+                    on_retry=lambda: request.retries.update([fetcher_name]),
+                )
+        except asyncio.CancelledError as e:
+            if request.expired:
+                self._record_outcome(fetcher_name, request, e)
+                raise
+            if breaker:
+                breaker.release(fetcher_name)
+            if self.ranking:
+                self.ranking.observe_cancelled(fetcher_name, request.latency.get(fetcher_name, 0.0))
+            raise
+        except ProviderThrottledError:
+            if breaker:
+                breaker.release(fetcher_name)
+            raise
+        except Exception as e:
+            self._record_outcome(fetcher_name, request, e)
+            raise
+
+        self._record_outcome(fetcher_name, request)
+        return ip_address
 
-    def _categorize_error(self, exception: Exception) -> str:
+    async def _attempt(self, fetcher: FetchStrategy, request: _Request) -> str:
+        """Make one fetch attempt, hedged and bounded by the provider's timeout.
+
+        The attempt's duration is stored in `request.latency` unless it succeeds,
+        in which case _get_ip() stores the duration of the request that answered.
+
+        Args:
+            fetcher: The fetcher strategy to execute.
+            request: State of this fetch_all() call.
+
+        Returns:
+            The IP address as a string.
+        """
+        fetcher_name = fetcher.get_name()
+        hedge_delay = self._hedge_delay(fetcher_name)
+        timeout = self.timeouts.timeout_for(fetcher_name, self.latency) if self.timeouts else None
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                if hedge_delay is None:
+                    return await self._get_ip(fetcher, request, timeout)
+                return await hedged_call(
+                    lambda: self._get_ip(fetcher, request, timeout),
+                    hedge_delay,
+                    request.budget,
+                    on_hedge=lambda: request.hedges.update([fetcher_name]),
+                )
+        except BaseException:
+            request.latency[fetcher_name] = time.perf_counter() - started
+            raise
+
+    async def _get_ip(
+        self, fetcher: FetchStrategy, request: _Request, timeout: float | None = None
+    ) -> str:
+        """Send one request to a provider, within the outbound concurrency limit.
+
+        The request takes a token from the provider's rate limit just before
+        it is sent. The latency of a successful request is stored in
+        `request.latency`, so a hedge that answers is not charged for the wait
+        before it started.
+
+        Args:
+            fetcher: The fetcher strategy to execute.
+            request: State of this fetch_all() call.
+            timeout: The provider's timeout from the timeout policy, passed on
+                     to the strategy so its HTTP timeout matches. None keeps
+                     the strategy's own timeout.
+
+        Returns:
+            The IP address as a string.
+
+        Raises:
+            ProviderThrottledError: If the provider is rate limited.
+        """
+        fetcher_name = fetcher.get_name()
+        get_ip = fetcher.get_ip if timeout is None else partial(fetcher.get_ip, timeout=timeout)
+        if self._outbound is None:
+            self._take_token(fetcher_name)
+            started = time.perf_counter()
+            ip_address = await get_ip()
+        else:
+            async with self._outbound:
+                self._take_token(fetcher_name)
+                started = time.perf_counter()
+                ip_address = await get_ip()
+        request.latency[fetcher_name] = time.perf_counter() - started
+        return ip_address
+
+    def _take_token(self, fetcher_name: str) -> None:
+        """Charge one request to the provider's rate limit.
+
+        Raises:
+            ProviderThrottledError: If the provider is rate limited.
+        """
+        if self.rate_limiter and not self.rate_limiter.try_acquire(fetcher_name):
+            raise ProviderThrottledError(f"{fetcher_name} is rate limited")
+
+    def _record_outcome(
+        self, fetcher_name: str, request: _Request, error: BaseException | None = None
+    ) -> None:
+        """Feed a completed fetch to the latency tracker, breaker, metrics and ranking.
+
+        Args:
+            fetcher_name: Name of the fetcher.
+            request: State of this fetch_all() call, with the fetch's last attempt
+                     duration and its retry and hedge counts.
+            error: The exception raised by the fetch, CancelledError if the
+                   deadline cut it, None on success.
+        """
+        elapsed = request.latency.get(fetcher_name, 0.0)
+        success = error is None
+        if success:
+            self.latency.record(fetcher_name, elapsed)
+        if self.circuit_breaker:
+            if success:
+                self.circuit_breaker.record_success(fetcher_name)
+            else:
+                self.circuit_breaker.record_failure(fetcher_name)
+        if self.rate_limiter and isinstance(error, FetcherRateLimitedError):
+            self.rate_limiter.throttle(fetcher_name, error.retry_after)
+        if self.metrics:
+            outcome = SUCCESS if error is None else self._categorize_error(error)
+            self.metrics.observe_fetch(
+                fetcher_name,
+                elapsed,
+                outcome,
+                retries=request.retries[fetcher_name],
+                hedges=request.hedges[fetcher_name],
+            )
+        if self.ranking:
+            self.ranking.observe(fetcher_name, elapsed, success=success)
+
+    def _hedge_delay(self, fetcher_name: str) -> float | None:
+        """Return how long to wait before hedging a fetcher, or None to not hedge.
+
+        Args:
+            fetcher_name: Name of the fetcher.
+
+        Returns:
+            The hedge delay in seconds, or None if hedging is disabled or there
+            are not enough latency samples yet.
+        """
+        if self.hedging is None or self.latency.count(fetcher_name) < self.hedging.min_samples:
+            return None
+        return self.latency.percentile(fetcher_name, self.hedging.percentile)
+
+    def _categorize_error(self, exception: BaseException) -> str:
         """Categorize an exception into a simple error type.
 
         Args:
@@ -114,14 +767,27 @@ class ParallelFetchOrchestrator:
         Returns:
             A simple error category string.
         """
-        # Check for timeout exceptions
-        if isinstance(exception, asyncio.TimeoutError):
+        if isinstance(exception, CircuitOpenError):
+            return "Skipped (circuit open)"
+
+        if isinstance(exception, ProviderThrottledError):
+            return "Skipped (rate limited)"
+
+        # Only fetches cut by the deadline are recorded when cancelled
+        if isinstance(exception, asyncio.CancelledError):
+            return "Deadline exceeded"
+
+        # Check for timeout exceptions, from the timeout policy or the HTTP client
+        if isinstance(exception, asyncio.TimeoutError | FetcherTimeoutError):
             return "Timeout"
 
         # Check for fetcher-specific exceptions
         if isinstance(exception, FetcherParsingError):
             return "Parsing error"
 
+        if isinstance(exception, FetcherRateLimitedError):
+            return "Rate limited"
+
         if isinstance(exception, FetcherHTTPError):
             return "Network error"
 
@@ -0,0 +1,66 @@
+"""Fetch policies controlling how many providers the orchestrator waits for."""
+
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Self
+
+
+class PolicyMode(StrEnum):
+    """Supported fetch policy modes."""
+
+    ALL = "all"
+    RACE = "race"
+    QUORUM = "quorum"
+    FALLBACK = "fallback"
+
+
+@dataclass(frozen=True)
+class FetchPolicy:
+    """How ParallelFetchOrchestrator decides it has enough answers.
+
+    Attributes:
+        mode: "all" waits for every fetcher, "race" returns the first valid IP,
+              "quorum" returns once `quorum` fetchers agree, and "fallback" tries
+              fetchers one at a time in configured order.
+        quorum: Number of agreeing fetchers required in "quorum" mode.
+    """
+
+    mode: PolicyMode = PolicyMode.ALL
+    quorum: int = 1
+
+    @classmethod
+    def parse(cls, value: str) -> Self:
+        """Parse a policy string such as "all", "race", "fallback" or "quorum:2".
+
+        Args:
+            value: The policy string from configuration.
+
+        Returns:
+            The parsed FetchPolicy.
+
+        Raises:
+            ValueError: If the policy string is not recognized.
+        """
+        name, _, argument = value.strip().lower().partition(":")
+
+        if name == PolicyMode.QUORUM:
+            if not argument.isdigit() or int(argument) < 1:
+                raise ValueError(
+                    f"Invalid quorum policy '{value}', expected 'quorum:K' with K >= 1"
+                )
+            return cls(mode=PolicyMode.QUORUM, quorum=int(argument))
+
+        if argument or name not in PolicyMode:
+            available = ", ".join(["all", "race", "quorum:K", "fallback"])
+            raise ValueError(f"Unknown fetch policy: {value}. Available: {available}")
+
+        return cls(mode=PolicyMode(name))
+
+    @property
+    def required_agreement(self) -> int | None:
+        """Return how many agreeing answers end the fetch early, or None to wait for all."""
+        if self.mode == PolicyMode.RACE:
+            return 1
+        if self.mode == PolicyMode.QUORUM:
+            return self.quorum
+        return None
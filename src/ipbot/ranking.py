@@ -0,0 +1,127 @@
+"""Adaptive provider ranking from exponentially weighted latency and error rates."""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class ProviderScore:
+    """Exponentially weighted statistics for one provider.
+
+    Attributes:
+        latency: EWMA of fetch latency in seconds.
+        error_rate: EWMA of failures, between 0 (always succeeds) and 1 (always fails).
+        observed_at: Monotonic time of the last observation.
+    """
+
+    latency: float
+    error_rate: float
+    observed_at: float
+
+
+class ProviderScorer:
+    """Ranks providers by expected time to a valid answer.
+
+    The score of a provider is its EWMA latency divided by its EWMA success
+    rate, so slow and unreliable providers both sink in the ranking. Fetches
+    cancelled before they answered raise the latency to at least the time
+    they ran, so a provider that slowed down sinks even when it keeps losing
+    races to faster ones. Providers
+    without observations rank first so they get measured. Providers left out
+    of the hot path are probed again once their statistics are older than
+    `probe_interval`, which lets them recover when conditions improve.
+    """
+
+    MIN_SUCCESS_RATE = 0.01
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        probe_interval: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the scorer.
+
+        Args:
+            alpha: Weight of the newest observation, between 0 and 1.
+            probe_interval: Seconds after which an unused provider is tried again.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.alpha = alpha
+        self.probe_interval = probe_interval
+        self._clock = clock
+        self._scores: dict[str, ProviderScore] = {}
+
+    def observe(self, name: str, seconds: float, success: bool) -> None:
+        """Update a provider's statistics with a completed fetch.
+
+        Args:
+            name: Provider name (from get_name()).
+            seconds: Fetch duration in seconds.
+            success: Whether the fetch returned an IP address.
+        """
+        error = 0.0 if success else 1.0
+        now = self._clock()
+        score = self._scores.get(name)
+        if score is None:
+            self._scores[name] = ProviderScore(latency=seconds, error_rate=error, observed_at=now)
+            return
+
+        score.latency += self.alpha * (seconds - score.latency)
+        score.error_rate += self.alpha * (error - score.error_rate)
+        score.observed_at = now
+
+    def observe_cancelled(self, name: str, seconds: float) -> None:
+        """Update a provider's latency with a fetch cancelled before it answered.
+
+        The fetch would have taken at least `seconds`, so the latency only
+        moves when that exceeds the average, and a provider without
+        observations starts from it; the error rate is unchanged.
+
+        Args:
+            name: Provider name (from get_name()).
+            seconds: Time the fetch ran before it was cancelled.
+        """
+        now = self._clock()
+        score = self._scores.get(name)
+        if score is None:
+            self._scores[name] = ProviderScore(latency=seconds, error_rate=0.0, observed_at=now)
+            return
+        if seconds > score.latency:
+            score.latency += self.alpha * (seconds - score.latency)
+        score.observed_at = now
+
+    def score(self, name: str) -> float:
+        """Return the expected seconds to a valid answer, lower is better.
+
+        Args:
+            name: Provider name.
+
+        Returns:
+            The score, or 0.0 for providers without observations.
+        """
+        score = self._scores.get(name)
+        if score is None:
+            return 0.0
+        return score.latency / max(1.0 - score.error_rate, self.MIN_SUCCESS_RATE)
+
+    def rank(self, names: list[str]) -> list[str]:
+        """Order provider names from best to worst score.
+
+        Args:
+            names: Provider names to rank. Ties keep their given order.
+
+        Returns:
+            The names sorted by score.
+        """
+        return sorted(names, key=self.score)
+
+    def needs_probe(self, name: str) -> bool:
+        """Return True if a provider's statistics are too old to trust.
+
+        Args:
+            name: Provider name.
+        """
+        score = self._scores.get(name)
+        return score is None or self._clock() - score.observed_at >= self.probe_interval
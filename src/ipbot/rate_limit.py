@@ -0,0 +1,122 @@
+"""Per-provider rate limiting that honors the providers' Retry-After hints."""
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ipbot.fetchers.exceptions import FetcherException
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderThrottledError(FetcherException):
+    """Raised instead of fetching when a provider is throttled locally."""
+
+    pass
+
+
+@dataclass
+class _Bucket:
+    """Token bucket and Retry-After state of one provider."""
+
+    tokens: float
+    updated_at: float
+    blocked_until: float = 0.0
+
+
+class RateLimiter:
+    """Token bucket per provider, paused while a provider asks us to back off.
+
+    Every fetch takes one token. Buckets hold up to `burst` tokens and refill
+    at `rate` tokens per second. After a provider answers 429 Too Many
+    Requests, it gets no fetches until its Retry-After delay has passed.
+    Buckets are keyed by name, so the same limiter also caps the fetches each
+    user may start when keyed by user ID.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        default_backoff: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            rate: Tokens added per second. 0 disables the token buckets so
+                  only Retry-After is honored.
+            burst: Bucket capacity, the number of fetches allowed at once.
+            default_backoff: Seconds to back off after a 429 response without
+                             a usable Retry-After header.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.default_backoff = default_backoff
+        self._clock = clock
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, name: str) -> _Bucket:
+        """Return a provider's bucket, refilled up to the current time."""
+        now = self._clock()
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = _Bucket(tokens=float(self.burst), updated_at=now)
+        elif self.rate > 0:
+            refill = (now - bucket.updated_at) * self.rate
+            bucket.tokens = min(float(self.burst), bucket.tokens + refill)
+            bucket.updated_at = now
+        return bucket
+
+    def is_throttled(self, name: str) -> bool:
+        """Return True if a provider would be refused a fetch right now.
+
+        Args:
+            name: Provider name.
+        """
+        bucket = self._bucket(name)
+        if self._clock() < bucket.blocked_until:
+            return True
+        return self.rate > 0 and bucket.tokens < 1
+
+    def try_acquire(self, name: str) -> bool:
+        """Take a token for one fetch from a provider.
+
+        Args:
+            name: Provider name.
+
+        Returns:
+            True if the fetch may go ahead, False if the provider is throttled.
+        """
+        if self.is_throttled(name):
+            return False
+        if self.rate > 0:
+            self._buckets[name].tokens -= 1
+        return True
+
+    def delay(self, name: str) -> float:
+        """Return the seconds until a provider will have a token, 0 if it has one now.
+
+        Args:
+            name: Provider name.
+        """
+        bucket = self._bucket(name)
+        delay = max(0.0, bucket.blocked_until - self._clock())
+        if self.rate > 0 and bucket.tokens < 1:
+            delay = max(delay, (1 - bucket.tokens) / self.rate)
+        return delay
+
+    def throttle(self, name: str, retry_after: float | None) -> None:
+        """Pause a provider after it answered 429 Too Many Requests.
+
+        Args:
+            name: Provider name.
+            retry_after: Seconds the provider asked us to wait, or None to
+                         use the default backoff.
+        """
+        delay = self.default_backoff if retry_after is None else retry_after
+        bucket = self._bucket(name)
+        bucket.blocked_until = max(bucket.blocked_until, self._clock() + delay)
+        logger.warning(f"{name} is rate limiting us, pausing it for {delay:.0f}s")
@@ -12,12 +12,16 @@ class FetcherResult:
         success: True if the fetcher succeeded, False if it failed.
         ip: The IP address if successful, None if failed.
         error_type: Error category if failed ("Timeout", "Network error", etc.), None if successful.
+        skipped: True if the fetcher was not run or was cancelled before it answered.
+        retries: Number of times the fetch was retried after a transient failure.
     """
 
     fetcher_name: str
     success: bool
     ip: str | None = None
     error_type: str | None = None
+    skipped: bool = False
+    retries: int = 0
 
 
 @dataclass
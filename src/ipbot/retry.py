@@ -0,0 +1,101 @@
+"""Bounded retries with jittered exponential backoff for transient fetch errors."""
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import httpx
+
+from ipbot.fetchers.exceptions import FetcherHTTPError
+
+# Failures where the request never reached the provider or the connection broke
+RETRYABLE_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.RemoteProtocolError,
+)
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how quickly a failed fetch is retried.
+
+    Attributes:
+        max_retries: Maximum retries after the first attempt.
+        base_delay: Backoff ceiling in seconds before the first retry; it
+                    doubles for every further retry.
+        max_delay: Upper bound of the backoff in seconds.
+    """
+
+    max_retries: int = 2
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Return True if a failed fetch is safe and worthwhile to retry.
+
+        Only connection failures and 502/503/504 responses are retried.
+        Timeouts and parsing errors are not, since repeating them rarely helps.
+
+        Args:
+            error: The exception raised by the fetch.
+        """
+        if not isinstance(error, FetcherHTTPError):
+            return False
+        cause = error.__cause__
+        if isinstance(cause, httpx.HTTPStatusError):
+            return cause.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(cause, RETRYABLE_ERRORS)
+
+    def backoff(self, retry: int) -> float:
+        """Return the delay before a retry, with full jitter.
+
+        Args:
+            retry: Number of retries already made.
+
+        Returns:
+            A random delay between 0 and the exponential backoff ceiling.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+async def retry_call(
+    call: Callable[[], Awaitable[str]],
+    policy: RetryPolicy,
+    time_left: Callable[[], float | None],
+    on_retry: Callable[[], None],
+) -> str:
+    """Run `call`, retrying retryable failures while time allows.
+
+    Args:
+        call: Factory starting one fetch attempt.
+        policy: Retry policy to apply.
+        time_left: Returns the seconds left in the request budget, or None
+                   without a deadline. No retry starts if its backoff would
+                   use up the remaining time.
+        on_retry: Called before every retry.
+
+    Returns:
+        The IP address from the first successful attempt.
+
+    Raises:
+        Exception: The error of the last attempt.
+    """
+    retries = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if retries >= policy.max_retries or not policy.is_retryable(e):
+                raise
+            delay = policy.backoff(retries)
+            remaining = time_left()
+            if remaining is not None and delay >= remaining:
+                raise
+
+        retries += 1
+        on_retry()
+        await asyncio.sleep(delay)
@@ -0,0 +1,284 @@
+"""Prioritized outbound message queue within Telegram's send limits."""
+
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import time
+import warnings
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from telegram.error import RetryAfter
+from telegram.warnings import PTBDeprecationWarning
+
+from ipbot.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Send priorities, lower goes first
+INTERACTIVE = 0
+BULK = 1
+
+_GLOBAL = "global"
+
+
+@dataclass(order=True)
+class _Job:
+    """A queued send, ordered by priority and then by submission."""
+
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    call: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future[Any] = field(compare=False)
+    key: Hashable | None = field(default=None, compare=False)
+    retries: int = field(default=0, compare=False)
+
+
+def _chat_key(chat_id: int) -> str:
+    return f"chat {chat_id}"
+
+
+def _seconds(error: RetryAfter) -> float:
+    """Return the retry_after of a RetryAfter error in seconds.
+
+    Without PTB_TIMEDELTA set, reading it warns that it will become a
+    timedelta; both types are handled, so the warning is not logged.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        retry_after = error.retry_after
+    if isinstance(retry_after, datetime.timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class SendQueue:
+    """Sends Telegram messages in priority order within the global and per-chat limits.
+
+    Every send takes a token from a global bucket and from the bucket of its
+    chat. Interactive replies go out before bulk notifications waiting for
+    the same tokens, and the sends of one chat go out one at a time in
+    priority order. When Telegram answers 429 Too Many Requests, the chat is
+    paused for the retry_after it asked for and the send keeps its place.
+
+    A send queued with a key replaces the call of a queued send with the same
+    key, so only the latest of several edits of one message goes out.
+    """
+
+    def __init__(
+        self,
+        rate: float = 30.0,
+        burst: int = 30,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the queue.
+
+        Args:
+            rate: Messages per second across all chats.
+            burst: Messages sent at once across all chats.
+            chat_rate: Messages per second to one chat.
+            chat_burst: Messages sent at once to one chat.
+            max_retries: Retries of a send answered with 429 before it fails.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.max_retries = max_retries
+        self._global = RateLimiter(rate=rate, burst=burst, clock=clock)
+        self._chats = RateLimiter(rate=chat_rate, burst=chat_burst, clock=clock)
+        self._jobs: list[_Job] = []
+        self._keys: dict[Hashable, _Job] = {}
+        self._busy: set[int] = set()
+        self._sending: set[asyncio.Task[None]] = set()
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._worker: asyncio.Task[None] | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Number of sends queued or in flight."""
+        return len(self._jobs) + len(self._sending)
+
+    async def start(self) -> None:
+        """Start sending queued messages."""
+        if self._worker is None:
+            self._closed = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting sends and flush the queue.
+
+        Args:
+            timeout: Seconds to wait for queued sends; those left after it fail.
+        """
+        self._closed = True
+        if self._worker is not None:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._idle.wait()
+            except TimeoutError:
+                logger.warning(f"Send queue not flushed in {timeout}s, dropping {self.pending}")
+            self._worker.cancel()
+            self._worker = None
+
+        for task in list(self._sending):
+            task.cancel()
+        for job in self._jobs:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Send queue closed"))
+        self._jobs.clear()
+        self._keys.clear()
+
+    def submit(
+        self,
+        chat_id: int,
+        call: Callable[[], Awaitable[Any]],
+        priority: int = BULK,
+        key: Hashable | None = None,
+    ) -> asyncio.Future[Any]:
+        """Queue a send without waiting for it.
+
+        Args:
+            chat_id: Chat the message goes to.
+            call: Makes the Bot API request, e.g. `partial(bot.send_message, chat_id, text)`.
+            priority: INTERACTIVE or BULK.
+            key: Replace the call of a queued send with the same key.
+
+        Returns:
+            Future with the result of the call.
+
+        Raises:
+            RuntimeError: If the queue is closed.
+        """
+        if self._closed:
+            raise RuntimeError("Send queue closed")
+        if key is not None and (queued := self._keys.get(key)) is not None:
+            queued.call = call
+            return queued.future
+
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(priority, next(self._seq), chat_id, call, future, key)
+        heapq.heappush(self._jobs, job)
+        if key is not None:
+            self._keys[key] = job
+        self._idle.clear()
+        self._changed.set()
+        return future
+
+    async def send(
+        self,
+        chat_id: int,
+        call: Callable[[], Awaitable[Any]],
+        priority: int = BULK,
+        key: Hashable | None = None,
+    ) -> Any:
+        """Queue a send and wait for its result.
+
+        Args:
+            chat_id: Chat the message goes to.
+            call: Makes the Bot API request.
+            priority: INTERACTIVE or BULK.
+            key: Replace the call of a queued send with the same key.
+
+        Returns:
+            The result of the call.
+        """
+        return await self.submit(chat_id, call, priority, key)
+
+    async def _run(self) -> None:
+        """Start sends as tokens become available."""
+        while True:
+            wait = self._dispatch()
+            self._changed.clear()
+            try:
+                async with asyncio.timeout(wait):
+                    await self._changed.wait()
+            except TimeoutError:
+                pass
+
+    def _dispatch(self) -> float | None:
+        """Start every send allowed right now.
+
+        Returns:
+            Seconds until the next queued send may go out, None to wait for a change.
+        """
+        wait: float | None = None
+        seen: set[int] = set()
+        for job in sorted(self._jobs):
+            if job.future.done():
+                # Cancelled by the caller before it was sent
+                self._remove(job)
+                continue
+            # Only the first send of each chat is a candidate, the others keep their order
+            if job.chat_id in seen:
+                continue
+            seen.add(job.chat_id)
+            if job.chat_id in self._busy:
+                continue
+
+            delay = max(self._global.delay(_GLOBAL), self._chats.delay(_chat_key(job.chat_id)))
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            self._global.try_acquire(_GLOBAL)
+            self._chats.try_acquire(_chat_key(job.chat_id))
+            self._remove(job)
+            self._busy.add(job.chat_id)
+            task = asyncio.create_task(self._send(job))
+            self._sending.add(task)
+            task.add_done_callback(self._sent)
+
+        heapq.heapify(self._jobs)
+        if not self._jobs and not self._sending:
+            self._idle.set()
+        return wait
+
+    def _remove(self, job: _Job) -> None:
+        """Take a send off the queue; the caller restores the heap order."""
+        self._jobs.remove(job)
+        if job.key is not None and self._keys.get(job.key) is job:
+            del self._keys[job.key]
+
+    async def _send(self, job: _Job) -> None:
+        """Make one send, requeuing it if Telegram asks to retry later."""
+        try:
+            result = await job.call()
+        except RetryAfter as e:
+            self._chats.throttle(_chat_key(job.chat_id), _seconds(e))
+            if job.retries < self.max_retries and not job.future.done():
+                job.retries += 1
+                heapq.heappush(self._jobs, job)
+                if job.key is not None:
+                    self._keys.setdefault(job.key, job)
+                return
+            self._fail(job, e)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._busy.discard(job.chat_id)
+
+    def _fail(self, job: _Job, error: Exception) -> None:
+        logger.warning(f"Failed to send to chat {job.chat_id}: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def _sent(self, task: asyncio.Task[None]) -> None:
+        self._sending.discard(task)
+        if not self._jobs and not self._sending:
+            self._idle.set()
+        self._changed.set()
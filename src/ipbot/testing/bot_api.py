@@ -0,0 +1,375 @@
+"""Local stand-in for the Telegram Bot API, for full-stack and load tests.
+
+The Application built by `main.build_application()` talks to it when
+TELEGRAM_BASE_URL is set to `FakeBotApi.base_url`. Synthetic command updates
+are injected with `inject_command()` and handed out through getUpdates, or
+POSTed to the webhook once one is set. Every injected update is traced from
+delivery to the bot's first reply in the same chat.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Self
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SentMessage:
+    """A message sent or edited by the bot.
+
+    Attributes:
+        method: "sendMessage" or "editMessageText".
+        chat_id: Chat the message was sent to.
+        message_id: Identifier of the message.
+        text: Text of the message.
+        sent_at: Monotonic time the request reached the server.
+    """
+
+    method: str
+    chat_id: int
+    message_id: int
+    text: str
+    sent_at: float
+
+
+@dataclass
+class UpdateTrace:
+    """Delivery and reply times of one injected update.
+
+    Attributes:
+        update_id: Identifier of the update.
+        chat_id: Chat the update was sent from.
+        text: Text of the update's message.
+        injected_at: Monotonic time the update was injected.
+        delivered_at: Monotonic time the bot received it, None until then.
+        replied_at: Monotonic time of the bot's first reply, None until then.
+    """
+
+    update_id: int
+    chat_id: int
+    text: str
+    injected_at: float
+    delivered_at: float | None = None
+    replied_at: float | None = None
+
+    @property
+    def latency(self) -> float | None:
+        """Return the seconds from delivery to the first reply, None without a reply."""
+        if self.delivered_at is None or self.replied_at is None:
+            return None
+        return self.replied_at - self.delivered_at
+
+
+@dataclass
+class _Webhook:
+    """Webhook registered with setWebhook."""
+
+    url: str
+    secret_token: str | None
+    max_connections: int
+    delivery: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.delivery = asyncio.Semaphore(self.max_connections)
+
+
+class FakeBotApi:
+    """Asyncio HTTP server answering the Bot API methods the bot uses.
+
+    Supported methods are getMe, getUpdates (with long polling), sendMessage,
+    editMessageText, setWebhook, deleteWebhook and getWebhookInfo. Any other
+    method fails with a 404 Bot API error.
+    """
+
+    def __init__(
+        self,
+        bot_id: int = 1000000001,
+        bot_username: str = "ipbot_test_bot",
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """Initialize the server.
+
+        Args:
+            bot_id: User ID of the bot, returned by getMe.
+            bot_username: Username of the bot, returned by getMe.
+            host: Interface to listen on.
+            port: Port to listen on. 0 picks a free port.
+        """
+        self.bot_id = bot_id
+        self.bot_username = bot_username
+        self.host = host
+        self.port = port
+        self.sent: list[SentMessage] = []
+        self.traces: dict[int, UpdateTrace] = {}
+        self.webhook: _Webhook | None = None
+        self._pending: deque[dict[str, Any]] = deque()
+        self._awaiting_reply: dict[int, deque[UpdateTrace]] = {}
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._changed = asyncio.Condition()
+        self._server: asyncio.Server | None = None
+        self._handlers: set[asyncio.Task[None]] = set()
+        self._background: set[asyncio.Task[None]] = set()
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the Bot API base URL to use as TELEGRAM_BASE_URL."""
+        return f"http://{self.host}:{self.port}/bot"
+
+    async def start(self) -> None:
+        """Start listening. The chosen port is available as `port` afterwards."""
+        self._client = httpx.AsyncClient(timeout=10.0)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake Bot API listening on {self.base_url}")
+
+    async def close(self) -> None:
+        """Stop listening, end pending long polls and close connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for task in self._handlers | self._background:
+            task.cancel()
+        await asyncio.gather(*self._handlers, *self._background, return_exceptions=True)
+        await self._server.wait_closed()
+        if self._client is not None:
+            await self._client.aclose()
+        self._server = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def inject_command(self, text: str, user_id: int, chat_id: int | None = None) -> int:
+        """Queue a message update from a user, as if they sent it to the bot.
+
+        Args:
+            text: Message text, e.g. "/ip" or "/ip fresh".
+            user_id: Telegram user ID of the sender.
+            chat_id: Chat the message is sent in. Defaults to the private
+                     chat with the user. Replies are matched to updates in
+                     the order they were injected per chat.
+
+        Returns:
+            The update ID.
+        """
+        chat_id = user_id if chat_id is None else chat_id
+        update_id = self._next_update_id
+        self._next_update_id += 1
+
+        message: dict[str, Any] = {
+            "message_id": self._new_message_id(),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id == user_id else "group"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "text": text,
+        }
+        command = text.split(maxsplit=1)[0]
+        if command.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+
+        trace = UpdateTrace(update_id, chat_id, text, injected_at=time.monotonic())
+        self.traces[update_id] = trace
+        self._awaiting_reply.setdefault(chat_id, deque()).append(trace)
+        update = {"update_id": update_id, "message": message}
+
+        if self.webhook is not None:
+            self._run_in_background(self._deliver(self.webhook, update))
+        else:
+            self._pending.append(update)
+            self._run_in_background(self._notify())
+        return update_id
+
+    def latencies(self) -> list[float]:
+        """Return the delivery-to-reply latencies of all answered updates."""
+        return [trace.latency for trace in self.traces.values() if trace.latency is not None]
+
+    async def wait_for_replies(self, timeout: float | None = None) -> None:
+        """Wait until every injected update has been answered.
+
+        Raises:
+            TimeoutError: If updates are still unanswered after `timeout` seconds.
+        """
+        async with asyncio.timeout(timeout), self._changed:
+            await self._changed.wait_for(
+                lambda: all(t.replied_at is not None for t in self.traces.values())
+            )
+
+    def _run_in_background(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run a coroutine as a task that is cancelled on close."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _notify(self) -> None:
+        """Wake up long polls and waiters."""
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _deliver(self, webhook: _Webhook, update: dict[str, Any]) -> None:
+        """POST an update to the webhook like Telegram does."""
+        assert self._client is not None
+        headers = {}
+        if webhook.secret_token:
+            headers["X-Telegram-Bot-Api-Secret-Token"] = webhook.secret_token
+        async with webhook.delivery:
+            self.traces[update["update_id"]].delivered_at = time.monotonic()
+            try:
+                await self._client.post(webhook.url, json=update, headers=headers)
+            except httpx.HTTPError as e:
+                logger.warning(f"Webhook delivery of update {update['update_id']} failed: {e}")
+
+    def _new_message_id(self) -> int:
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        return message_id
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it."""
+        task = asyncio.current_task()
+        assert task is not None
+        self._handlers.add(task)
+        try:
+            while True:
+                request_line = (await reader.readline()).decode("latin-1").split()
+                if len(request_line) != 3:
+                    break
+
+                headers = {}
+                while (line := await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                method = urlsplit(request_line[1]).path.rsplit("/", 1)[-1]
+                status, payload = await self._call(method, _parse_params(headers, body))
+                response = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(response)}\r\n\r\n".encode("latin-1")
+                    + response
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except asyncio.IncompleteReadError:
+            pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _call(self, method: str, params: dict[str, Any]) -> tuple[HTTPStatus, dict]:
+        """Run a Bot API method and return the HTTP status and response body."""
+        if method == "getMe":
+            return _ok(
+                {
+                    "id": self.bot_id,
+                    "is_bot": True,
+                    "first_name": "IP Bot",
+                    "username": self.bot_username,
+                }
+            )
+        if method == "getUpdates":
+            return _ok(await self._get_updates(params))
+        if method in ("sendMessage", "editMessageText"):
+            return _ok(await self._record_message(method, params))
+        if method == "setWebhook":
+            self.webhook = _Webhook(
+                url=params["url"],
+                secret_token=params.get("secret_token"),
+                max_connections=int(params.get("max_connections", 40)),
+            )
+            return _ok(True)
+        if method == "deleteWebhook":
+            self.webhook = None
+            return _ok(True)
+        if method == "getWebhookInfo":
+            return _ok(
+                {
+                    "url": self.webhook.url if self.webhook else "",
+                    "has_custom_certificate": False,
+                    "pending_update_count": len(self._pending),
+                }
+            )
+        return HTTPStatus.NOT_FOUND, {
+            "ok": False,
+            "error_code": 404,
+            "description": "Not Found: method not found",
+        }
+
+    async def _get_updates(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        """Confirm updates below `offset` and return the next ones, long polling if none."""
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        while self._pending and self._pending[0]["update_id"] < offset:
+            self._pending.popleft()
+
+        if not self._pending:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(float(params.get("timeout", 0))), self._changed:
+                    await self._changed.wait_for(lambda: bool(self._pending))
+
+        updates = list(self._pending)[:limit]
+        now = time.monotonic()
+        for update in updates:
+            trace = self.traces[update["update_id"]]
+            if trace.delivered_at is None:
+                trace.delivered_at = now
+        return updates
+
+    async def _record_message(self, method: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Record a sent or edited message and return it as the Bot API would."""
+        chat_id = int(params["chat_id"])
+        message_id = (
+            int(params["message_id"]) if method == "editMessageText" else self._new_message_id()
+        )
+        now = time.monotonic()
+        self.sent.append(SentMessage(method, chat_id, message_id, params["text"], now))
+
+        awaiting = self._awaiting_reply.get(chat_id)
+        if method == "sendMessage" and awaiting:
+            awaiting.popleft().replied_at = now
+            await self._notify()
+
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": self.bot_id, "is_bot": True, "first_name": "IP Bot"},
+            "text": params["text"],
+        }
+
+
+def _ok(result: Any) -> tuple[HTTPStatus, dict]:
+    """Return a successful Bot API response."""
+    return HTTPStatus.OK, {"ok": True, "result": result}
+
+
+def _parse_params(headers: dict[str, str], body: bytes) -> dict[str, Any]:
+    """Decode the parameters of a Bot API request sent as form data or JSON."""
+    if not body:
+        return {}
+    if headers.get("content-type", "").startswith("application/json"):
+        return json.loads(body)
+    return dict(parse_qsl(body.decode()))
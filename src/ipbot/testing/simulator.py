@@ -0,0 +1,282 @@
+"""Local HTTP server simulating the IP providers queried by the fetchers.
+
+Run it standalone for offline development:
+
+    python -m ipbot.testing.simulator --port 8080
+
+and point the bot at it with the printed PROVIDER_URLS setting.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import random
+from collections import Counter
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Self
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Draws one response latency in seconds
+Latency = Callable[[random.Random], float]
+
+# Response format of each simulated provider, by strategy name
+ENDPOINTS = {
+    "identme": "text",
+    "ifconfig": "text",
+    "ipify": "json",
+    "ipinfo": "text",
+    "custom": "text",
+}
+
+
+def constant(seconds: float) -> Latency:
+    """Return a latency distribution that always takes `seconds`."""
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    """Return a latency distribution uniform between `low` and `high` seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Latency:
+    """Return a long-tailed latency distribution around `median` seconds.
+
+    Args:
+        median: Median latency in seconds.
+        sigma: Standard deviation of the latency's logarithm; larger values
+               give a longer tail.
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+@dataclass
+class EndpointProfile:
+    """Behavior of one simulated provider.
+
+    Attributes:
+        latency: Distribution of the delay before the response headers.
+        error_rate: Fraction of requests answered with 500.
+        rate_limit_rate: Fraction of requests answered with 429.
+        retry_after: Retry-After seconds sent with 429 answers, None to omit it.
+        body_delay: Seconds between the response headers and the body.
+        wrong_ip_rate: Fraction of successful answers carrying `wrong_ip`.
+        wrong_ip: IP address returned by wrong answers.
+    """
+
+    latency: Latency = field(default=constant(0.0))
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float | None = None
+    body_delay: float = 0.0
+    wrong_ip_rate: float = 0.0
+    wrong_ip: str = "198.51.100.99"
+
+
+class ProviderSimulator:
+    """Asyncio HTTP/1.1 server answering like the real IP providers.
+
+    Each provider is served under its strategy name (`/ipify`, `/identme`,
+    ...) with the same response format as the real endpoint: JSON for ipify,
+    plain text for the others. Connections are kept alive like on the real
+    servers, so pooled clients reuse them.
+    """
+
+    def __init__(
+        self,
+        ip: str = "203.0.113.1",
+        profiles: Mapping[str, EndpointProfile] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int | None = None,
+    ):
+        """Initialize the simulator.
+
+        Args:
+            ip: IP address returned by correct answers.
+            profiles: Behavior by strategy name. Providers without a profile
+                      answer immediately and correctly.
+            host: Interface to listen on.
+            port: Port to listen on. 0 picks a free port.
+            seed: Seed of the random generator, for reproducible runs.
+        """
+        self.ip = ip
+        self.profiles = {name: EndpointProfile() for name in ENDPOINTS}
+        self.profiles.update(profiles or {})
+        self.host = host
+        self.port = port
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL the simulator is reachable at."""
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, name: str) -> str:
+        """Return the URL of a simulated provider.
+
+        Args:
+            name: Strategy name, e.g. "ipify".
+        """
+        query = "?format=json" if ENDPOINTS[name] == "json" else ""
+        return f"{self.base_url}/{name}{query}"
+
+    def urls(self) -> dict[str, str]:
+        """Return the URLs of all simulated providers by strategy name.
+
+        The mapping can be passed as the `provider_urls` setting.
+        """
+        return {name: self.url(name) for name in ENDPOINTS}
+
+    async def start(self) -> None:
+        """Start listening. The chosen port is available as `port` afterwards."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Provider simulator listening on {self.base_url}")
+
+    async def close(self) -> None:
+        """Stop listening and close open connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it."""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = (await reader.readline()).decode("latin-1").split()
+                if len(request_line) != 3:
+                    break
+
+                keep_alive = True
+                while (line := await reader.readline()).strip():
+                    header, _, value = line.decode("latin-1").partition(":")
+                    if header.strip().lower() == "connection" and value.strip() == "close":
+                        keep_alive = False
+
+                method, target, _ = request_line
+                await self._respond(writer, method, urlsplit(target).path.strip("/"))
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: str, name: str) -> None:
+        """Answer one request according to the provider's profile."""
+        profile = self.profiles.get(name)
+        if name not in ENDPOINTS or profile is None:
+            await self._write(writer, method, HTTPStatus.NOT_FOUND, b"Not Found")
+            return
+
+        self.requests[name] += 1
+        await asyncio.sleep(profile.latency(self._random))
+
+        roll = self._random.random()
+        if roll < profile.error_rate:
+            await self._write(writer, method, HTTPStatus.INTERNAL_SERVER_ERROR, b"Server Error")
+            return
+        if roll < profile.error_rate + profile.rate_limit_rate:
+            headers = {} if profile.retry_after is None else {"Retry-After": profile.retry_after}
+            await self._write(
+                writer, method, HTTPStatus.TOO_MANY_REQUESTS, b"Too Many Requests", headers
+            )
+            return
+
+        ip = profile.wrong_ip if self._random.random() < profile.wrong_ip_rate else self.ip
+        if ENDPOINTS[name] == "json":
+            body = json.dumps({"ip": ip}).encode()
+            headers = {"Content-Type": "application/json"}
+        else:
+            body = f"{ip}\n".encode()
+            headers = {}
+        await self._write(writer, method, HTTPStatus.OK, body, headers, profile.body_delay)
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        status: HTTPStatus,
+        body: bytes,
+        headers: Mapping[str, object] | None = None,
+        body_delay: float = 0.0,
+    ) -> None:
+        """Write a response, optionally pausing between headers and body."""
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Length: {len(body)}"]
+        headers = {"Content-Type": "text/plain; charset=utf-8", **(headers or {})}
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+        if method != "HEAD":
+            if body_delay:
+                await writer.drain()
+                await asyncio.sleep(body_delay)
+            writer.write(body)
+        await writer.drain()
+
+
+async def _serve(simulator: ProviderSimulator) -> None:
+    """Run the simulator until cancelled."""
+    async with simulator:
+        print(f"PROVIDER_URLS='{json.dumps(simulator.urls())}'")
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    """Run the simulator from the command line."""
+    parser = argparse.ArgumentParser(description="Simulate the IP providers locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ip", default="203.0.113.1", help="IP address to answer with")
+    parser.add_argument("--latency", type=float, default=0.05, help="median latency (s)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="latency spread (lognormal)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    profile = EndpointProfile(
+        latency=lognormal(args.latency, args.sigma),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    simulator = ProviderSimulator(
+        ip=args.ip,
+        profiles=dict.fromkeys(ENDPOINTS, profile),
+        host=args.host,
+        port=args.port,
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(simulator))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Per-provider fetch timeouts derived from observed latency."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from ipbot.latency import LatencyTracker
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """How long to wait for each provider before giving up.
+
+    With enough latency samples, a provider's timeout is its observed latency
+    percentile multiplied by `factor`, clamped between `floor` and `ceiling`.
+    Providers in `overrides` always use their fixed timeout.
+
+    Attributes:
+        percentile: Latency percentile the timeout is based on (e.g. 0.99).
+        factor: Multiplier applied to the percentile latency.
+        floor: Minimum timeout in seconds.
+        ceiling: Maximum timeout in seconds.
+        min_samples: Latency samples required before a timeout is derived.
+        adaptive: Derive timeouts from latency. If False, only overrides apply.
+        overrides: Fixed timeouts in seconds by provider name (from get_name()).
+    """
+
+    percentile: float = 0.99
+    factor: float = 2.0
+    floor: float = 0.25
+    ceiling: float = 3.0
+    min_samples: int = 20
+    adaptive: bool = True
+    overrides: Mapping[str, float] = field(default_factory=dict)
+
+    def timeout_for(self, name: str, latency: LatencyTracker) -> float | None:
+        """Return the timeout of a provider's next fetch.
+
+        Args:
+            name: Provider name.
+            latency: Tracker with the provider's successful fetch latencies.
+
+        Returns:
+            The timeout in seconds, or None to rely on the strategy's own timeout.
+        """
+        if name in self.overrides:
+            return self.overrides[name]
+
+        if not self.adaptive or latency.count(name) < self.min_samples:
+            return None
+
+        observed = latency.percentile(name, self.percentile)
+        if observed is None:
+            return None
+        return min(max(observed * self.factor, self.floor), self.ceiling)
@@ -0,0 +1,80 @@
+"""Concurrent update processing that keeps the order of updates within a chat."""
+
+import inspect
+import logging
+from collections import deque
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates of different chats concurrently and those of one chat in order.
+
+    At most `max_concurrent_updates` updates are processed at once. An update
+    arriving while another one of the same chat is being processed is queued
+    behind it and processed by the same task afterwards, so it does not take
+    one of the concurrent slots while it waits for its chat. Updates without
+    a chat are processed as they come.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        """Initialize the processor.
+
+        Args:
+            max_concurrent_updates: Maximum number of updates processed at once.
+
+        Raises:
+            ValueError: If max_concurrent_updates is not positive.
+        """
+        super().__init__(max_concurrent_updates)
+        self._chat_queues: dict[int, deque[Awaitable[Any]]] = {}
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Process the update, or queue it behind the update being processed in its chat.
+
+        Args:
+            update: The update to process.
+            coroutine: Awaitable that processes the update.
+        """
+        chat_id = _chat_id(update)
+        if chat_id is None:
+            await coroutine
+            return
+
+        queue = self._chat_queues.get(chat_id)
+        if queue is not None:
+            queue.append(coroutine)
+            return
+
+        queue = self._chat_queues[chat_id] = deque([coroutine])
+        try:
+            while queue:
+                try:
+                    await queue[0]
+                except Exception as e:
+                    logger.error(f"Processing an update of chat {chat_id} failed: {e}")
+                queue.popleft()
+        finally:
+            del self._chat_queues[chat_id]
+            # Cancelled while updates were queued: they will not run
+            for pending in queue:
+                if inspect.iscoroutine(pending):
+                    pending.close()
+
+    async def initialize(self) -> None:
+        """Nothing to set up."""
+
+    async def shutdown(self) -> None:
+        """Nothing to release, queued updates finish with the update processed before them."""
+
+
+def _chat_id(update: object) -> int | None:
+    """Return the chat ID of a Telegram update, None for other updates or without a chat."""
+    if isinstance(update, Update) and update.effective_chat:
+        return update.effective_chat.id
+    return None
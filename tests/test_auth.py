@@ -0,0 +1,93 @@
+"""Tests for the authorization filter."""
+
+import datetime
+import logging
+
+import pytest
+from telegram import Chat, Message, Update, User
+
+from ipbot.auth import ADMIN, USER, AccessList, AuthorizationFilter
+from ipbot.metrics import FetchMetrics
+
+OWNER_ID = 123
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def command_from(user_id: int | None, text: str = "/ip", chat_id: int | None = None) -> Update:
+    """Return an update with a command message sent by the given user, by default in private."""
+    user = User(id=user_id, first_name="test", is_bot=False) if user_id is not None else None
+    chat_id = chat_id or user_id or 1
+    message = Message(
+        message_id=1,
+        date=datetime.datetime.now(datetime.UTC),
+        chat=Chat(id=chat_id, type=Chat.PRIVATE if chat_id == user_id else Chat.GROUP),
+        from_user=user,
+        text=text,
+    )
+    return Update(update_id=1, message=message)
+
+
+def test_access_list_roles():
+    """Test that roles come from the user, else from the chat, and admins may do anything."""
+    access = AccessList(OWNER_ID, {111: "user", 222: "admin", -100: "user"})
+
+    assert access.role_of(command_from(OWNER_ID)) == ADMIN
+    assert access.allows(command_from(222), ADMIN)
+    assert access.allows(command_from(111))
+    assert not access.allows(command_from(111), ADMIN)
+    assert access.role_of(command_from(333, chat_id=-100)) == USER
+    assert access.role_of(command_from(222, chat_id=-100)) == ADMIN
+    assert access.role_of(command_from(333)) is None
+
+
+def test_access_list_unknown_role():
+    """Test that unknown roles are rejected."""
+    with pytest.raises(ValueError, match="Unknown roles: owner"):
+        AccessList(OWNER_ID, {111: "owner"})
+
+
+def test_allows_only_allowed_users():
+    """Test that only updates from allowed users pass the filter."""
+    authorization = AuthorizationFilter(AccessList(OWNER_ID))
+
+    assert authorization.check_update(command_from(OWNER_ID))
+    assert not authorization.check_update(command_from(999))
+    assert not authorization.check_update(command_from(None))
+    assert authorization.rejected == 2
+
+
+def test_rejection_warnings_are_rate_limited(caplog):
+    """Test that a spam wave logs one warning per interval with the skipped count."""
+    clock = FakeClock()
+    authorization = AuthorizationFilter(AccessList(OWNER_ID), log_interval=60.0, clock=clock)
+
+    with caplog.at_level(logging.WARNING, logger="ipbot.auth"):
+        for user_id in range(1000, 1100):
+            authorization.check_update(command_from(user_id))
+        clock.now += 60.0
+        authorization.check_update(command_from(2000))
+
+    assert authorization.rejected == 101
+    assert len(caplog.records) == 2
+    assert "user 1000" in caplog.records[0].message
+    assert "1 unauthorized updates" in caplog.records[0].message
+    assert "user 2000" in caplog.records[1].message
+    assert "100 unauthorized updates" in caplog.records[1].message
+
+
+def test_rejections_are_exported_as_metric():
+    """Test that the rejection counter is part of the Prometheus output."""
+    authorization = AuthorizationFilter(AccessList(OWNER_ID))
+    metrics = FetchMetrics(authorization=authorization)
+    authorization.check_update(command_from(999))
+
+    assert "ipbot_unauthorized_updates_total 1" in metrics.render()
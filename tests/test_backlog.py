@@ -0,0 +1,123 @@
+"""Tests for coalescing stale updates."""
+
+import asyncio
+import datetime
+
+import pytest
+from telegram import Chat, Message, Update
+from telegram.ext import ApplicationBuilder, MessageHandler, TypeHandler, filters
+
+from ipbot.backlog import BacklogCoalescer
+from ipbot.testing.bot_api import FakeBotApi
+from ipbot.update_processor import ChatOrderedUpdateProcessor
+
+NOW = 1_800_000_000.0
+
+
+def message_update(update_id: int, chat_id: int, text: str, age: float) -> Update:
+    """Return a message update sent `age` seconds before NOW."""
+    message = Message(
+        message_id=update_id,
+        date=datetime.datetime.fromtimestamp(NOW - age, datetime.UTC),
+        chat=Chat(id=chat_id, type=Chat.PRIVATE),
+        text=text,
+    )
+    return Update(update_id=update_id, message=message)
+
+
+@pytest.fixture
+async def application():
+    """Return an initialized application talking to a fake Bot API."""
+    async with FakeBotApi() as api:
+        application = (
+            ApplicationBuilder().token("123:test").base_url(api.base_url).updater(None).build()
+        )
+        async with application:
+            await application.start()
+            yield application
+            await application.stop()
+
+
+def register(application, coalescer: BacklogCoalescer) -> list[int]:
+    """Register the coalescer and a handler recording the update IDs it answers."""
+    answered: list[int] = []
+
+    async def answer(update, context):
+        answered.append(update.update_id)
+
+    application.add_handler(TypeHandler(Update, coalescer), group=-1)
+    application.add_handler(MessageHandler(filters.TEXT, answer))
+    return answered
+
+
+@pytest.mark.asyncio
+async def test_latest_stale_update_per_chat_and_command_is_answered(application):
+    """Test that a backlog is answered once per chat and command, with its latest update."""
+    coalescer = BacklogCoalescer(60.0, policy="latest", settle=0.01, clock=lambda: NOW)
+    answered = register(application, coalescer)
+
+    updates = [
+        message_update(1, chat_id=10, text="/ip", age=600),
+        message_update(2, chat_id=10, text="/start", age=500),
+        message_update(3, chat_id=10, text="/ip fresh", age=400),
+        message_update(4, chat_id=20, text="/ip", age=300),
+        message_update(5, chat_id=10, text="/ip", age=5),
+    ]
+    for update in updates:
+        await application.process_update(update)
+    assert answered == [5]
+
+    await asyncio.sleep(0.1)
+    assert sorted(answered) == [2, 3, 4, 5]
+    assert coalescer.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_ignores_stale_updates(application):
+    """Test that stale updates are dropped without an answer."""
+    coalescer = BacklogCoalescer(60.0, policy="drop", clock=lambda: NOW)
+    answered = register(application, coalescer)
+
+    await application.process_update(message_update(1, chat_id=10, text="/ip", age=120))
+    await application.process_update(message_update(2, chat_id=10, text="/ip", age=30))
+
+    assert answered == [2]
+    assert coalescer.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_chat_order():
+    """Test that a replayed stale update waits for the update being processed in its chat."""
+    events: list[str] = []
+
+    async def answer(update, context):
+        events.append(f"start {update.update_id}")
+        await asyncio.sleep(0.1 if update.update_id == 5 else 0)
+        events.append(f"end {update.update_id}")
+
+    async with FakeBotApi() as api:
+        application = (
+            ApplicationBuilder()
+            .token("123:test")
+            .base_url(api.base_url)
+            .updater(None)
+            .concurrent_updates(ChatOrderedUpdateProcessor(4))
+            .build()
+        )
+        coalescer = BacklogCoalescer(60.0, policy="latest", settle=0.01, clock=lambda: NOW)
+        application.add_handler(TypeHandler(Update, coalescer), group=-1)
+        application.add_handler(MessageHandler(filters.TEXT, answer))
+        async with application:
+            await application.start()
+            await application.update_queue.put(message_update(1, chat_id=10, text="/ip", age=600))
+            await application.update_queue.put(message_update(5, chat_id=10, text="/ip", age=5))
+            await asyncio.sleep(0.3)
+            await application.stop()
+
+    assert events == ["start 5", "end 5", "start 1", "end 1"]
+
+
+def test_unknown_policy():
+    """Test that an unknown policy is rejected."""
+    with pytest.raises(ValueError, match="Unknown backlog policy"):
+        BacklogCoalescer(60.0, policy="oldest")
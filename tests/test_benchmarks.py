@@ -0,0 +1,63 @@
+"""Smoke tests running the benchmark scripts on a tiny workload."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_benchmark(
+    script: str, *args: str, cwd: Path, **env: str
+) -> subprocess.CompletedProcess[str]:
+    """Run a benchmark script with the source tree on the path, away from any .env file."""
+    return subprocess.run(
+        [sys.executable, str(ROOT / "benchmarks" / script), *args],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(ROOT / "src"), **env},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_run_benchmark(tmp_path):
+    """Test that the hot path benchmark runs every scenario and writes its report."""
+    output = tmp_path / "baseline.json"
+    result = run_benchmark(
+        "run.py",
+        *("--providers", "1,2", "--requests", "5", "--concurrency", "2"),
+        *("--load-providers", "2", "--output", str(output)),
+        cwd=tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    scenarios = json.loads(output.read_text())["scenarios"]
+    assert "ip_command/providers=2/concurrency=2" in scenarios
+    assert "ip_command/providers=2/concurrency=2/coalesced" in scenarios
+
+
+def test_compare_without_baseline(tmp_path):
+    """Test that comparing against a missing baseline explains how to record one."""
+    result = run_benchmark("run.py", "--compare", str(tmp_path / "baseline.json"), cwd=tmp_path)
+
+    assert result.returncode == 2
+    assert "not found" in result.stderr
+
+
+def test_load_benchmark_through_send_queue(tmp_path):
+    """Test that the full-stack load test answers every update with the send queue enabled."""
+    output = tmp_path / "load.json"
+    result = run_benchmark(
+        "load.py",
+        *("--updates", "10", "--chats", "5", "--output", str(output)),
+        cwd=tmp_path,
+        SEND_RATE="30",
+    )
+
+    assert result.returncode == 0, result.stderr
+    report = json.loads(output.read_text())
+    assert report["updates"] == 10
+    assert report["p99_ms"] > 0
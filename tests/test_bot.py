@@ -1,13 +1,31 @@
 """Tests for Telegram bot handlers."""
 
+import logging
 from unittest.mock import AsyncMock, Mock
 
 import pytest
 from telegram import Update, User
 from telegram.ext import ContextTypes
 
-from ipbot.bot import ip_command, setup_handlers
+from ipbot.auth import AccessList, AuthorizationFilter
+from ipbot.backlog import BacklogCoalescer
+from ipbot.bot import (
+    ip_command,
+    setup_handlers,
+    start_command,
+    stats_command,
+    unauthorized_command,
+)
+from ipbot.metrics import FetchMetrics
+from ipbot.rate_limit import RateLimiter
 from ipbot.result import FetcherResult, FetchResult
+from ipbot.send_queue import INTERACTIVE, SendQueue
+
+
+async def stream(*items: FetcherResult | FetchResult):
+    """Yield the given items like CachedFetchOrchestrator.fetch_iter()."""
+    for item in items:
+        yield item
 
 
 class TestIpCommand:
@@ -34,10 +52,11 @@ class TestIpCommand:
             consensus_ip="203.0.113.42",
             has_conflicts=False,
         )
-        mock_orchestrator.fetch_all.return_value = fetch_result
+        mock_orchestrator.fetch_iter = Mock(return_value=stream(fetch_result))
 
         # Create mock context
         mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
         mock_context.bot_data = {
             "orchestrator": mock_orchestrator,
             "config": Mock(telegram_owner_id=123456789),
@@ -46,8 +65,8 @@ class TestIpCommand:
         # Call handler
         await ip_command(mock_update, mock_context)
 
-        # Verify orchestrator was called
-        mock_orchestrator.fetch_all.assert_called_once()
+        # Verify orchestrator was called, allowing cached results
+        mock_orchestrator.fetch_iter.assert_called_once_with(fresh=False)
 
         # Verify message was sent with formatted result
         expected_message = """🌐 IP address: 203.0.113.42
@@ -70,6 +89,7 @@ class TestIpCommand:
         # Create mock context
         mock_orchestrator = AsyncMock()
         mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
         mock_context.bot_data = {
             "orchestrator": mock_orchestrator,
             "config": Mock(telegram_owner_id=123456789),
@@ -79,11 +99,37 @@ class TestIpCommand:
         await ip_command(mock_update, mock_context)
 
         # Verify orchestrator was NOT called
-        mock_orchestrator.fetch_all.assert_not_called()
+        mock_orchestrator.fetch_iter.assert_not_called()
 
         # Verify unauthorized message was sent
         mock_update.message.reply_text.assert_called_once_with("Unauthorized")
 
+    @pytest.mark.asyncio
+    async def test_ip_command_unauthorized_warnings_rate_limited(self, caplog):
+        """Test that rejections without a filter in front are logged by one, rate limited."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 999999999
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.effective_chat = None
+        mock_update.message = AsyncMock()
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
+        mock_context.bot_data = {
+            "orchestrator": AsyncMock(),
+            "config": Mock(telegram_owner_id=123456789),
+        }
+
+        with caplog.at_level(logging.WARNING):
+            for _ in range(3):
+                await ip_command(mock_update, mock_context)
+
+        assert mock_update.message.reply_text.await_count == 3
+        assert [record.name for record in caplog.records] == ["ipbot.auth"]
+        assert mock_context.bot_data["authorization"].rejected == 3
+
     @pytest.mark.asyncio
     async def test_ip_command_all_fetchers_fail(self):
         """Test /ip command handles all fetchers failing."""
@@ -105,10 +151,11 @@ class TestIpCommand:
             consensus_ip=None,
             has_conflicts=False,
         )
-        mock_orchestrator.fetch_all.return_value = fetch_result
+        mock_orchestrator.fetch_iter = Mock(return_value=stream(fetch_result))
 
         # Create mock context
         mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
         mock_context.bot_data = {
             "orchestrator": mock_orchestrator,
             "config": Mock(telegram_owner_id=123456789),
@@ -145,10 +192,11 @@ class TestIpCommand:
             consensus_ip=None,
             has_conflicts=True,
         )
-        mock_orchestrator.fetch_all.return_value = fetch_result
+        mock_orchestrator.fetch_iter = Mock(return_value=stream(fetch_result))
 
         # Create mock context
         mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
         mock_context.bot_data = {
             "orchestrator": mock_orchestrator,
             "config": Mock(telegram_owner_id=123456789),
@@ -164,6 +212,228 @@ class TestIpCommand:
 🟡 identme: 203.0.113.42"""
         mock_update.message.reply_text.assert_called_once_with(expected_message)
 
+    @pytest.mark.asyncio
+    async def test_ip_command_fresh_bypasses_cache(self):
+        """Test that /ip fresh requests a fresh fetch."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 123456789
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+
+        mock_orchestrator = AsyncMock()
+        fetch_result = FetchResult(
+            results=[FetcherResult(fetcher_name="ipify", success=True, ip="203.0.113.42")],
+            consensus_ip="203.0.113.42",
+            has_conflicts=False,
+        )
+        mock_orchestrator.fetch_iter = Mock(return_value=stream(fetch_result))
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ["fresh"]
+        mock_context.bot_data = {
+            "orchestrator": mock_orchestrator,
+            "config": Mock(telegram_owner_id=123456789),
+        }
+
+        await ip_command(mock_update, mock_context)
+
+        mock_orchestrator.fetch_iter.assert_called_once_with(fresh=True)
+
+    @pytest.mark.asyncio
+    async def test_ip_command_answers_from_monitor(self):
+        """Test that /ip uses the monitored result instead of fetching."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 123456789
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+
+        mock_monitor = Mock()
+        mock_monitor.get_recent.return_value = FetchResult(
+            results=[FetcherResult(fetcher_name="ipify", success=True, ip="203.0.113.42")],
+            consensus_ip="203.0.113.42",
+            has_conflicts=False,
+        )
+        mock_orchestrator = AsyncMock()
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
+        mock_context.bot_data = {
+            "orchestrator": mock_orchestrator,
+            "monitor": mock_monitor,
+            "config": Mock(telegram_owner_id=123456789),
+        }
+
+        await ip_command(mock_update, mock_context)
+
+        mock_orchestrator.fetch_iter.assert_not_called()
+        mock_update.message.reply_text.assert_called_once_with(
+            "🌐 IP address: 203.0.113.42\n\n🟢 ipify"
+        )
+
+    @pytest.mark.asyncio
+    async def test_ip_command_replies_progressively(self):
+        """Test that /ip replies at the first IP and edits the reply as providers complete."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 123456789
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+        reply = AsyncMock()
+        mock_update.message.reply_text.return_value = reply
+
+        failed = FetcherResult(fetcher_name="ipinfo", success=False, error_type="Timeout")
+        first = FetcherResult(fetcher_name="ipify", success=True, ip="203.0.113.42")
+        second = FetcherResult(fetcher_name="identme", success=True, ip="203.0.113.42")
+        fetch_result = FetchResult(
+            results=[first, second, failed], consensus_ip="203.0.113.42", has_conflicts=False
+        )
+        mock_orchestrator = AsyncMock()
+        mock_orchestrator.fetch_iter = Mock(
+            return_value=stream(failed, first, second, fetch_result)
+        )
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
+        mock_context.bot_data = {
+            "orchestrator": mock_orchestrator,
+            "config": Mock(telegram_owner_id=123456789),
+        }
+
+        await ip_command(mock_update, mock_context)
+
+        mock_update.message.reply_text.assert_called_once_with(
+            "🌐 IP address: 203.0.113.42\n\n❌ ipinfo: Timeout\n🟢 ipify\n"
+            "⏳ Waiting for other providers…"
+        )
+        assert [call.args[0] for call in reply.edit_text.call_args_list] == [
+            "🌐 IP address: 203.0.113.42\n\n❌ ipinfo: Timeout\n🟢 ipify\n🟢 identme\n"
+            "⏳ Waiting for other providers…",
+            "🌐 IP address: 203.0.113.42\n\n🟢 ipify\n🟢 identme\n❌ ipinfo: Timeout",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ip_command_through_send_queue_skips_superseded_edits(self):
+        """Test that a partial edit still waiting for the chat's send limit is replaced."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 123456789
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+        mock_update.message.chat_id = 123456789
+        reply = AsyncMock()
+        reply.message_id = 2
+        mock_update.message.reply_text.return_value = reply
+
+        first = FetcherResult(fetcher_name="ipify", success=True, ip="203.0.113.42")
+        second = FetcherResult(fetcher_name="identme", success=True, ip="203.0.113.42")
+        fetch_result = FetchResult(
+            results=[first, second], consensus_ip="203.0.113.42", has_conflicts=False
+        )
+        mock_orchestrator = AsyncMock()
+        mock_orchestrator.fetch_iter = Mock(return_value=stream(first, second, fetch_result))
+
+        send_queue = SendQueue(chat_rate=20.0, chat_burst=1)
+        await send_queue.start()
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
+        mock_context.bot_data = {
+            "orchestrator": mock_orchestrator,
+            "config": Mock(telegram_owner_id=123456789),
+            "send_queue": send_queue,
+        }
+
+        await ip_command(mock_update, mock_context)
+        await send_queue.close()
+
+        mock_update.message.reply_text.assert_called_once()
+        reply.edit_text.assert_called_once_with(
+            "🌐 IP address: 203.0.113.42\n\n🟢 ipify\n🟢 identme"
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("command", [start_command, stats_command, unauthorized_command])
+async def test_replies_go_through_send_queue(command):
+    """Test that every command reply is an interactive send of the send queue."""
+    mock_update = Mock(spec=Update)
+    mock_update.effective_user = Mock(spec=User, id=999)
+    mock_update.message = AsyncMock()
+    mock_update.message.chat_id = 999
+    send_queue = AsyncMock(spec=SendQueue)
+
+    mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+    mock_context.bot_data = {
+        "access": AccessList(123),
+        "metrics": FetchMetrics(),
+        "send_queue": send_queue,
+    }
+
+    await command(mock_update, mock_context)
+
+    mock_update.message.reply_text.assert_not_called()
+    chat_id, call, priority, _ = send_queue.send.await_args.args
+    assert (chat_id, priority) == (999, INTERACTIVE)
+    await call()
+    mock_update.message.reply_text.assert_awaited_once_with("Unauthorized")
+
+
+class TestStatsCommand:
+    """Tests for the /stats command handler."""
+
+    @pytest.mark.asyncio
+    async def test_stats_command_authorized_user(self):
+        """Test /stats replies with provider percentiles."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 123456789
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+
+        metrics = FetchMetrics()
+        metrics.observe_fetch("ipify", 0.1, "success")
+        metrics.observe_fetch("ipify", 3.0, "Timeout")
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.bot_data = {
+            "metrics": metrics,
+            "config": Mock(telegram_owner_id=123456789),
+        }
+
+        await stats_command(mock_update, mock_context)
+
+        expected_message = """📊 Provider statistics (p50 / p95 / p99)
+
+ipify: 100ms / 3000ms / 3000ms (1/2 ok)
+   Timeout: 1"""
+        mock_update.message.reply_text.assert_called_once_with(expected_message)
+
+    @pytest.mark.asyncio
+    async def test_stats_command_unauthorized_user(self):
+        """Test /stats rejects unauthorized users."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 999999999
+
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.bot_data = {
+            "metrics": FetchMetrics(),
+            "config": Mock(telegram_owner_id=123456789),
+        }
+
+        await stats_command(mock_update, mock_context)
+
+        mock_update.message.reply_text.assert_called_once_with("Unauthorized")
+
 
 class TestSetupHandlers:
     """Tests for handler registration."""
@@ -176,11 +446,128 @@ class TestSetupHandlers:
 
         setup_handlers(mock_application)
 
-        # Verify add_handler was called twice (for /start and /ip)
-        assert mock_application.add_handler.call_count == 2
+        # Verify add_handler was called for /start, /ip and /stats
+        assert mock_application.add_handler.call_count == 3
 
         # Verify both are CommandHandlers
         calls = mock_application.add_handler.call_args_list
         for call in calls:
             handler = call[0][0]
             assert isinstance(handler, CommandHandler)
+
+    def test_setup_handlers_with_authorization(self):
+        """Test that handlers are filtered and rejected commands get an answer."""
+        from telegram.ext import CommandHandler
+
+        authorization = AuthorizationFilter(AccessList(123))
+        mock_application = Mock()
+
+        setup_handlers(mock_application, authorization)
+
+        handlers = [call[0][0] for call in mock_application.add_handler.call_args_list]
+        assert all(isinstance(handler, CommandHandler) for handler in handlers)
+        assert all(handler.filters is authorization for handler in handlers[:3])
+        assert handlers[3].callback is unauthorized_command
+        assert handlers[3].commands == frozenset({"start", "ip", "stats"})
+
+    def test_setup_handlers_silent(self):
+        """Test that rejected commands are dropped without an answer when silent."""
+        mock_application = Mock()
+
+        setup_handlers(mock_application, AuthorizationFilter(AccessList(123)), silent=True)
+
+        assert mock_application.add_handler.call_count == 3
+
+    def test_setup_handlers_with_backlog(self):
+        """Test that the backlog coalescer runs in a group before the commands."""
+        from telegram.ext import TypeHandler
+
+        backlog = BacklogCoalescer(60.0)
+        mock_application = Mock()
+
+        setup_handlers(mock_application, backlog=backlog)
+
+        (handler,), kwargs = mock_application.add_handler.call_args_list[0]
+        assert isinstance(handler, TypeHandler)
+        assert handler.callback is backlog
+        assert kwargs == {"group": -1}
+
+
+class TestUserAccess:
+    """Tests for roles and per-user fetch limits."""
+
+    @staticmethod
+    def make_update(user_id: int) -> Mock:
+        mock_user = Mock(spec=User)
+        mock_user.id = user_id
+        mock_update = Mock(spec=Update)
+        mock_update.effective_user = mock_user
+        mock_update.message = AsyncMock()
+        return mock_update
+
+    @pytest.mark.asyncio
+    async def test_user_over_fetch_limit_gets_last_result(self):
+        """Test that a user without tokens left is answered from the last result."""
+        last_result = FetchResult(
+            results=[FetcherResult(fetcher_name="ipify", success=True, ip="203.0.113.42")],
+            consensus_ip="203.0.113.42",
+            has_conflicts=False,
+        )
+        mock_orchestrator = Mock(last_result=last_result)
+        mock_orchestrator.starts_fetch.return_value = True
+        mock_orchestrator.fetch_iter = Mock(side_effect=lambda fresh: stream(last_result))
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ["fresh"]
+        mock_context.bot_data = {
+            "orchestrator": mock_orchestrator,
+            "access": AccessList(1, {2: "user"}),
+            "user_limiter": RateLimiter(rate=0.0001, burst=1),
+        }
+
+        first, second = self.make_update(2), self.make_update(2)
+        await ip_command(first, mock_context)
+        await ip_command(second, mock_context)
+
+        assert mock_orchestrator.fetch_iter.call_count == 1
+        mock_orchestrator.starts_fetch.assert_called_with(True)
+        (text,), _ = second.message.reply_text.call_args
+        assert text.startswith("🌐 IP address: 203.0.113.42")
+        assert "Rate limited" in text
+
+    @pytest.mark.asyncio
+    async def test_cached_answers_do_not_use_fetch_limit(self):
+        """Test that requests not starting a fetch are not limited."""
+        fetch_result = FetchResult(results=[], consensus_ip="203.0.113.42", has_conflicts=False)
+        mock_orchestrator = Mock(last_result=None)
+        mock_orchestrator.starts_fetch.return_value = False
+        mock_orchestrator.fetch_iter = Mock(side_effect=lambda fresh: stream(fetch_result))
+
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = []
+        mock_context.bot_data = {
+            "orchestrator": mock_orchestrator,
+            "access": AccessList(1),
+            "user_limiter": RateLimiter(rate=0.0001, burst=1),
+        }
+
+        for _ in range(3):
+            await ip_command(self.make_update(1), mock_context)
+
+        assert mock_orchestrator.fetch_iter.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_stats_command_requires_admin(self):
+        """Test that users without the admin role cannot see stats."""
+        mock_context = Mock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.bot_data = {
+            "metrics": FetchMetrics(),
+            "access": AccessList(1, {2: "user", 3: "admin"}),
+        }
+
+        user, admin = self.make_update(2), self.make_update(3)
+        await stats_command(user, mock_context)
+        await stats_command(admin, mock_context)
+
+        user.message.reply_text.assert_called_once_with("Unauthorized")
+        assert admin.message.reply_text.call_args[0][0] != "Unauthorized"
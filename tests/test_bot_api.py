@@ -0,0 +1,187 @@
+"""Tests for the fake Telegram Bot API server."""
+
+import asyncio
+import json
+import socket
+
+import httpx
+import pytest
+
+from ipbot.config import BotConfig
+from ipbot.main import build_application, webhook_options
+from ipbot.testing.bot_api import FakeBotApi
+from ipbot.testing.simulator import ProviderSimulator
+
+TOKEN = "123:test"
+OWNER_ID = 42
+
+
+@pytest.mark.asyncio
+async def test_get_updates_confirms_by_offset():
+    """Test that getUpdates hands out updates until they are confirmed by offset."""
+    async with FakeBotApi() as api, httpx.AsyncClient() as client:
+        first = api.inject_command("/start", user_id=OWNER_ID)
+        api.inject_command("/ip fresh", user_id=OWNER_ID)
+
+        url = f"{api.base_url}{TOKEN}/getUpdates"
+        updates = (await client.post(url, data={"timeout": "0"})).json()["result"]
+        assert [u["update_id"] for u in updates] == [first, first + 1]
+        assert updates[1]["message"]["text"] == "/ip fresh"
+        assert updates[1]["message"]["entities"][0] == {
+            "type": "bot_command",
+            "offset": 0,
+            "length": 3,
+        }
+
+        data = {"offset": str(first + 2), "timeout": "0"}
+        assert (await client.post(url, data=data)).json()["result"] == []
+
+
+@pytest.mark.asyncio
+async def test_send_message_answers_oldest_update_in_chat():
+    """Test that replies are matched to updates of the same chat in order."""
+    async with FakeBotApi() as api, httpx.AsyncClient() as client:
+        first = api.inject_command("/ip", user_id=OWNER_ID)
+        second = api.inject_command("/ip", user_id=OWNER_ID)
+        other = api.inject_command("/ip", user_id=7)
+        await client.post(f"{api.base_url}{TOKEN}/getUpdates", data={"timeout": "0"})
+
+        url = f"{api.base_url}{TOKEN}/sendMessage"
+        reply = (await client.post(url, data={"chat_id": str(OWNER_ID), "text": "1.2.3.4"})).json()
+        await client.post(
+            f"{api.base_url}{TOKEN}/editMessageText",
+            data={
+                "chat_id": str(OWNER_ID),
+                "message_id": str(reply["result"]["message_id"]),
+                "text": "1.2.3.4 (all providers)",
+            },
+        )
+
+        assert api.traces[first].latency is not None
+        assert api.traces[second].replied_at is None
+        assert api.traces[other].replied_at is None
+        assert [m.method for m in api.sent] == ["sendMessage", "editMessageText"]
+        assert len(api.latencies()) == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_method_fails():
+    """Test that methods the fake does not implement fail like the Bot API does."""
+    async with FakeBotApi() as api, httpx.AsyncClient() as client:
+        response = await client.post(f"{api.base_url}{TOKEN}/sendPhoto")
+
+    assert response.status_code == 404
+    assert response.json()["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_webhook_receives_injected_updates():
+    """Test that updates are POSTed to a registered webhook with its secret token."""
+    received = []
+
+    async def webhook(reader, writer):
+        headers = {}
+        while (line := await reader.readline()).strip():
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        received.append(
+            (headers, json.loads(await reader.readexactly(int(headers["content-length"]))))
+        )
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(webhook, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with FakeBotApi() as api, httpx.AsyncClient() as client:
+            await client.post(
+                f"{api.base_url}{TOKEN}/setWebhook",
+                data={"url": f"http://127.0.0.1:{port}/hook", "secret_token": "s3cret"},
+            )
+            update_id = api.inject_command("/ip", user_id=OWNER_ID)
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+    finally:
+        server.close()
+
+    headers, update = received[0]
+    assert headers["x-telegram-bot-api-secret-token"] == "s3cret"
+    assert update["update_id"] == update_id
+
+
+@pytest.mark.asyncio
+async def test_full_stack_replies_to_injected_commands(monkeypatch):
+    """Test the real application end to end against the fake Bot API and providers."""
+    async with ProviderSimulator(ip="203.0.113.7") as simulator, FakeBotApi() as api:
+        monkeypatch.setenv("TELEGRAM_TOKEN", TOKEN)
+        monkeypatch.setenv("TELEGRAM_OWNER_ID", str(OWNER_ID))
+        monkeypatch.setenv("TELEGRAM_BASE_URL", api.base_url)
+        monkeypatch.setenv("PROVIDER_URLS", json.dumps(simulator.urls()))
+        application = build_application()
+
+        # Mirror run_polling(), which also runs the post_init and post_shutdown hooks
+        async with application:
+            await application.post_init(application)
+            await application.start()
+            await application.updater.start_polling(poll_interval=0, timeout=1)
+            try:
+                for _ in range(5):
+                    api.inject_command("/start", user_id=OWNER_ID)
+                    api.inject_command("/ip fresh", user_id=OWNER_ID)
+                api.inject_command("/ip", user_id=7)
+                await api.wait_for_replies(timeout=10)
+            finally:
+                await application.updater.stop()
+                await application.stop()
+        await application.post_shutdown(application)
+
+    assert len(api.latencies()) == 11
+    first_replies = [m.text for m in api.sent if m.method == "sendMessage"]
+    assert sum("203.0.113.7" in text for text in first_replies) == 5
+    assert "Unauthorized" in first_replies
+
+
+@pytest.mark.asyncio
+async def test_full_stack_webhook(monkeypatch):
+    """Test that the application registers its webhook, answers pushed updates and deletes it."""
+    pytest.importorskip("tornado")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async with ProviderSimulator(ip="203.0.113.7") as simulator, FakeBotApi() as api:
+        monkeypatch.setenv("TELEGRAM_TOKEN", TOKEN)
+        monkeypatch.setenv("TELEGRAM_OWNER_ID", str(OWNER_ID))
+        monkeypatch.setenv("TELEGRAM_BASE_URL", api.base_url)
+        monkeypatch.setenv("PROVIDER_URLS", json.dumps(simulator.urls()))
+        monkeypatch.setenv("WEBHOOK_URL", f"http://127.0.0.1:{port}/telegram")
+        monkeypatch.setenv("WEBHOOK_LISTEN", "127.0.0.1")
+        monkeypatch.setenv("WEBHOOK_PORT", str(port))
+        monkeypatch.setenv("WEBHOOK_PATH", "telegram")
+        monkeypatch.setenv("WEBHOOK_SECRET_TOKEN", "s3cret")
+        application = build_application()
+        config: BotConfig = application.bot_data["config"]
+
+        # Mirror run_webhook(), which also runs the post_* hooks
+        async with application:
+            await application.post_init(application)
+            await application.start()
+            await application.updater.start_webhook(**webhook_options(config))
+            try:
+                assert api.webhook is not None
+                assert api.webhook.secret_token == "s3cret"
+                api.inject_command("/start", user_id=OWNER_ID)
+                api.inject_command("/ip fresh", user_id=OWNER_ID)
+                await api.wait_for_replies(timeout=10)
+            finally:
+                await application.updater.stop()
+                await application.stop()
+                await application.post_stop(application)
+        await application.post_shutdown(application)
+
+        assert api.webhook is None
+
+    assert len(api.latencies()) == 2
@@ -0,0 +1,177 @@
+"""Tests for the CachedFetchOrchestrator."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from ipbot.cache import CachedFetchOrchestrator
+from ipbot.result import FetcherResult, FetchResult
+
+
+def make_result(ip: str | None) -> FetchResult:
+    """Build a FetchResult with a single fetcher."""
+    return FetchResult(
+        results=[FetcherResult(fetcher_name="ipify", success=ip is not None, ip=ip)],
+        consensus_ip=ip,
+        has_conflicts=False,
+    )
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_fetch():
+    """Test that concurrent callers are coalesced into a single fetch."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_fetch(deadline=None, on_result=None):
+        started.set()
+        await release.wait()
+        return make_result("10.10.10.1")
+
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = slow_fetch
+    cache = CachedFetchOrchestrator(orchestrator)
+
+    callers = [asyncio.create_task(cache.fetch_all()) for _ in range(5)]
+    await started.wait()
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert orchestrator.fetch_all.await_count == 1
+    assert all(r.consensus_ip == "10.10.10.1" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_result_served_from_cache_within_ttl():
+    """Test that results are reused until the TTL expires."""
+    clock = FakeClock()
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = [make_result("10.10.10.1"), make_result("10.10.10.2")]
+    cache = CachedFetchOrchestrator(orchestrator, ttl=30.0, clock=clock)
+
+    assert (await cache.fetch_all()).consensus_ip == "10.10.10.1"
+    clock.now += 29.0
+    assert (await cache.fetch_all()).consensus_ip == "10.10.10.1"
+    assert orchestrator.fetch_all.await_count == 1
+
+    clock.now += 2.0
+    assert (await cache.fetch_all()).consensus_ip == "10.10.10.2"
+    assert orchestrator.fetch_all.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_starts_fetch():
+    """Test that only calls not answered from cache or the in-flight fetch start one."""
+    clock = FakeClock()
+    release = asyncio.Event()
+
+    async def slow_fetch(deadline=None, on_result=None):
+        await release.wait()
+        return make_result("10.10.10.1")
+
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = slow_fetch
+    cache = CachedFetchOrchestrator(orchestrator, ttl=30.0, clock=clock)
+    assert cache.starts_fetch()
+
+    fetch = asyncio.create_task(cache.fetch_all())
+    await asyncio.sleep(0)
+    assert not cache.starts_fetch(fresh=True)
+    release.set()
+    await fetch
+
+    assert not cache.starts_fetch()
+    assert cache.starts_fetch(fresh=True)
+    clock.now += 31.0
+    assert cache.starts_fetch()
+
+
+@pytest.mark.asyncio
+async def test_fresh_bypasses_cache():
+    """Test that fresh=True always triggers a new fetch."""
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = [make_result("10.10.10.1"), make_result("10.10.10.2")]
+    cache = CachedFetchOrchestrator(orchestrator, ttl=300.0)
+
+    await cache.fetch_all()
+    result = await cache.fetch_all(fresh=True)
+
+    assert result.consensus_ip == "10.10.10.2"
+    assert orchestrator.fetch_all.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_result_returned_while_revalidating():
+    """Test stale-while-revalidate returns the old result and refreshes in background."""
+    clock = FakeClock()
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = [make_result("10.10.10.1"), make_result("10.10.10.2")]
+    cache = CachedFetchOrchestrator(orchestrator, ttl=10.0, stale_ttl=60.0, clock=clock)
+
+    await cache.fetch_all()
+    clock.now += 30.0
+
+    result = await cache.fetch_all()
+    assert result.consensus_ip == "10.10.10.1"
+
+    # Let the background refresh complete
+    await asyncio.sleep(0)
+    assert orchestrator.fetch_all.await_count == 2
+    assert cache.last_result.consensus_ip == "10.10.10.2"
+
+
+@pytest.mark.asyncio
+async def test_results_without_consensus_not_cached():
+    """Test that failed or conflicting results are not served from cache."""
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = [make_result(None), make_result("10.10.10.1")]
+    cache = CachedFetchOrchestrator(orchestrator, ttl=300.0)
+
+    assert (await cache.fetch_all()).consensus_ip is None
+    assert cache.last_result is None
+    assert (await cache.fetch_all()).consensus_ip == "10.10.10.1"
+    assert orchestrator.fetch_all.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_passed_to_orchestrator():
+    """Test that the fetch budget is forwarded to the orchestrator."""
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.return_value = make_result("10.10.10.1")
+    cache = CachedFetchOrchestrator(orchestrator)
+
+    await cache.fetch_all(deadline=2.5)
+
+    orchestrator.fetch_all.assert_awaited_once_with(deadline=2.5, on_result=None)
+
+
+@pytest.mark.asyncio
+async def test_fetch_iter_streams_new_fetch_and_serves_cache():
+    """Test that fetch_iter streams a new fetch and yields cached results whole."""
+    orchestrator = AsyncMock()
+    progress = FetcherResult(fetcher_name="ipify", success=True, ip="10.10.10.1")
+
+    async def fetch(deadline=None, on_result=None):
+        on_result(progress)
+        return make_result("10.10.10.1")
+
+    orchestrator.fetch_all.side_effect = fetch
+    cache = CachedFetchOrchestrator(orchestrator, ttl=30.0, clock=FakeClock())
+
+    streamed = [item async for item in cache.fetch_iter()]
+    cached = [item async for item in cache.fetch_iter()]
+
+    assert streamed == [progress, make_result("10.10.10.1")]
+    assert cached == [make_result("10.10.10.1")]
+    assert orchestrator.fetch_all.await_count == 1
@@ -0,0 +1,240 @@
+"""Tests for the per-provider circuit breaker."""
+
+import asyncio
+
+import pytest
+
+from ipbot.circuit_breaker import CircuitBreaker, CircuitState
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.fetchers.exceptions import FetcherHTTPError
+from ipbot.metrics import FetchMetrics
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.policy import FetchPolicy
+from ipbot.ranking import ProviderScorer
+from ipbot.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubFetcher(FetchStrategy):
+    """Fetcher returning a fixed IP or raising a fixed exception."""
+
+    def __init__(
+        self, name: str, outcome: str | Exception, url: str | None = None, delay: float = 0.0
+    ):
+        self._name = name
+        self.outcome = outcome
+        self.url = url
+        self.delay = delay
+        self.calls = 0
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_url(self) -> str | None:
+        return self.url
+
+    async def get_ip(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def test_circuit_opens_after_threshold():
+    """Test that consecutive failures open the circuit."""
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure("a")
+    assert breaker.state("a") == CircuitState.CLOSED
+    assert breaker.allow("a") is True
+
+    breaker.record_failure("a")
+    assert breaker.state("a") == CircuitState.OPEN
+    assert breaker.allow("a") is False
+
+
+def test_success_resets_failure_count():
+    """Test that a success between failures keeps the circuit closed."""
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure("a")
+    breaker.record_success("a")
+    breaker.record_failure("a")
+
+    assert breaker.state("a") == CircuitState.CLOSED
+
+
+def test_half_open_allows_single_trial():
+    """Test that after the cool-down only one trial fetch is let through."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30.0, clock=clock)
+    breaker.record_failure("a")
+
+    clock.now += 30.0
+    assert breaker.state("a") == CircuitState.HALF_OPEN
+    assert breaker.allow("a") is True
+    assert breaker.allow("a") is False
+
+    breaker.record_success("a")
+    assert breaker.state("a") == CircuitState.CLOSED
+    assert breaker.allow("a") is True
+
+
+def test_half_open_failure_reopens():
+    """Test that a failed trial opens the circuit for another cool-down."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0, clock=clock)
+    for _ in range(3):
+        breaker.record_failure("a")
+
+    clock.now += 30.0
+    assert breaker.allow("a") is True
+    breaker.record_failure("a")
+
+    assert breaker.state("a") == CircuitState.OPEN
+    clock.now += 29.0
+    assert breaker.allow("a") is False
+
+
+def test_release_returns_trial():
+    """Test that a cancelled trial lets the next fetch try again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30.0, clock=clock)
+    breaker.record_failure("a")
+    clock.now += 30.0
+
+    assert breaker.allow("a") is True
+    breaker.release("a")
+    assert breaker.allow("a") is True
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_skips_open_circuit():
+    """Test that a provider with an open circuit is skipped without a request."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60.0, clock=clock)
+    metrics = FetchMetrics()
+    down = StubFetcher("down", FetcherHTTPError("Network error"))
+    good = StubFetcher("good", "10.10.10.1")
+    orchestrator = ParallelFetchOrchestrator([down, good], metrics=metrics, circuit_breaker=breaker)
+
+    await orchestrator.fetch_all()
+    await orchestrator.fetch_all()
+    result = await orchestrator.fetch_all()
+
+    assert down.calls == 2
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.results[0].skipped is True
+    assert result.results[0].error_type == "Skipped (circuit open)"
+    # Short-circuited fetches are not recorded as provider fetches
+    assert metrics.provider_stats()[0].outcomes == {"Network error": 2}
+
+    # After the cool-down a recovered provider closes its circuit again
+    down.outcome = "10.10.10.1"
+    clock.now += 60.0
+    result = await orchestrator.fetch_all()
+
+    assert down.calls == 3
+    assert result.results[0].success is True
+    assert breaker.state("down") == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_does_not_use_rate_limit_tokens():
+    """Test that skipped fetches keep their token and a throttled trial is given back."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60.0, clock=clock)
+    limiter = RateLimiter(rate=0.001, burst=2, clock=clock)
+    down = StubFetcher("down", FetcherHTTPError("Network error"))
+    orchestrator = ParallelFetchOrchestrator([down], circuit_breaker=breaker, rate_limiter=limiter)
+
+    await orchestrator.fetch_all()
+    for _ in range(5):
+        result = await orchestrator.fetch_all()
+        assert result.results[0].error_type == "Skipped (circuit open)"
+    assert down.calls == 1
+
+    # With the last token gone, the half-open trial is throttled and given back
+    clock.now += 60.0
+    limiter.try_acquire("down")
+    result = await orchestrator.fetch_all()
+    assert result.results[0].error_type == "Skipped (rate limited)"
+    assert breaker.allow("down") is True
+
+
+@pytest.mark.asyncio
+async def test_providers_not_fetched_from_are_not_warmed():
+    """Test that open-circuited and throttled providers get no warming requests."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60.0, clock=clock)
+    limiter = RateLimiter(rate=0, clock=clock)
+    down = StubFetcher("down", FetcherHTTPError("Network error"), "https://down.example/ip")
+    limited = StubFetcher("limited", "203.0.113.1", "https://limited.example/ip")
+    healthy = StubFetcher("healthy", "203.0.113.1", "https://healthy.example/ip")
+    orchestrator = ParallelFetchOrchestrator(
+        [down, limited, healthy], circuit_breaker=breaker, rate_limiter=limiter
+    )
+    await orchestrator.fetch_all()
+    limiter.throttle("limited", 30.0)
+
+    assert orchestrator.admit_warm("https://down.example/") is False
+    assert orchestrator.admit_warm("https://limited.example/ip") is False
+    assert orchestrator.admit_warm("https://healthy.example/other") is True
+
+    # A half-open circuit keeps its single trial for a real fetch
+    clock.now += 60.0
+    assert orchestrator.admit_warm("https://down.example/ip") is False
+    assert breaker.allow("down") is True
+
+
+@pytest.mark.asyncio
+async def test_deadline_counts_as_failure():
+    """Test that a provider hanging past the deadline opens its circuit."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    metrics = FetchMetrics()
+    ranking = ProviderScorer()
+    hanging = StubFetcher("hanging", "203.0.113.1", delay=10.0)
+    healthy = StubFetcher("healthy", "203.0.113.1")
+    orchestrator = ParallelFetchOrchestrator(
+        [hanging, healthy],
+        metrics=metrics,
+        ranking=ranking,
+        circuit_breaker=breaker,
+        deadline=0.05,
+    )
+
+    for _ in range(5):
+        result = await orchestrator.fetch_all()
+        assert result.consensus_ip == "203.0.113.1"
+
+    assert breaker.state("hanging") == CircuitState.OPEN
+    assert hanging.calls == 2
+    assert ranking.score("hanging") > ranking.score("healthy")
+    assert 'provider="hanging",outcome="deadline_exceeded"' in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_policy_cancellation_is_not_a_failure():
+    """Test that a fetch cancelled because the policy was satisfied keeps the circuit closed."""
+    breaker = CircuitBreaker(failure_threshold=1)
+    slow = StubFetcher("slow", "203.0.113.1", delay=10.0)
+    fast = StubFetcher("fast", "203.0.113.1")
+    orchestrator = ParallelFetchOrchestrator(
+        [slow, fast], policy=FetchPolicy.parse("race"), circuit_breaker=breaker
+    )
+
+    for _ in range(3):
+        await orchestrator.fetch_all()
+
+    assert breaker.state("slow") == CircuitState.CLOSED
+    assert slow.calls == 3
@@ -35,6 +35,7 @@ class TestBotConfig:
         assert config.telegram_token == "test_token"
         assert config.telegram_owner_id == 12345
         assert config.fetcher_strategy_order == "all"
+        assert config.fetch_policy == "all"
 
     def test_get_strategy_list_default(self, monkeypatch, tmp_path: Path) -> None:
         """Test parsing default strategy list returns 'all'."""
@@ -77,3 +78,21 @@ class TestBotConfig:
             telegram_token="test", telegram_owner_id=123, fetcher_strategy_order="ipify,curl,"
         )
         assert config.get_strategy_list() == ["ipify", "curl"]
+
+    def test_provider_timeouts_from_env(self, monkeypatch) -> None:
+        """Test that per-provider timeout overrides are read as JSON from the environment."""
+        monkeypatch.setenv("PROVIDER_TIMEOUTS", '{"ident.me": 0.5}')
+        config = BotConfig(telegram_token="test", telegram_owner_id=123)
+        assert config.provider_timeouts == {"ident.me": 0.5}
+
+    def test_provider_urls_from_env(self, monkeypatch) -> None:
+        """Test that provider URL overrides are read as JSON from the environment."""
+        monkeypatch.setenv("PROVIDER_URLS", '{"ipify": "http://127.0.0.1:8080/ipify"}')
+        config = BotConfig(telegram_token="test", telegram_owner_id=123)
+        assert config.provider_urls == {"ipify": "http://127.0.0.1:8080/ipify"}
+
+    def test_access_list_from_env(self, monkeypatch) -> None:
+        """Test that the access list is read as JSON with user and chat IDs as keys."""
+        monkeypatch.setenv("ACCESS_LIST", '{"111": "user", "-100222": "admin"}')
+        config = BotConfig(telegram_token="test", telegram_owner_id=123)
+        assert config.access_list == {111: "user", -100222: "admin"}
@@ -0,0 +1,145 @@
+"""Tests for the DNS cache and its httpx integration."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from ipbot.fetchers.dns_cache import DnsAnswer, DnsCache, DnsCacheTransport, Resolver
+from ipbot.fetchers.http_pool import HttpClientPool
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubResolver(Resolver):
+    """Resolver answering from a fixed table and counting lookups."""
+
+    def __init__(self, table: dict[str, list[str]], ttl: float = 60.0, delay: float = 0.0):
+        self.table = table
+        self.ttl = ttl
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def resolve(self, host: str) -> DnsAnswer:
+        self.calls.append(host)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if host not in self.table:
+            raise OSError(f"Unknown host {host}")
+        return DnsAnswer(addresses=self.table[host], ttl=self.ttl)
+
+
+@pytest.mark.asyncio
+async def test_answer_cached_for_ttl():
+    """Test that a hostname is resolved again only after its TTL."""
+    clock = FakeClock()
+    resolver = StubResolver({"provider.test": ["192.0.2.1"]}, ttl=60.0)
+    cache = DnsCache(resolver, clock=clock)
+
+    assert await cache.resolve("provider.test") == ["192.0.2.1"]
+    assert await cache.resolve("provider.test") == ["192.0.2.1"]
+    assert len(resolver.calls) == 1
+
+    clock.now += 60.0
+    await cache.resolve("provider.test")
+    assert len(resolver.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_query():
+    """Test that concurrent misses for one hostname query the resolver once."""
+    resolver = StubResolver({"provider.test": ["192.0.2.1"]}, delay=0.01)
+    cache = DnsCache(resolver)
+
+    results = await asyncio.gather(*(cache.resolve("provider.test") for _ in range(5)))
+
+    assert results == [["192.0.2.1"]] * 5
+    assert resolver.calls == ["provider.test"]
+
+
+@pytest.mark.asyncio
+async def test_expired_answer_used_when_resolver_fails():
+    """Test that a failing resolver falls back to the last known addresses."""
+    clock = FakeClock()
+    resolver = StubResolver({"provider.test": ["192.0.2.1"]}, ttl=60.0)
+    cache = DnsCache(resolver, clock=clock)
+    await cache.resolve("provider.test")
+
+    resolver.table.clear()
+    clock.now += 120.0
+
+    assert await cache.resolve("provider.test") == ["192.0.2.1"]
+    with pytest.raises(OSError):
+        await cache.resolve("unknown.test")
+
+
+@pytest.mark.asyncio
+async def test_start_prefetches_and_refreshes_watched_hosts():
+    """Test that watched hosts are resolved on start and refreshed in the background."""
+    resolver = StubResolver({"a.test": ["192.0.2.1"], "b.test": ["192.0.2.2"]}, ttl=0.0)
+    cache = DnsCache(resolver, refresh_interval=0.01)
+    cache.watch(["a.test", "b.test"])
+
+    await cache.start()
+    assert sorted(resolver.calls) == ["a.test", "b.test"]
+
+    await asyncio.sleep(0.05)
+    await cache.close()
+    assert len(resolver.calls) > 2
+
+
+@pytest.mark.asyncio
+async def test_pool_connects_through_cache():
+    """Test that the pooled client connects to the address from the DNS cache."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while (await reader.readline()).strip():
+            pass
+        body = b"203.0.113.9"
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s"
+            % (len(body), body)
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    resolver = StubResolver({"provider.test": ["127.0.0.1"]})
+    cache = DnsCache(resolver)
+    cache.watch(["provider.test"])
+    pool = HttpClientPool(dns_cache=cache)
+
+    try:
+        await pool.start()
+        assert pool.client is not None
+        for _ in range(2):
+            response = await pool.client.get(f"http://provider.test:{port}/")
+            assert response.text == "203.0.113.9"
+    finally:
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+
+    assert resolver.calls == ["provider.test"]
+
+
+@pytest.mark.asyncio
+async def test_transport_raises_httpx_errors():
+    """Test that connection failures reach the caller as httpx errors."""
+    transport = DnsCacheTransport(DnsCache(StubResolver({"provider.test": ["127.0.0.1"]})))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError, match="Failed to resolve unknown.test"):
+            await client.get("http://unknown.test/")
+        with pytest.raises(httpx.ConnectError):
+            # Port 1 on localhost refuses the connection
+            await client.get("http://provider.test:1/")
@@ -1,10 +1,13 @@
 """Tests for IP fetching strategies."""
 
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
 import pytest
 
+from ipbot.fetchers.exceptions import FetcherRateLimitedError
+from ipbot.fetchers.http_pool import HttpClientPool
 from ipbot.fetchers.identme import IdentMeStrategy
 from ipbot.fetchers.ifconfig import IfconfigStrategy
 from ipbot.fetchers.ipify import IpifyStrategy
@@ -307,6 +310,20 @@ class TestIdentMeStrategy:
             with pytest.raises(Exception, match="Failed to fetch IP"):
                 await strategy.get_ip()
 
+    @pytest.mark.asyncio
+    async def test_get_ip_rate_limited_names_provider(self):
+        """Test that a 429 error names the provider."""
+        request = httpx.Request("GET", "https://4.ident.me/")
+        response = httpx.Response(429, request=request)
+        mock_pool = Mock(spec=HttpClientPool)
+        mock_pool.client = AsyncMock()
+        mock_pool.client.get.return_value = response
+
+        strategy = IdentMeStrategy(http_pool=mock_pool)
+
+        with pytest.raises(FetcherRateLimitedError, match="^Rate limited by ident.me$"):
+            await strategy.get_ip()
+
     @pytest.mark.asyncio
     async def test_get_ip_invalid_status_code(self):
         """Test handling of non-200 status codes."""
@@ -523,3 +540,146 @@ class TestIpinfoStrategy:
         """Test that get_name returns correct fetcher name."""
         strategy = IpinfoStrategy()
         assert strategy.get_name() == "ipinfo.io"
+
+
+class TestHttpClientPool:
+    """Tests for the shared HttpClientPool."""
+
+    @pytest.mark.asyncio
+    async def test_start_and_close(self):
+        """Test that the pool creates a client on start and releases it on close."""
+        pool = HttpClientPool()
+        assert pool.client is None
+
+        await pool.start()
+        client = pool.client
+        assert isinstance(client, httpx.AsyncClient)
+
+        # Starting twice keeps the same client
+        await pool.start()
+        assert pool.client is client
+
+        await pool.close()
+        assert pool.client is None
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self):
+        """Test that HTTP/2 is disabled when the 'h2' package is missing."""
+        pool = HttpClientPool(http2=True)
+
+        with (
+            patch("ipbot.fetchers.http_pool.importlib.util.find_spec", return_value=None),
+            patch("httpx.AsyncClient") as mock_client_class,
+        ):
+            await pool.start()
+
+        assert mock_client_class.call_args[1]["http2"] is False
+
+    @pytest.mark.asyncio
+    async def test_strategy_uses_shared_client(self):
+        """Test that strategies reuse the pooled client instead of creating one."""
+        mock_response = Mock()
+        mock_response.text = "203.0.113.42\n"
+        mock_response.raise_for_status = Mock()
+
+        mock_pool = Mock(spec=HttpClientPool)
+        mock_pool.client = AsyncMock()
+        mock_pool.client.get.return_value = mock_response
+
+        with patch("httpx.AsyncClient") as mock_client_class:
+            strategy = IdentMeStrategy(http_pool=mock_pool)
+            ip = await strategy.get_ip()
+
+            assert ip == "203.0.113.42"
+            mock_client_class.assert_not_called()
+            mock_pool.client.get.assert_called_once_with("https://4.ident.me/", timeout=3.0)
+
+    @pytest.mark.asyncio
+    async def test_shared_client_errors_wrapped(self):
+        """Test that errors from the pooled client are wrapped as fetcher errors."""
+        mock_pool = Mock(spec=HttpClientPool)
+        mock_pool.client = AsyncMock()
+        mock_pool.client.get.side_effect = httpx.ConnectError("Connection refused")
+
+        strategy = IpinfoStrategy(http_pool=mock_pool)
+
+        with pytest.raises(Exception, match="Failed to fetch IP"):
+            await strategy.get_ip()
+
+    @pytest.mark.asyncio
+    async def test_warm_opens_connections_for_later_requests(self):
+        """Test that warming leaves connections that later requests reuse."""
+        connections = 0
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            nonlocal connections
+            connections += 1
+            while request_line := await reader.readline():
+                while (await reader.readline()).strip():
+                    pass
+                body = b"" if request_line.startswith(b"HEAD") else b"203.0.113.42"
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\n\r\n" + body)
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/ip"
+        pool = HttpClientPool(warm_connections=2)
+
+        try:
+            await pool.start()
+            pool.keep_warm([url, url])
+            await pool.warm()
+            assert connections == 2
+
+            assert pool.client is not None
+            response = await pool.client.get(url)
+            assert response.text == "203.0.113.42"
+            assert connections == 2
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_warm_skips_refused_hosts_within_limit(self):
+        """Test that warming skips refused requests, holds the limit and reports responses."""
+        limit = asyncio.Semaphore(1)
+        answered = []
+        in_flight = 0
+        peak = 0
+
+        async def head(url: str) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.head.side_effect = head
+            mock_client_class.return_value = mock_client
+
+            pool = HttpClientPool(warm_connections=2)
+            await pool.start()
+            pool.keep_warm(
+                ["https://up.example/ip", "https://down.example/ip"],
+                admit=lambda url: "down" not in url,
+                limit=limit,
+                on_response=lambda url, response: answered.append((url, response.status_code)),
+            )
+            await pool.warm()
+            await pool.close()
+
+        urls = [call.args[0] for call in mock_client.head.await_args_list]
+        assert urls == ["https://up.example/ip"] * 2
+        assert peak == 1
+        assert answered == [("https://up.example/ip", 200)] * 2
+
+    def test_strategies_report_their_url(self):
+        """Test that strategies expose the URL used for DNS and connection warming."""
+        assert IdentMeStrategy().get_url() == IdentMeStrategy.IDENTME_URL
+        assert IpifyStrategy().get_url() == IpifyStrategy.IPIFY_URL
@@ -152,3 +152,66 @@ def test_mixed_errors():
 🟢 ipinfo"""
 
     assert output == expected
+
+
+def test_skipped_fetchers():
+    """Test formatting of fetchers skipped or cancelled by the fetch policy."""
+    result = FetchResult(
+        results=[
+            FetcherResult(fetcher_name="identme", success=True, ip="1.1.1.1"),
+            FetcherResult(
+                fetcher_name="ifconfig", success=False, error_type="Cancelled", skipped=True
+            ),
+            FetcherResult(fetcher_name="ipify", success=False, error_type="Skipped", skipped=True),
+        ],
+        consensus_ip="1.1.1.1",
+        has_conflicts=False,
+    )
+
+    formatter = ResultFormatter()
+    output = formatter.format(result)
+
+    expected = """🌐 IP address: 1.1.1.1
+
+🟢 identme
+⚪ ifconfig: Cancelled
+⚪ ipify: Skipped"""
+
+    assert output == expected
+
+
+def test_format_change():
+    """Test formatting of an IP change notification."""
+    result = FetchResult(
+        results=[FetcherResult(fetcher_name="ipify", success=True, ip="10.10.10.2")],
+        consensus_ip="10.10.10.2",
+        has_conflicts=False,
+    )
+
+    output = ResultFormatter().format_change("10.10.10.1", result)
+
+    expected = """🔔 IP address changed (was 10.10.10.1)
+
+🌐 IP address: 10.10.10.2
+
+🟢 ipify"""
+
+    assert output == expected
+
+
+def test_format_partial():
+    """Test formatting of a fetch that is still running."""
+    results = [
+        FetcherResult(fetcher_name="ipify", success=True, ip="10.10.10.1"),
+        FetcherResult(fetcher_name="ipinfo", success=False, error_type="Timeout"),
+    ]
+
+    output = ResultFormatter().format_partial(results)
+
+    expected = """🌐 IP address: 10.10.10.1
+
+🟢 ipify
+❌ ipinfo: Timeout
+⏳ Waiting for other providers…"""
+
+    assert output == expected
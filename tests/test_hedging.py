@@ -0,0 +1,122 @@
+"""Tests for hedged requests."""
+
+import asyncio
+
+import pytest
+
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.hedging import HedgeBudget, HedgePolicy, hedged_call
+from ipbot.metrics import FetchMetrics
+from ipbot.orchestrator import ParallelFetchOrchestrator
+
+
+class SequencedCall:
+    """Callable returning a different (delay, outcome) pair on each call."""
+
+    def __init__(self, *attempts: tuple[float, str | Exception]):
+        self.attempts = list(attempts)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> str:
+        delay, outcome = self.attempts[self.calls]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_budget_is_bounded():
+    """Test that the hedge budget allows only the configured number of hedges."""
+    budget = HedgeBudget(2)
+
+    assert budget.try_acquire() is True
+    assert budget.try_acquire() is True
+    assert budget.try_acquire() is False
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+    """Test that a call finishing before the delay is not duplicated."""
+    call = SequencedCall((0.0, "10.10.10.1"))
+    budget = HedgeBudget(1)
+
+    assert await hedged_call(call, delay=1.0, budget=budget) == "10.10.10.1"
+    assert call.calls == 1
+    assert budget.remaining == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled():
+    """Test that a slow call is duplicated and the slower attempt cancelled."""
+    call = SequencedCall((5.0, "10.10.10.1"), (0.0, "10.10.10.2"))
+    budget = HedgeBudget(1)
+
+    result = await asyncio.wait_for(hedged_call(call, delay=0.01, budget=budget), timeout=1.0)
+
+    assert result == "10.10.10.2"
+    assert call.calls == 2
+    assert call.cancelled == 1
+    assert budget.remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_failure_waits_for_primary():
+    """Test that a failing hedge does not hide a successful original attempt."""
+    call = SequencedCall((0.05, "10.10.10.1"), (0.0, RuntimeError("reset")))
+
+    result = await hedged_call(call, delay=0.01, budget=HedgeBudget(1))
+
+    assert result == "10.10.10.1"
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget():
+    """Test that a slow call is awaited normally once the budget is spent."""
+    call = SequencedCall((0.05, "10.10.10.1"))
+
+    result = await hedged_call(call, delay=0.01, budget=HedgeBudget(0))
+
+    assert result == "10.10.10.1"
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_hedges_slow_provider():
+    """Test that the orchestrator hedges a provider slower than its observed p95."""
+
+    class SlowOnceFetcher(FetchStrategy):
+        def __init__(self):
+            self.calls = 0
+
+        def get_name(self) -> str:
+            return "slow"
+
+        async def get_ip(self) -> str:
+            self.calls += 1
+            if self.calls == 1:
+                await asyncio.sleep(5.0)
+            return "10.10.10.1"
+
+    fetcher = SlowOnceFetcher()
+    metrics = FetchMetrics()
+    orchestrator = ParallelFetchOrchestrator(
+        [fetcher],
+        hedging=HedgePolicy(percentile=0.95, max_hedges=1, min_samples=3),
+        metrics=metrics,
+    )
+    for _ in range(3):
+        orchestrator.latency.record("slow", 0.05)
+
+    result = await asyncio.wait_for(orchestrator.fetch_all(), timeout=1.0)
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert fetcher.calls == 2
+    # The hedge that answered is sampled without the wait before it started
+    assert metrics.latency.percentile("slow", 0.5) < 0.01
+    assert 'ipbot_fetch_hedges_total{provider="slow"} 1' in metrics.render()
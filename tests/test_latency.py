@@ -0,0 +1,33 @@
+"""Tests for the LatencyTracker."""
+
+from ipbot.latency import LatencyTracker
+
+
+def test_percentile_nearest_rank():
+    """Test percentile calculation over recorded samples."""
+    tracker = LatencyTracker()
+    for ms in range(1, 101):
+        tracker.record("ipify", ms / 1000)
+
+    assert tracker.count("ipify") == 100
+    assert tracker.percentile("ipify", 0.5) == 0.050
+    assert tracker.percentile("ipify", 0.95) == 0.095
+    assert tracker.percentile("ipify", 1.0) == 0.100
+
+
+def test_percentile_without_samples():
+    """Test that unknown providers have no percentile."""
+    tracker = LatencyTracker()
+
+    assert tracker.count("ipify") == 0
+    assert tracker.percentile("ipify", 0.95) is None
+
+
+def test_window_keeps_recent_samples():
+    """Test that only the most recent samples are kept."""
+    tracker = LatencyTracker(window=3)
+    for seconds in [5.0, 5.0, 0.1, 0.2, 0.3]:
+        tracker.record("ipify", seconds)
+
+    assert tracker.count("ipify") == 3
+    assert tracker.percentile("ipify", 1.0) == 0.3
@@ -1,30 +1,54 @@
 """Tests for the main application entry point."""
 
-from unittest.mock import Mock, patch
-
-from ipbot.main import build_application, main
+from unittest.mock import ANY, AsyncMock, Mock, patch
+
+import pytest
+
+from ipbot.auth import AccessList
+from ipbot.config import BotConfig
+from ipbot.main import (
+    build_application,
+    main,
+    post_init,
+    post_shutdown,
+    post_stop,
+    webhook_options,
+)
+from ipbot.metrics import FetchMetrics
+from ipbot.monitor import IpMonitor
+from ipbot.policy import FetchPolicy
+from ipbot.send_queue import SendQueue
+from ipbot.update_processor import ChatOrderedUpdateProcessor
 
 
 class TestBuildApplication:
     """Tests for the build_application function."""
 
     @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.HttpClientPool")
     @patch("ipbot.main.create_fetchers")
     @patch("ipbot.main.ParallelFetchOrchestrator")
+    @patch("ipbot.main.CachedFetchOrchestrator")
     @patch("ipbot.main.setup_handlers")
     @patch("ipbot.main.ApplicationBuilder")
     def test_build_application_creates_application(
         self,
         mock_app_builder,
         mock_setup_handlers,
+        mock_cached_orchestrator_class,
         mock_orchestrator_class,
         mock_create_fetchers,
+        mock_http_pool_class,
         mock_config,
     ):
         """Test that build_application creates and configures an Application."""
         # Setup mocks
-        mock_config_instance = Mock()
-        mock_config_instance.telegram_token = "test_token"
+        mock_config_instance = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            cache_ttl=30.0,
+            cache_stale_ttl=300.0,
+        )
         mock_config.return_value = mock_config_instance
 
         mock_fetcher1 = Mock()
@@ -36,10 +60,18 @@ class TestBuildApplication:
         mock_orchestrator = Mock()
         mock_orchestrator_class.return_value = mock_orchestrator
 
+        mock_cached_orchestrator = Mock()
+        mock_cached_orchestrator_class.return_value = mock_cached_orchestrator
+
+        mock_http_pool = Mock()
+        mock_http_pool_class.return_value = mock_http_pool
+
         mock_builder = Mock()
         mock_application = Mock()
         mock_application.bot_data = {}  # Make bot_data a real dict
         mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
         mock_builder.build.return_value = mock_application
         mock_app_builder.return_value = mock_builder
 
@@ -49,39 +81,76 @@ class TestBuildApplication:
         # Verify config was loaded
         mock_config.assert_called_once()
 
-        # Verify fetchers were created with config
-        mock_create_fetchers.assert_called_once_with(mock_config_instance)
+        # Verify fetchers were created with config and the shared HTTP pool
+        mock_create_fetchers.assert_called_once_with(mock_config_instance, mock_http_pool)
 
         # Verify orchestrator was created with all fetchers
-        mock_orchestrator_class.assert_called_once_with([mock_fetcher1, mock_fetcher2])
+        mock_orchestrator_class.assert_called_once_with(
+            [mock_fetcher1, mock_fetcher2],
+            policy=FetchPolicy(),
+            hedging=None,
+            metrics=ANY,
+            ranking=None,
+            top_n=0,
+            circuit_breaker=None,
+            deadline=None,
+            timeouts=None,
+            retry=None,
+            rate_limiter=None,
+            max_concurrency=0,
+        )
+
+        # Verify orchestrator was wrapped in the result cache
+        mock_cached_orchestrator_class.assert_called_once_with(
+            mock_orchestrator, ttl=30.0, stale_ttl=300.0
+        )
 
         # Verify ApplicationBuilder was configured
         mock_app_builder.assert_called_once()
         mock_builder.token.assert_called_once_with("test_token")
+        mock_builder.post_init.assert_called_once_with(post_init)
+        mock_builder.post_shutdown.assert_called_once_with(post_shutdown)
+        mock_builder.base_url.assert_not_called()
         mock_builder.build.assert_called_once()
 
-        # Verify bot_data was set with orchestrator
+        # Verify bot_data was set with orchestrator and HTTP pool
         assert mock_application.bot_data == {
             "config": mock_config_instance,
-            "orchestrator": mock_orchestrator,
+            "orchestrator": mock_cached_orchestrator,
+            "http_pool": mock_http_pool,
+            "metrics": ANY,
+            "access": ANY,
+            "authorization": ANY,
         }
+        assert isinstance(mock_application.bot_data["metrics"], FetchMetrics)
+        assert isinstance(mock_application.bot_data["access"], AccessList)
 
         # Verify handlers were setup
-        mock_setup_handlers.assert_called_once_with(mock_application)
+        mock_setup_handlers.assert_called_once_with(
+            mock_application,
+            mock_application.bot_data["authorization"],
+            silent=False,
+            backlog=None,
+        )
 
         # Verify result is the application
         assert result == mock_application
 
     @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.HttpClientPool")
     @patch("ipbot.main.create_fetchers")
     @patch("ipbot.main.ParallelFetchOrchestrator")
     def test_build_application_uses_create_fetchers(
-        self, mock_orchestrator_class, mock_create_fetchers, mock_config
+        self, mock_orchestrator_class, mock_create_fetchers, mock_http_pool_class, mock_config
     ):
         """Test that build_application uses create_fetchers function."""
         # Setup mocks
-        mock_config_instance = Mock()
-        mock_config_instance.telegram_token = "test_token"
+        mock_config_instance = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            cache_ttl=30.0,
+            cache_stale_ttl=300.0,
+        )
         mock_config.return_value = mock_config_instance
 
         mock_fetcher1 = Mock()
@@ -95,14 +164,299 @@ class TestBuildApplication:
         with patch("ipbot.main.ApplicationBuilder"), patch("ipbot.main.setup_handlers"):
             build_application()
 
-            # Verify create_fetchers was called with config
-            mock_create_fetchers.assert_called_once_with(mock_config_instance)
+            # Verify create_fetchers was called with config and HTTP pool
+            mock_create_fetchers.assert_called_once_with(
+                mock_config_instance, mock_http_pool_class.return_value
+            )
 
             # Verify orchestrator was created with all fetchers
             mock_orchestrator_class.assert_called_once_with(
-                [mock_fetcher1, mock_fetcher2, mock_fetcher3]
+                [mock_fetcher1, mock_fetcher2, mock_fetcher3],
+                policy=FetchPolicy(),
+                hedging=None,
+                metrics=ANY,
+                ranking=None,
+                top_n=0,
+                circuit_breaker=None,
+                deadline=None,
+                timeouts=None,
+                retry=None,
+                rate_limiter=None,
+                max_concurrency=0,
             )
 
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    def test_build_application_monitor_job_is_scheduled(self, mock_create_fetchers, mock_config):
+        """Test that the real application has a job queue running the IP monitor."""
+        mock_config.return_value = BotConfig(
+            telegram_token="123:test", telegram_owner_id=123, monitor_interval=60.0
+        )
+        mock_create_fetchers.return_value = []
+
+        application = build_application()
+
+        assert application.job_queue is not None
+        (job,) = application.job_queue.get_jobs_by_name(IpMonitor.JOB_NAME)
+        assert job.callback == application.bot_data["monitor"].check
+
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    @patch("ipbot.main.IpMonitor")
+    @patch("ipbot.main.setup_handlers")
+    @patch("ipbot.main.ApplicationBuilder")
+    def test_build_application_schedules_monitor(
+        self,
+        mock_app_builder,
+        mock_setup_handlers,
+        mock_monitor_class,
+        mock_create_fetchers,
+        mock_config,
+    ):
+        """Test that the IP monitor is scheduled when an interval is configured."""
+        mock_config_instance = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            monitor_interval=60.0,
+            monitor_debounce=3,
+        )
+        mock_config.return_value = mock_config_instance
+        mock_create_fetchers.return_value = []
+
+        mock_application = Mock()
+        mock_application.bot_data = {}
+        mock_builder = mock_app_builder.return_value
+        mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
+        mock_builder.build.return_value = mock_application
+
+        build_application()
+
+        mock_monitor = mock_monitor_class.return_value
+        assert mock_monitor_class.call_args[1] == {
+            "owner_id": 123,
+            "interval": 60.0,
+            "debounce": 3,
+            "notify_ids": [],
+            "send_queue": None,
+        }
+        mock_monitor.schedule.assert_called_once_with(mock_application.job_queue)
+        assert mock_application.bot_data["monitor"] is mock_monitor
+
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    @patch("ipbot.main.IpMonitor")
+    @patch("ipbot.main.setup_handlers")
+    @patch("ipbot.main.ApplicationBuilder")
+    def test_build_application_monitor_without_job_queue(
+        self,
+        mock_app_builder,
+        mock_setup_handlers,
+        mock_monitor_class,
+        mock_create_fetchers,
+        mock_config,
+    ):
+        """Test that the monitor is skipped when the job queue extra is missing."""
+        mock_config_instance = BotConfig(
+            telegram_token="test_token", telegram_owner_id=123, monitor_interval=60.0
+        )
+        mock_config.return_value = mock_config_instance
+        mock_create_fetchers.return_value = []
+
+        mock_application = Mock()
+        mock_application.bot_data = {}
+        mock_application.job_queue = None
+        mock_builder = mock_app_builder.return_value
+        mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
+        mock_builder.build.return_value = mock_application
+
+        build_application()
+
+        mock_monitor_class.assert_not_called()
+        assert "monitor" not in mock_application.bot_data
+
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    @patch("ipbot.main.setup_handlers")
+    @patch("ipbot.main.ApplicationBuilder")
+    def test_build_application_custom_base_url(
+        self, mock_app_builder, mock_setup_handlers, mock_create_fetchers, mock_config
+    ):
+        """Test that a configured Bot API base URL is passed to the builder."""
+        mock_config.return_value = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            telegram_base_url="http://127.0.0.1:8081/bot",
+        )
+        mock_create_fetchers.return_value = []
+
+        mock_application = Mock()
+        mock_application.bot_data = {}
+        mock_builder = mock_app_builder.return_value
+        mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
+        mock_builder.base_url.return_value = mock_builder
+        mock_builder.build.return_value = mock_application
+
+        assert build_application() is mock_application
+
+        mock_builder.base_url.assert_called_once_with("http://127.0.0.1:8081/bot")
+        mock_builder.post_stop.assert_not_called()
+
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    @patch("ipbot.main.setup_handlers")
+    @patch("ipbot.main.ApplicationBuilder")
+    def test_build_application_webhook_registers_post_stop(
+        self, mock_app_builder, mock_setup_handlers, mock_create_fetchers, mock_config
+    ):
+        """Test that the webhook is deleted on stop in webhook mode."""
+        mock_config.return_value = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            webhook_url="https://bot.example.com/telegram",
+        )
+        mock_create_fetchers.return_value = []
+
+        mock_application = Mock()
+        mock_application.bot_data = {}
+        mock_builder = mock_app_builder.return_value
+        mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
+        mock_builder.post_stop.return_value = mock_builder
+        mock_builder.build.return_value = mock_application
+
+        assert build_application() is mock_application
+
+        mock_builder.post_stop.assert_called_once_with(post_stop)
+
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    @patch("ipbot.main.setup_handlers")
+    @patch("ipbot.main.ApplicationBuilder")
+    def test_build_application_send_queue(
+        self, mock_app_builder, mock_setup_handlers, mock_create_fetchers, mock_config
+    ):
+        """Test that the send queue is stored and flushed on stop when enabled."""
+        mock_config.return_value = BotConfig(
+            telegram_token="test_token", telegram_owner_id=123, send_rate=20.0
+        )
+        mock_create_fetchers.return_value = []
+
+        mock_application = Mock()
+        mock_application.bot_data = {}
+        mock_builder = mock_app_builder.return_value
+        mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
+        mock_builder.post_stop.return_value = mock_builder
+        mock_builder.build.return_value = mock_application
+
+        assert build_application() is mock_application
+
+        assert isinstance(mock_application.bot_data["send_queue"], SendQueue)
+        mock_builder.post_stop.assert_called_once_with(post_stop)
+
+    @patch("ipbot.main.BotConfig")
+    @patch("ipbot.main.create_fetchers")
+    @patch("ipbot.main.setup_handlers")
+    @patch("ipbot.main.ApplicationBuilder")
+    def test_build_application_concurrent_updates(
+        self, mock_app_builder, mock_setup_handlers, mock_create_fetchers, mock_config
+    ):
+        """Test that concurrent updates use the chat-ordered update processor."""
+        mock_config.return_value = BotConfig(
+            telegram_token="test_token", telegram_owner_id=123, concurrent_updates=16
+        )
+        mock_create_fetchers.return_value = []
+
+        mock_application = Mock()
+        mock_application.bot_data = {}
+        mock_builder = mock_app_builder.return_value
+        mock_builder.token.return_value = mock_builder
+        mock_builder.post_init.return_value = mock_builder
+        mock_builder.post_shutdown.return_value = mock_builder
+        mock_builder.concurrent_updates.return_value = mock_builder
+        mock_builder.build.return_value = mock_application
+
+        assert build_application() is mock_application
+
+        (processor,), _ = mock_builder.concurrent_updates.call_args
+        assert isinstance(processor, ChatOrderedUpdateProcessor)
+        assert processor.max_concurrent_updates == 16
+
+
+class TestLifecycleHooks:
+    """Tests for the application post_init and post_shutdown hooks."""
+
+    @pytest.mark.asyncio
+    async def test_post_init_starts_http_pool(self):
+        """Test that post_init starts the shared HTTP client pool."""
+        mock_http_pool = AsyncMock()
+        mock_application = Mock()
+        mock_application.bot_data = {"http_pool": mock_http_pool}
+
+        await post_init(mock_application)
+
+        mock_http_pool.start.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_post_shutdown_closes_http_pool(self):
+        """Test that post_shutdown closes the shared HTTP client pool."""
+        mock_http_pool = AsyncMock()
+        mock_application = Mock()
+        mock_application.bot_data = {"http_pool": mock_http_pool}
+
+        await post_shutdown(mock_application)
+
+        mock_http_pool.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_post_stop_deletes_webhook(self):
+        """Test that post_stop unregisters the webhook."""
+        mock_application = Mock()
+        mock_application.bot_data = {
+            "config": BotConfig(
+                telegram_token="test_token",
+                telegram_owner_id=123,
+                webhook_url="https://bot.example.com/hook",
+            )
+        }
+        mock_application.bot.delete_webhook = AsyncMock()
+
+        await post_stop(mock_application)
+
+        mock_application.bot.delete_webhook.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_send_queue_started_and_flushed(self):
+        """Test that the send queue starts with the application and is flushed on stop."""
+        mock_send_queue = AsyncMock()
+        mock_application = Mock()
+        mock_application.bot_data = {
+            "config": BotConfig(
+                telegram_token="test_token", telegram_owner_id=123, send_flush_timeout=2.0
+            ),
+            "http_pool": AsyncMock(),
+            "send_queue": mock_send_queue,
+        }
+        mock_application.bot.delete_webhook = AsyncMock()
+
+        await post_init(mock_application)
+        await post_stop(mock_application)
+
+        mock_send_queue.start.assert_awaited_once()
+        mock_send_queue.close.assert_awaited_once_with(timeout=2.0)
+        mock_application.bot.delete_webhook.assert_not_awaited()
+
+
+CONFIG = BotConfig(telegram_token="test_token", telegram_owner_id=123)
+
 
 class TestMain:
     """Tests for the main function."""
@@ -113,6 +467,7 @@ class TestMain:
         """Test that main builds and runs the application."""
         # Setup mocks
         mock_application = Mock()
+        mock_application.bot_data = {"config": CONFIG}
         mock_application.run_polling = Mock()
         mock_build_app.return_value = mock_application
 
@@ -134,6 +489,7 @@ class TestMain:
         """Test that main logs startup message."""
         # Setup mocks
         mock_application = Mock()
+        mock_application.bot_data = {"config": CONFIG}
         mock_application.run_polling = Mock()
         mock_build_app.return_value = mock_application
 
@@ -152,6 +508,7 @@ class TestMain:
         """Test that main logs shutdown message."""
         # Setup mocks
         mock_application = Mock()
+        mock_application.bot_data = {"config": CONFIG}
         mock_application.run_polling = Mock()
         mock_build_app.return_value = mock_application
 
@@ -163,3 +520,52 @@ class TestMain:
             call for call in mock_logger.info.call_args_list if "shutdown" in str(call).lower()
         ]
         assert len(shutdown_calls) > 0
+
+    @patch("ipbot.main.build_application")
+    @patch("ipbot.main.logger")
+    def test_main_runs_webhook(self, mock_logger, mock_build_app):
+        """Test that main serves a webhook instead of polling when one is configured."""
+        config = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            webhook_url="https://bot.example.com/telegram",
+            webhook_path="telegram",
+            webhook_secret_token="s3cret",
+        )
+        mock_application = Mock()
+        mock_application.bot_data = {"config": config}
+        mock_build_app.return_value = mock_application
+
+        main()
+
+        mock_application.run_polling.assert_not_called()
+        mock_application.run_webhook.assert_called_once_with(
+            listen="0.0.0.0",
+            port=8443,
+            url_path="telegram",
+            webhook_url="https://bot.example.com/telegram",
+            secret_token="s3cret",
+            cert=None,
+            key=None,
+            max_connections=40,
+        )
+
+
+class TestWebhookOptions:
+    """Tests for the webhook_options function."""
+
+    def test_webhook_options_with_tls(self):
+        """Test that a certificate and key make the webhook server terminate TLS itself."""
+        config = BotConfig(
+            telegram_token="test_token",
+            telegram_owner_id=123,
+            webhook_url="https://bot.example.com:8443/",
+            webhook_cert="/etc/ipbot/cert.pem",
+            webhook_key="/etc/ipbot/key.pem",
+        )
+
+        options = webhook_options(config)
+
+        assert options["cert"] == "/etc/ipbot/cert.pem"
+        assert options["key"] == "/etc/ipbot/key.pem"
+        assert options["secret_token"] is None
@@ -0,0 +1,116 @@
+"""Tests for fetch metrics and the metrics endpoint."""
+
+import asyncio
+
+import pytest
+
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.fetchers.exceptions import FetcherHTTPError
+from ipbot.metrics import FetchMetrics, MetricsServer
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.result import FetcherResult, FetchResult
+
+
+class StubFetcher(FetchStrategy):
+    """Fetcher returning a fixed IP or raising a fixed exception."""
+
+    def __init__(self, name: str, outcome: str | Exception):
+        self._name = name
+        self._outcome = outcome
+
+    def get_name(self) -> str:
+        return self._name
+
+    async def get_ip(self) -> str:
+        if isinstance(self._outcome, Exception):
+            raise self._outcome
+        return self._outcome
+
+
+def test_provider_stats():
+    """Test percentile and outcome summaries per provider."""
+    metrics = FetchMetrics()
+    for ms in range(1, 101):
+        metrics.observe_fetch("ipify", ms / 1000, "success")
+    metrics.observe_fetch("identme", 3.0, "Timeout")
+
+    stats = {s.name: s for s in metrics.provider_stats()}
+
+    assert stats["ipify"].p50 == 0.050
+    assert stats["ipify"].p95 == 0.095
+    assert stats["ipify"].p99 == 0.099
+    assert stats["ipify"].outcomes == {"success": 100}
+    assert stats["identme"].outcomes == {"Timeout": 1}
+
+
+def test_render_prometheus_text():
+    """Test the Prometheus exposition output."""
+    metrics = FetchMetrics()
+    metrics.observe_fetch("ipify.org", 0.2, "success")
+    metrics.observe_fetch("ipify.org", 3.0, "Network error")
+    metrics.observe_result(
+        FetchResult(
+            results=[FetcherResult(fetcher_name="ipify.org", success=True, ip="1.1.1.1")],
+            consensus_ip="1.1.1.1",
+            has_conflicts=False,
+        )
+    )
+
+    output = metrics.render()
+
+    assert 'ipbot_fetch_duration_seconds_bucket{provider="ipify.org",le="0.1"} 0' in output
+    assert 'ipbot_fetch_duration_seconds_bucket{provider="ipify.org",le="0.25"} 1' in output
+    assert 'ipbot_fetch_duration_seconds_bucket{provider="ipify.org",le="5.0"} 2' in output
+    assert 'ipbot_fetch_duration_seconds_bucket{provider="ipify.org",le="+Inf"} 2' in output
+    assert 'ipbot_fetch_duration_seconds_count{provider="ipify.org"} 2' in output
+    assert 'ipbot_fetch_total{provider="ipify.org",outcome="success"} 1' in output
+    assert 'ipbot_fetch_total{provider="ipify.org",outcome="network_error"} 1' in output
+    assert 'ipbot_fetch_results_total{result="consensus"} 1' in output
+    assert 'ipbot_fetch_results_total{result="conflict"} 0' in output
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_records_metrics():
+    """Test that the orchestrator records outcomes and results."""
+    metrics = FetchMetrics()
+    fetchers = [
+        StubFetcher("ok", "10.10.10.1"),
+        StubFetcher("down", FetcherHTTPError("Network error")),
+        StubFetcher("slow", TimeoutError()),
+    ]
+
+    await ParallelFetchOrchestrator(fetchers, metrics=metrics).fetch_all()
+
+    outcomes = {s.name: s.outcomes for s in metrics.provider_stats()}
+    assert outcomes == {
+        "ok": {"success": 1},
+        "down": {"Network error": 1},
+        "slow": {"Timeout": 1},
+    }
+    assert 'ipbot_fetch_results_total{result="consensus"} 1' in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_metrics():
+    """Test that the metrics endpoint serves the exposition text over HTTP."""
+    metrics = FetchMetrics()
+    metrics.observe_fetch("ipify", 0.1, "success")
+    server = MetricsServer(metrics, port=0)
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /other HTTP/1.1\r\n\r\n")
+        not_found = (await reader.read()).decode()
+        writer.close()
+    finally:
+        await server.close()
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert 'ipbot_fetch_total{provider="ipify",outcome="success"} 1' in response
+    assert not_found.startswith("HTTP/1.1 404")
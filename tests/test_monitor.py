@@ -0,0 +1,148 @@
+"""Tests for the background IpMonitor."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from telegram.error import Forbidden
+
+from ipbot.monitor import IpMonitor
+from ipbot.result import FetcherResult, FetchResult
+from ipbot.send_queue import SendQueue
+
+
+def make_result(ip: str | None) -> FetchResult:
+    """Build a FetchResult with a single fetcher."""
+    return FetchResult(
+        results=[FetcherResult(fetcher_name="ipify", success=ip is not None, ip=ip)],
+        consensus_ip=ip,
+        has_conflicts=False,
+    )
+
+
+def make_monitor(ips: list[str | None], debounce: int = 2, **kwargs) -> tuple[IpMonitor, Mock]:
+    """Create a monitor whose orchestrator returns the given consensus IPs in order."""
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.side_effect = [make_result(ip) for ip in ips]
+    monitor = IpMonitor(orchestrator, owner_id=42, interval=60.0, debounce=debounce, **kwargs)
+
+    context = Mock()
+    context.bot.send_message = AsyncMock()
+    return monitor, context
+
+
+@pytest.mark.asyncio
+async def test_first_check_sets_baseline_without_notifying():
+    """Test that the first observed IP does not trigger a notification."""
+    monitor, context = make_monitor(["10.10.10.1"])
+
+    await monitor.check(context)
+
+    assert monitor.current_ip == "10.10.10.1"
+    context.bot.send_message.assert_not_called()
+    monitor.orchestrator.fetch_all.assert_called_once_with(fresh=True)
+
+
+@pytest.mark.asyncio
+async def test_change_notified_after_debounce():
+    """Test that a new IP is reported only after consecutive confirmations."""
+    monitor, context = make_monitor(["10.10.10.1", "10.10.10.2", "10.10.10.2"])
+
+    await monitor.check(context)
+    await monitor.check(context)
+    context.bot.send_message.assert_not_called()
+
+    await monitor.check(context)
+
+    assert monitor.current_ip == "10.10.10.2"
+    context.bot.send_message.assert_called_once()
+    kwargs = context.bot.send_message.call_args[1]
+    assert kwargs["chat_id"] == 42
+    assert "was 10.10.10.1" in kwargs["text"]
+
+
+@pytest.mark.asyncio
+async def test_change_notified_to_all_chats():
+    """Test that every chat is notified once, even if one of them cannot be reached."""
+    monitor, context = make_monitor(["10.10.10.1", "10.10.10.2"], debounce=1, notify_ids=[7, 42, 8])
+    context.bot.send_message.side_effect = [None, Forbidden("blocked"), None]
+
+    await monitor.check(context)
+    await monitor.check(context)
+
+    chat_ids = [call.kwargs["chat_id"] for call in context.bot.send_message.call_args_list]
+    assert chat_ids == [42, 7, 8]
+
+
+@pytest.mark.asyncio
+async def test_change_fanned_out_through_send_queue():
+    """Test that notifications are queued without holding up the check."""
+    send_queue = SendQueue(chat_burst=1)
+    monitor, context = make_monitor(
+        ["10.10.10.1", "10.10.10.2"], debounce=1, notify_ids=[7, 8], send_queue=send_queue
+    )
+
+    await monitor.check(context)
+    await monitor.check(context)
+    context.bot.send_message.assert_not_called()
+    assert send_queue.pending == 3
+
+    await send_queue.start()
+    await send_queue.close()
+
+    chat_ids = [call.kwargs["chat_id"] for call in context.bot.send_message.call_args_list]
+    assert sorted(chat_ids) == [7, 8, 42]
+
+
+@pytest.mark.asyncio
+async def test_flapping_does_not_notify():
+    """Test that an IP flapping back before debounce completes is ignored."""
+    monitor, context = make_monitor(
+        ["10.10.10.1", "10.10.10.2", "10.10.10.1", "10.10.10.2", "10.10.10.1"]
+    )
+
+    for _ in range(5):
+        await monitor.check(context)
+
+    assert monitor.current_ip == "10.10.10.1"
+    context.bot.send_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_checks_keep_state():
+    """Test that checks without consensus do not change the tracked IP."""
+    monitor, context = make_monitor(["10.10.10.1", None, "10.10.10.1"], debounce=1)
+
+    for _ in range(3):
+        await monitor.check(context)
+
+    assert monitor.current_ip == "10.10.10.1"
+    context.bot.send_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_recent_expires():
+    """Test that monitored results expire after two intervals."""
+    now = [1000.0]
+    orchestrator = AsyncMock()
+    orchestrator.fetch_all.return_value = make_result("10.10.10.1")
+    monitor = IpMonitor(orchestrator, owner_id=42, interval=60.0, clock=lambda: now[0])
+
+    assert monitor.get_recent() is None
+
+    await monitor.check(Mock())
+    assert monitor.get_recent().consensus_ip == "10.10.10.1"
+
+    now[0] += 121.0
+    assert monitor.get_recent() is None
+
+
+def test_schedule_registers_repeating_job():
+    """Test that the monitor registers itself with the job queue."""
+    monitor = IpMonitor(AsyncMock(), owner_id=42, interval=60.0)
+    job_queue = Mock()
+
+    monitor.schedule(job_queue)
+
+    job_queue.run_repeating.assert_called_once_with(
+        monitor.check, interval=60.0, first=0, name="ip_monitor"
+    )
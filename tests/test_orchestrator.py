@@ -1,26 +1,43 @@
 """Tests for the ParallelFetchOrchestrator."""
 
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import httpx
 import pytest
 
 from ipbot.fetchers.base import FetchStrategy
 from ipbot.fetchers.exceptions import FetcherHTTPError, FetcherParsingError
+from ipbot.fetchers.http_pool import HttpClientPool
+from ipbot.fetchers.ipinfo import IpinfoStrategy
+from ipbot.metrics import FetchMetrics
 from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.policy import FetchPolicy, PolicyMode
 
 
 class MockFetcher(FetchStrategy):
     """Mock fetcher for testing."""
 
-    def __init__(self, name: str, ip: str | None = None, exception: Exception | None = None):
+    def __init__(
+        self,
+        name: str,
+        ip: str | None = None,
+        exception: Exception | None = None,
+        delay: float = 0.0,
+    ):
         """Initialize mock fetcher.
 
         Args:
             name: Name of the fetcher.
             ip: IP address to return (if successful).
             exception: Exception to raise (if failing).
+            delay: Seconds to wait before answering.
         """
         self._name = name
         self._ip = ip
         self._exception = exception
+        self._delay = delay
+        self.calls = 0
 
     def get_name(self) -> str:
         """Return the fetcher name."""
@@ -28,6 +45,9 @@ class MockFetcher(FetchStrategy):
 
     async def get_ip(self) -> str:
         """Return IP or raise exception."""
+        self.calls += 1
+        if self._delay:
+            await asyncio.sleep(self._delay)
         if self._exception:
             raise self._exception
         if self._ip:
@@ -93,6 +113,21 @@ async def test_some_fetchers_fail_others_agree():
     assert result.results[3].fetcher_name == "fetcher4"
 
 
+@pytest.mark.asyncio
+async def test_http_timeout_counted_as_timeout():
+    """Test that a provider timing out in the HTTP client is reported as a timeout."""
+    pool = Mock(spec=HttpClientPool)
+    pool.client = AsyncMock()
+    pool.client.get.side_effect = httpx.ReadTimeout("timed out")
+    metrics = FetchMetrics()
+    orchestrator = ParallelFetchOrchestrator([IpinfoStrategy(http_pool=pool)], metrics=metrics)
+
+    result = await orchestrator.fetch_all()
+
+    assert result.results[0].error_type == "Timeout"
+    assert 'outcome="timeout"' in metrics.render()
+
+
 @pytest.mark.asyncio
 async def test_ip_conflicts():
     """Test when successful fetchers return different IPs."""
@@ -191,3 +226,183 @@ async def test_fetcher_names_preserved():
     assert result.results[1].fetcher_name == "identme"
     assert result.results[2].fetcher_name == "ifconfig"
     assert result.results[3].fetcher_name == "ipinfo"
+
+
+@pytest.mark.asyncio
+async def test_race_policy_returns_first_valid_answer():
+    """Test that race policy returns the first valid IP and cancels the rest."""
+    fetchers = [
+        MockFetcher("slow", ip="10.10.10.1", delay=5.0),
+        MockFetcher("failing", exception=FetcherHTTPError("Network error")),
+        MockFetcher("fast", ip="10.10.10.1", delay=0.01),
+    ]
+
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=FetchPolicy(mode=PolicyMode.RACE))
+    result = await asyncio.wait_for(orchestrator.fetch_all(), timeout=1.0)
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.has_conflicts is False
+    assert [r.fetcher_name for r in result.results] == ["slow", "failing", "fast"]
+
+    assert result.results[0].skipped is True
+    assert result.results[0].error_type == "Cancelled"
+    assert result.results[1].error_type == "Network error"
+    assert result.results[1].skipped is False
+    assert result.results[2].success is True
+
+
+@pytest.mark.asyncio
+async def test_quorum_policy_waits_for_agreement():
+    """Test that quorum policy returns once K fetchers agree."""
+    fetchers = [
+        MockFetcher("a", ip="10.10.10.1", delay=0.01),
+        MockFetcher("b", ip="180.3.3.5", delay=0.02),
+        MockFetcher("c", ip="10.10.10.1", delay=0.03),
+        MockFetcher("d", ip="10.10.10.1", delay=5.0),
+    ]
+
+    policy = FetchPolicy(mode=PolicyMode.QUORUM, quorum=2)
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=policy)
+    result = await asyncio.wait_for(orchestrator.fetch_all(), timeout=1.0)
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.has_conflicts is True
+    assert result.results[1].ip == "180.3.3.5"
+    assert result.results[3].skipped is True
+    assert result.results[3].error_type == "Cancelled"
+
+
+@pytest.mark.asyncio
+async def test_quorum_not_reached_uses_unanimous_rule():
+    """Test that an unreachable quorum falls back to requiring full agreement."""
+    fetchers = [
+        MockFetcher("a", ip="10.10.10.1"),
+        MockFetcher("b", exception=TimeoutError()),
+    ]
+
+    policy = FetchPolicy(mode=PolicyMode.QUORUM, quorum=2)
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=policy)
+    result = await orchestrator.fetch_all()
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.results[1].error_type == "Timeout"
+    assert all(not r.skipped for r in result.results)
+
+
+@pytest.mark.asyncio
+async def test_fallback_policy_stops_at_first_success():
+    """Test that fallback policy tries fetchers in order and skips the rest."""
+    fetchers = [
+        MockFetcher("first", exception=FetcherHTTPError("Network error")),
+        MockFetcher("second", ip="10.10.10.1"),
+        MockFetcher("third", ip="10.10.10.1"),
+    ]
+
+    policy = FetchPolicy(mode=PolicyMode.FALLBACK)
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=policy)
+    result = await orchestrator.fetch_all()
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.results[0].error_type == "Network error"
+    assert result.results[1].success is True
+    assert result.results[2].skipped is True
+    assert result.results[2].error_type == "Skipped"
+    assert fetchers[2].calls == 0
+
+
+@pytest.mark.asyncio
+async def test_fallback_policy_all_fail():
+    """Test that fallback policy reports every failure when nothing succeeds."""
+    fetchers = [
+        MockFetcher("first", exception=FetcherHTTPError("Network error")),
+        MockFetcher("second", exception=FetcherParsingError("Invalid format")),
+    ]
+
+    policy = FetchPolicy(mode=PolicyMode.FALLBACK)
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=policy)
+    result = await orchestrator.fetch_all()
+
+    assert result.consensus_ip is None
+    assert [r.error_type for r in result.results] == ["Network error", "Parsing error"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_partial_results():
+    """Test that fetchers still running at the deadline are cancelled."""
+    fetchers = [
+        MockFetcher("fast", ip="10.10.10.1", delay=0.01),
+        MockFetcher("slow", ip="10.10.10.1", delay=5.0),
+    ]
+
+    orchestrator = ParallelFetchOrchestrator(fetchers)
+    result = await asyncio.wait_for(orchestrator.fetch_all(deadline=0.1), timeout=1.0)
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.results[0].success is True
+    assert result.results[1].skipped is True
+    assert result.results[1].error_type == "Deadline exceeded"
+
+
+@pytest.mark.asyncio
+async def test_default_deadline_applies_to_quorum():
+    """Test that the orchestrator's deadline stops a quorum that cannot be reached in time."""
+    fetchers = [
+        MockFetcher("a", ip="10.10.10.1", delay=0.01),
+        MockFetcher("b", ip="10.10.10.1", delay=5.0),
+    ]
+
+    policy = FetchPolicy(mode=PolicyMode.QUORUM, quorum=2)
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=policy, deadline=0.1)
+    result = await asyncio.wait_for(orchestrator.fetch_all(), timeout=1.0)
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.results[1].error_type == "Deadline exceeded"
+
+
+@pytest.mark.asyncio
+async def test_deadline_stops_fallback():
+    """Test that fallback policy gives up on remaining fetchers at the deadline."""
+    fetchers = [
+        MockFetcher("slow", ip="10.10.10.1", delay=5.0),
+        MockFetcher("next", ip="10.10.10.1"),
+    ]
+
+    policy = FetchPolicy(mode=PolicyMode.FALLBACK)
+    orchestrator = ParallelFetchOrchestrator(fetchers, policy=policy)
+    result = await asyncio.wait_for(orchestrator.fetch_all(deadline=0.1), timeout=1.0)
+
+    assert result.consensus_ip is None
+    assert [r.error_type for r in result.results] == ["Deadline exceeded", "Deadline exceeded"]
+    assert fetchers[1].calls == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_iter_yields_results_as_they_complete():
+    """Test that fetch_iter yields fetcher results in completion order, then the result."""
+    fetchers = [
+        MockFetcher("slow", ip="10.10.10.1", delay=0.05),
+        MockFetcher("fast", ip="10.10.10.1"),
+        MockFetcher("broken", exception=FetcherHTTPError("Network error"), delay=0.02),
+    ]
+
+    orchestrator = ParallelFetchOrchestrator(fetchers)
+    items = [item async for item in orchestrator.fetch_iter()]
+
+    assert [item.fetcher_name for item in items[:-1]] == ["fast", "broken", "slow"]
+    assert items[-1].consensus_ip == "10.10.10.1"
+    assert [r.fetcher_name for r in items[-1].results] == ["slow", "fast", "broken"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_iter_close_cancels_fetch():
+    """Test that closing fetch_iter early cancels fetchers still running."""
+    slow = MockFetcher("slow", ip="10.10.10.1", delay=5.0)
+    orchestrator = ParallelFetchOrchestrator([MockFetcher("fast", ip="10.10.10.1"), slow])
+
+    stream = orchestrator.fetch_iter()
+    first = await anext(stream)
+    await stream.aclose()
+    await asyncio.sleep(0)
+
+    assert first.fetcher_name == "fast"
+    assert slow.calls == 1
@@ -0,0 +1,48 @@
+"""Tests for fetch policy parsing."""
+
+import pytest
+
+from ipbot.policy import FetchPolicy, PolicyMode
+
+
+class TestFetchPolicyParse:
+    """Tests for FetchPolicy.parse."""
+
+    @pytest.mark.parametrize(
+        ("value", "mode"),
+        [
+            ("all", PolicyMode.ALL),
+            ("race", PolicyMode.RACE),
+            ("fallback", PolicyMode.FALLBACK),
+            (" Race ", PolicyMode.RACE),
+        ],
+    )
+    def test_parse_simple_modes(self, value: str, mode: PolicyMode) -> None:
+        """Test parsing policies without arguments."""
+        assert FetchPolicy.parse(value).mode == mode
+
+    def test_parse_quorum(self) -> None:
+        """Test parsing quorum policy with agreement count."""
+        policy = FetchPolicy.parse("quorum:3")
+
+        assert policy.mode == PolicyMode.QUORUM
+        assert policy.quorum == 3
+        assert policy.required_agreement == 3
+
+    @pytest.mark.parametrize("value", ["quorum", "quorum:0", "quorum:x", "quorum:-1"])
+    def test_parse_invalid_quorum(self, value: str) -> None:
+        """Test that malformed quorum policies are rejected."""
+        with pytest.raises(ValueError, match="Invalid quorum policy"):
+            FetchPolicy.parse(value)
+
+    @pytest.mark.parametrize("value", ["fastest", "race:2", ""])
+    def test_parse_unknown_policy(self, value: str) -> None:
+        """Test that unknown policies list available options."""
+        with pytest.raises(ValueError, match="Available: all, race, quorum:K, fallback"):
+            FetchPolicy.parse(value)
+
+    def test_required_agreement(self) -> None:
+        """Test agreement thresholds for each mode."""
+        assert FetchPolicy().required_agreement is None
+        assert FetchPolicy(mode=PolicyMode.RACE).required_agreement == 1
+        assert FetchPolicy(mode=PolicyMode.FALLBACK).required_agreement is None
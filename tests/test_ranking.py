@@ -0,0 +1,194 @@
+"""Tests for adaptive provider ranking."""
+
+import asyncio
+
+import pytest
+
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.fetchers.exceptions import FetcherHTTPError
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.policy import FetchPolicy, PolicyMode
+from ipbot.ranking import ProviderScorer
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubFetcher(FetchStrategy):
+    """Fetcher returning a fixed IP or raising a fixed exception."""
+
+    def __init__(self, name: str, outcome: str | Exception, delay: float = 0.0):
+        self._name = name
+        self._outcome = outcome
+        self.delay = delay
+        self.calls = 0
+
+    def get_name(self) -> str:
+        return self._name
+
+    async def get_ip(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if isinstance(self._outcome, Exception):
+            raise self._outcome
+        return self._outcome
+
+
+def test_unobserved_providers_rank_first():
+    """Test that providers without data are tried before measured ones."""
+    scorer = ProviderScorer()
+    scorer.observe("measured", 0.1, success=True)
+
+    assert scorer.rank(["measured", "new"]) == ["new", "measured"]
+
+
+def test_slow_and_failing_providers_sink():
+    """Test that latency and error rate both lower a provider's rank."""
+    scorer = ProviderScorer(alpha=0.5)
+    scorer.observe("fast", 0.1, success=True)
+    scorer.observe("slow", 1.0, success=True)
+    scorer.observe("flaky", 0.1, success=True)
+    scorer.observe("flaky", 0.1, success=False)
+    scorer.observe("flaky", 0.1, success=False)
+
+    assert scorer.rank(["slow", "flaky", "fast"]) == ["fast", "flaky", "slow"]
+    assert scorer.score("flaky") == pytest.approx(0.1 / 0.25)
+
+
+def test_ewma_adapts_to_recent_latency():
+    """Test that recent observations move the score."""
+    scorer = ProviderScorer(alpha=0.5)
+    scorer.observe("a", 1.0, success=True)
+    scorer.observe("a", 0.2, success=True)
+
+    assert scorer.score("a") == pytest.approx(0.6)
+
+
+def test_cancelled_fetch_only_raises_latency():
+    """Test that a cancelled fetch counts as at least the time it ran, not as an error."""
+    scorer = ProviderScorer(alpha=0.5)
+    scorer.observe("a", 0.1, success=True)
+
+    scorer.observe_cancelled("a", 0.05)
+    assert scorer.score("a") == pytest.approx(0.1)
+
+    scorer.observe_cancelled("a", 1.1)
+    assert scorer.score("a") == pytest.approx(0.6)
+
+    scorer.observe_cancelled("new", 1.0)
+    assert scorer.score("new") == pytest.approx(1.0)
+
+
+def test_needs_probe_after_interval():
+    """Test that stale statistics are probed again."""
+    clock = FakeClock()
+    scorer = ProviderScorer(probe_interval=60.0, clock=clock)
+
+    assert scorer.needs_probe("a") is True
+    scorer.observe("a", 0.1, success=True)
+    assert scorer.needs_probe("a") is False
+
+    clock.now += 60.0
+    assert scorer.needs_probe("a") is True
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_queries_only_top_n():
+    """Test that only the best providers are queried once they are measured."""
+    clock = FakeClock()
+    scorer = ProviderScorer(probe_interval=600.0, clock=clock)
+    fetchers = [
+        StubFetcher("down", FetcherHTTPError("Network error")),
+        StubFetcher("good", "10.10.10.1"),
+        StubFetcher("also-good", "10.10.10.1"),
+    ]
+    scorer.observe("down", 3.0, success=False)
+    scorer.observe("good", 0.1, success=True)
+    scorer.observe("also-good", 0.2, success=True)
+
+    orchestrator = ParallelFetchOrchestrator(fetchers, ranking=scorer, top_n=2)
+    result = await orchestrator.fetch_all()
+
+    assert fetchers[0].calls == 0
+    assert result.consensus_ip == "10.10.10.1"
+    assert [r.fetcher_name for r in result.results] == ["down", "good", "also-good"]
+    assert result.results[0].skipped is True
+    assert result.results[0].error_type == "Skipped (low rank)"
+
+    # Once its statistics are stale, the dropped provider is probed again
+    clock.now += 600.0
+    await orchestrator.fetch_all()
+    assert fetchers[0].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_walks_ranked_order():
+    """Test that the fallback policy tries the best ranked provider first."""
+    scorer = ProviderScorer()
+    fetchers = [StubFetcher("slow", "10.10.10.1"), StubFetcher("fast", "10.10.10.1")]
+    scorer.observe("slow", 2.0, success=True)
+    scorer.observe("fast", 0.1, success=True)
+
+    orchestrator = ParallelFetchOrchestrator(
+        fetchers, policy=FetchPolicy(mode=PolicyMode.FALLBACK), ranking=scorer
+    )
+    result = await orchestrator.fetch_all()
+
+    assert fetchers[1].calls == 1
+    assert fetchers[0].calls == 0
+    assert result.results[0].error_type == "Skipped"
+
+
+@pytest.mark.asyncio
+async def test_degraded_provider_leaves_top_n():
+    """Test that a provider that became slow is replaced instead of timing out forever."""
+    scorer = ProviderScorer(probe_interval=600.0)
+    fetchers = [
+        StubFetcher(name, "10.10.10.1", delay=delay)
+        for name, delay in (("a", 0.01), ("b", 0.02), ("c", 0.03))
+    ]
+    orchestrator = ParallelFetchOrchestrator(
+        fetchers,
+        policy=FetchPolicy(mode=PolicyMode.RACE),
+        ranking=scorer,
+        top_n=1,
+        deadline=0.1,
+    )
+    for fetcher in fetchers:
+        scorer.observe(fetcher.get_name(), fetcher.delay, success=True)
+    best = fetchers[0]
+
+    best.delay = 1.0
+    results = [await orchestrator.fetch_all() for _ in range(5)]
+
+    assert results[0].results[0].error_type == "Deadline exceeded"
+    assert [result.consensus_ip for result in results[1:]] == ["10.10.10.1"] * 4
+    assert best.calls == 1
+    others = [fetcher.get_name() for fetcher in fetchers if fetcher is not best]
+    assert scorer.score(best.get_name()) > max(scorer.score(name) for name in others)
+
+
+@pytest.mark.asyncio
+async def test_race_losers_are_observed():
+    """Test that fetches losing a race still report how long they ran."""
+    scorer = ProviderScorer(alpha=1.0)
+    scorer.observe("slow", 0.001, success=True)
+    scorer.observe("fast", 0.001, success=True)
+    fetchers = [
+        StubFetcher("slow", "10.10.10.1", delay=1.0),
+        StubFetcher("fast", "10.10.10.1", delay=0.05),
+    ]
+    orchestrator = ParallelFetchOrchestrator(
+        fetchers, policy=FetchPolicy(mode=PolicyMode.RACE), ranking=scorer
+    )
+
+    await orchestrator.fetch_all()
+
+    assert scorer.score("slow") >= 0.04
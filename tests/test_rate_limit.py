@@ -0,0 +1,234 @@
+"""Tests for per-provider rate limiting and outbound concurrency limits."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.fetchers.exceptions import FetcherHTTPError, FetcherRateLimitedError
+from ipbot.fetchers.http_fetcher import HttpFetcher, parse_retry_after
+from ipbot.fetchers.http_pool import HttpClientPool
+from ipbot.fetchers.ipinfo import IpinfoStrategy
+from ipbot.metrics import FetchMetrics
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.ranking import ProviderScorer
+from ipbot.rate_limit import RateLimiter
+from ipbot.retry import RetryPolicy
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class InFlight:
+    """Counts fetches running at once across fetchers."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+
+class StubFetcher(FetchStrategy):
+    """Fetcher returning a fixed IP or raising a fixed exception."""
+
+    def __init__(
+        self,
+        name: str,
+        outcome: str | Exception,
+        delay: float = 0.0,
+        in_flight: InFlight | None = None,
+    ):
+        self._name = name
+        self.outcome = outcome
+        self.delay = delay
+        self.in_flight = in_flight or InFlight()
+        self.calls = 0
+
+    def get_name(self) -> str:
+        return self._name
+
+    async def get_ip(self) -> str:
+        self.calls += 1
+        self.in_flight.current += 1
+        self.in_flight.peak = max(self.in_flight.peak, self.in_flight.current)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight.current -= 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def test_bucket_allows_burst_then_refills():
+    """Test that a provider gets `burst` fetches at once and more as tokens refill."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock)
+
+    assert limiter.try_acquire("a") is True
+    assert limiter.try_acquire("a") is True
+    assert limiter.try_acquire("a") is False
+    assert limiter.try_acquire("b") is True
+
+    clock.now += 0.5
+    assert limiter.try_acquire("a") is True
+    assert limiter.try_acquire("a") is False
+
+
+def test_throttle_honors_retry_after():
+    """Test that a throttled provider is refused until Retry-After has passed."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=0, default_backoff=60.0, clock=clock)
+
+    limiter.throttle("a", 10.0)
+    assert limiter.is_throttled("a") is True
+    clock.now += 10.0
+    assert limiter.try_acquire("a") is True
+
+    limiter.throttle("a", None)
+    clock.now += 59.0
+    assert limiter.try_acquire("a") is False
+    clock.now += 1.0
+    assert limiter.try_acquire("a") is True
+
+
+def test_delay_until_next_token():
+    """Test that the delay covers both an empty bucket and Retry-After."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=1, clock=clock)
+
+    assert limiter.delay("a") == 0.0
+    limiter.try_acquire("a")
+    assert limiter.delay("a") == pytest.approx(0.5)
+
+    limiter.throttle("a", 3.0)
+    assert limiter.delay("a") == pytest.approx(3.0)
+
+
+def test_parse_retry_after():
+    """Test parsing of delay-seconds and HTTP-date Retry-After values."""
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_http_fetcher_raises_rate_limited_on_429():
+    """Test that a 429 answer is reported with the provider's Retry-After delay."""
+    request = httpx.Request("GET", "https://ipinfo.io/ip")
+    response = httpx.Response(429, headers={"Retry-After": "30"}, request=request)
+    pool = Mock(spec=HttpClientPool)
+    pool.client = AsyncMock()
+    pool.client.get.return_value = response
+
+    with pytest.raises(FetcherRateLimitedError) as exc_info:
+        await HttpFetcher(pool=pool).fetch("https://ipinfo.io/ip", "ipinfo.io")
+
+    assert exc_info.value.retry_after == 30.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_provider_is_skipped():
+    """Test that a provider answering 429 is paused and skipped without a request."""
+    limiter = RateLimiter(rate=0, clock=FakeClock())
+    metrics = FetchMetrics()
+    limited = StubFetcher("limited", FetcherRateLimitedError("429", retry_after=30.0))
+    healthy = StubFetcher("healthy", "203.0.113.1")
+    orchestrator = ParallelFetchOrchestrator(
+        [limited, healthy], metrics=metrics, rate_limiter=limiter
+    )
+
+    first = await orchestrator.fetch_all()
+    assert first.results[0].error_type == "Rate limited"
+    assert first.results[0].skipped is False
+
+    second = await orchestrator.fetch_all()
+    assert second.results[0].error_type == "Skipped (rate limited)"
+    assert second.results[0].skipped is True
+    assert second.consensus_ip == "203.0.113.1"
+    assert limited.calls == 1
+    assert 'outcome="rate_limited"' in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_throttled_provider_ranked_last():
+    """Test that ranking leaves throttled providers out of the top N."""
+    limiter = RateLimiter(rate=0, clock=FakeClock())
+    limiter.throttle("fast", 30.0)
+    fast = StubFetcher("fast", "203.0.113.1")
+    slow = StubFetcher("slow", "203.0.113.1")
+    ranking = ProviderScorer()
+    ranking.observe("fast", 0.01, success=True)
+    ranking.observe("slow", 0.5, success=True)
+    orchestrator = ParallelFetchOrchestrator(
+        [fast, slow], ranking=ranking, top_n=1, rate_limiter=limiter
+    )
+
+    result = await orchestrator.fetch_all()
+
+    assert result.consensus_ip == "203.0.113.1"
+    assert fast.calls == 0
+    assert slow.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_caps_outbound_fetches():
+    """Test that no more than `max_concurrency` fetches are in flight at once."""
+    in_flight = InFlight()
+    fetchers = [
+        StubFetcher(f"fetcher{i}", "203.0.113.1", delay=0.02, in_flight=in_flight) for i in range(4)
+    ]
+    orchestrator = ParallelFetchOrchestrator(fetchers, max_concurrency=2)
+
+    result = await orchestrator.fetch_all()
+
+    assert result.consensus_ip == "203.0.113.1"
+    assert all(fetcher.calls == 1 for fetcher in fetchers)
+    assert in_flight.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_take_tokens():
+    """Test that every retry is charged to the provider and stops once it is throttled."""
+    error = FetcherHTTPError("Connection reset")
+    error.__cause__ = httpx.ConnectError("Connection reset")
+    limiter = RateLimiter(rate=0.001, burst=2, clock=FakeClock())
+    flaky = StubFetcher("flaky", error)
+    orchestrator = ParallelFetchOrchestrator(
+        [flaky],
+        retry=RetryPolicy(max_retries=5, base_delay=0.0, max_delay=0.0),
+        rate_limiter=limiter,
+    )
+
+    result = await orchestrator.fetch_all()
+
+    assert flaky.calls == 2
+    assert result.results[0].error_type == "Skipped (rate limited)"
+    assert limiter.is_throttled("flaky") is True
+
+
+def test_warming_is_rate_limited():
+    """Test that warming requests take tokens and a 429 answer throttles the provider."""
+    limiter = RateLimiter(rate=0.001, burst=2, clock=FakeClock())
+    fetcher = IpinfoStrategy()
+    orchestrator = ParallelFetchOrchestrator([fetcher], rate_limiter=limiter)
+    url = fetcher.get_url()
+
+    assert [orchestrator.admit_warm(url) for _ in range(3)] == [True, True, False]
+
+    limiter = RateLimiter(rate=0, clock=FakeClock())
+    orchestrator = ParallelFetchOrchestrator([fetcher], rate_limiter=limiter)
+    orchestrator.observe_warm(url, httpx.Response(200))
+    assert limiter.is_throttled("ipinfo.io") is False
+    orchestrator.observe_warm(url, httpx.Response(429, headers={"Retry-After": "30"}))
+    assert limiter.is_throttled("ipinfo.io") is True
+    assert orchestrator.admit_warm(url) is False
@@ -0,0 +1,134 @@
+"""Tests for bounded retries with jittered backoff."""
+
+import httpx
+import pytest
+
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.fetchers.exceptions import FetcherHTTPError, FetcherParsingError
+from ipbot.metrics import FetchMetrics
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.retry import RetryPolicy, retry_call
+
+
+def http_error(cause: Exception) -> FetcherHTTPError:
+    """Build a FetcherHTTPError caused by an httpx error, as HttpFetcher raises it."""
+    try:
+        raise FetcherHTTPError("Failed to fetch IP") from cause
+    except FetcherHTTPError as e:
+        return e
+
+
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    """Build an httpx error for an HTTP response status."""
+    request = httpx.Request("GET", "https://provider.test/")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("Server error", request=request, response=response)
+
+
+class FlakyFetcher(FetchStrategy):
+    """Fetcher raising the given errors before answering."""
+
+    def __init__(self, name: str, errors: list[Exception]):
+        self._name = name
+        self._errors = errors
+        self.calls = 0
+
+    def get_name(self) -> str:
+        return self._name
+
+    async def get_ip(self) -> str:
+        self.calls += 1
+        if self._errors:
+            raise self._errors.pop(0)
+        return "10.10.10.1"
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (http_error(httpx.ConnectError("Connection reset")), True),
+        (http_error(httpx.RemoteProtocolError("Server disconnected")), True),
+        (http_error(status_error(503)), True),
+        (http_error(status_error(404)), False),
+        (http_error(httpx.ReadTimeout("Timed out")), False),
+        (FetcherParsingError("Invalid format"), False),
+        (TimeoutError(), False),
+    ],
+)
+def test_is_retryable(error, expected):
+    """Test that only transient network failures are retried."""
+    assert RetryPolicy().is_retryable(error) is expected
+
+
+def test_backoff_is_jittered_and_bounded():
+    """Test that backoff delays stay below the exponential ceiling."""
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+
+    assert all(0 <= policy.backoff(0) <= 0.1 for _ in range(100))
+    assert all(0 <= policy.backoff(5) <= 0.3 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_no_retry_without_time_left():
+    """Test that a retry is not started when the request budget is used up."""
+    fetcher = FlakyFetcher("a", [http_error(httpx.ConnectError("Connection reset"))])
+    retries = []
+
+    with pytest.raises(FetcherHTTPError):
+        await retry_call(
+            fetcher.get_ip, RetryPolicy(), time_left=lambda: 0.0, on_retry=lambda: retries.append(1)
+        )
+
+    assert fetcher.calls == 1
+    assert retries == []
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_records_retries():
+    """Test that a transient failure is retried and counted on the result."""
+    fetchers = [
+        FlakyFetcher("flaky", [http_error(httpx.ConnectError("Connection reset"))]),
+        FlakyFetcher("broken", [http_error(status_error(404))]),
+    ]
+    policy = RetryPolicy(max_retries=2, base_delay=0.001)
+
+    orchestrator = ParallelFetchOrchestrator(fetchers, retry=policy)
+    result = await orchestrator.fetch_all()
+
+    assert result.results[0].success is True
+    assert result.results[0].retries == 1
+    assert result.results[1].error_type == "Network error"
+    assert result.results[1].retries == 0
+    assert fetchers[1].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_bounded_by_max_retries():
+    """Test that a provider failing every attempt is retried at most max_retries times."""
+    errors: list[Exception] = [http_error(httpx.ConnectError("Connection reset")) for _ in range(5)]
+    fetcher = FlakyFetcher("down", errors)
+
+    orchestrator = ParallelFetchOrchestrator(
+        [fetcher], retry=RetryPolicy(max_retries=2, base_delay=0.001)
+    )
+    result = await orchestrator.fetch_all()
+
+    assert result.results[0].success is False
+    assert result.results[0].retries == 2
+    assert fetcher.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_is_not_latency():
+    """Test that latency samples cover the last attempt only, and retries are counted apart."""
+    fetcher = FlakyFetcher("flaky", [http_error(httpx.ConnectError("Connection reset"))])
+    metrics = FetchMetrics()
+
+    orchestrator = ParallelFetchOrchestrator(
+        [fetcher], retry=RetryPolicy(max_retries=1, base_delay=0.2), metrics=metrics
+    )
+    await orchestrator.fetch_all()
+
+    assert orchestrator.latency.percentile("flaky", 0.5) < 0.05
+    assert metrics.latency.percentile("flaky", 0.5) < 0.05
+    assert 'ipbot_fetch_retries_total{provider="flaky"} 1' in metrics.render()
@@ -0,0 +1,147 @@
+"""Tests for the prioritized outbound message queue."""
+
+import asyncio
+import datetime
+import warnings
+
+import pytest
+from telegram.error import Forbidden, RetryAfter
+
+from ipbot.send_queue import BULK, INTERACTIVE, SendQueue
+
+
+class Recorder:
+    """Records the messages sent, in order."""
+
+    def __init__(self):
+        self.sent: list[str] = []
+
+    def call(self, text: str):
+        async def send() -> str:
+            self.sent.append(text)
+            return text
+
+        return send
+
+
+@pytest.mark.asyncio
+async def test_interactive_sends_jump_ahead_of_bulk():
+    """Test that an interactive reply goes before bulk notifications queued earlier."""
+    queue = SendQueue(rate=100.0, burst=1)
+    recorder = Recorder()
+
+    for chat_id in (1, 2, 3):
+        queue.submit(chat_id, recorder.call(f"bulk {chat_id}"), BULK)
+    reply = queue.submit(4, recorder.call("reply"), INTERACTIVE)
+    await queue.start()
+
+    assert await reply == "reply"
+    await queue.close()
+    assert recorder.sent == ["reply", "bulk 1", "bulk 2", "bulk 3"]
+
+
+@pytest.mark.asyncio
+async def test_busy_chat_does_not_hold_up_other_chats():
+    """Test that a chat out of tokens waits while other chats are sent to."""
+    queue = SendQueue(chat_rate=20.0, chat_burst=1)
+    recorder = Recorder()
+
+    for text in ("1a", "1b", "1c"):
+        queue.submit(1, recorder.call(text))
+    queue.submit(2, recorder.call("2a"))
+    await queue.start()
+    await queue.close()
+
+    assert recorder.sent == ["1a", "2a", "1b", "1c"]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_chat_and_retries():
+    """Test that a 429 pauses the chat for retry_after and the send is retried."""
+    queue = SendQueue()
+    attempts = []
+    # PTB's own constructor reads retry_after, so build the error up front.
+    flood = RetryAfter(datetime.timedelta(seconds=0.1))
+
+    async def flooded() -> str:
+        attempts.append(asyncio.get_running_loop().time())
+        if len(attempts) == 1:
+            raise flood
+        return "sent"
+
+    await queue.start()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert await queue.send(1, flooded) == "sent"
+    await queue.close()
+
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_send_fails_after_max_retries():
+    """Test that the caller gets the error once retries are exhausted or it is not a 429."""
+    queue = SendQueue(max_retries=1)
+
+    async def flooded():
+        raise RetryAfter(datetime.timedelta(seconds=0.01))
+
+    async def blocked():
+        raise Forbidden("bot was blocked by the user")
+
+    await queue.start()
+    with pytest.raises(RetryAfter):
+        await queue.send(1, flooded)
+    with pytest.raises(Forbidden):
+        await queue.send(2, blocked)
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_keyed_send_replaces_queued_one():
+    """Test that only the latest of several queued edits of a message is sent."""
+    queue = SendQueue(chat_rate=20.0, chat_burst=1)
+    recorder = Recorder()
+    await queue.start()
+
+    await queue.send(1, recorder.call("reply"))
+    first = queue.submit(1, recorder.call("edit 1"), key="message")
+    second = queue.submit(1, recorder.call("edit 2"), key="message")
+
+    assert first is second
+    assert await second == "edit 2"
+    await queue.close()
+    assert recorder.sent == ["reply", "edit 2"]
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_queued_sends():
+    """Test that close waits for queued sends and then refuses new ones."""
+    queue = SendQueue(rate=100.0, burst=1)
+    recorder = Recorder()
+    await queue.start()
+
+    for chat_id in range(5):
+        queue.submit(chat_id, recorder.call(f"alert {chat_id}"))
+    await queue.close(timeout=1.0)
+
+    assert len(recorder.sent) == 5
+    with pytest.raises(RuntimeError, match="closed"):
+        queue.submit(1, recorder.call("late"))
+
+
+@pytest.mark.asyncio
+async def test_close_fails_sends_left_after_timeout():
+    """Test that sends not flushed in time fail instead of hanging."""
+    queue = SendQueue(chat_rate=1.0, chat_burst=1)
+    recorder = Recorder()
+    await queue.start()
+
+    queue.submit(1, recorder.call("first"))
+    late = queue.submit(1, recorder.call("second"))
+    await queue.close(timeout=0.05)
+
+    assert recorder.sent == ["first"]
+    with pytest.raises(RuntimeError, match="closed"):
+        await late
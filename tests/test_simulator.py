@@ -0,0 +1,84 @@
+"""Tests for the local provider simulator."""
+
+import asyncio
+
+import pytest
+
+from ipbot.config import BotConfig
+from ipbot.factory import create_fetchers
+from ipbot.fetchers.exceptions import FetcherHTTPError, FetcherRateLimitedError
+from ipbot.fetchers.http_pool import HttpClientPool
+from ipbot.fetchers.ipify import IpifyStrategy
+from ipbot.testing.simulator import EndpointProfile, ProviderSimulator, constant
+
+
+@pytest.mark.asyncio
+async def test_all_strategies_answer_from_simulator():
+    """Test that every strategy parses the simulated answer of its provider."""
+    pool = HttpClientPool()
+    async with ProviderSimulator(ip="203.0.113.7") as simulator:
+        config = BotConfig(
+            telegram_token="test", telegram_owner_id=123, provider_urls=simulator.urls()
+        )
+        await pool.start()
+        try:
+            fetchers = create_fetchers(config, pool)
+            ips = await asyncio.gather(*(fetcher.get_ip() for fetcher in fetchers))
+        finally:
+            await pool.close()
+
+    assert ips == ["203.0.113.7"] * len(fetchers)
+    assert sum(simulator.requests.values()) == len(fetchers)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_answers_carry_retry_after():
+    """Test that a simulated 429 surfaces as a rate-limit error with Retry-After."""
+    profiles = {"ipify": EndpointProfile(rate_limit_rate=1.0, retry_after=12)}
+    async with ProviderSimulator(profiles=profiles) as simulator:
+        strategy = IpifyStrategy(url=simulator.url("ipify"))
+        with pytest.raises(FetcherRateLimitedError) as exc_info:
+            await strategy.get_ip()
+
+    assert exc_info.value.retry_after == 12.0
+
+
+@pytest.mark.asyncio
+async def test_errors_and_wrong_ips():
+    """Test that error and wrong-IP rates change the simulated answers."""
+    async with ProviderSimulator(ip="203.0.113.7") as simulator:
+        strategy = IpifyStrategy(url=simulator.url("ipify"))
+
+        simulator.profiles["ipify"] = EndpointProfile(wrong_ip_rate=1.0, wrong_ip="198.51.100.1")
+        assert await strategy.get_ip() == "198.51.100.1"
+
+        simulator.profiles["ipify"] = EndpointProfile(error_rate=1.0)
+        with pytest.raises(FetcherHTTPError):
+            await strategy.get_ip()
+
+
+@pytest.mark.asyncio
+async def test_latency_and_slow_body_delay_answers():
+    """Test that latency and body delay both slow down the answer."""
+    profiles = {"ipify": EndpointProfile(latency=constant(0.05), body_delay=0.05)}
+    async with ProviderSimulator(profiles=profiles) as simulator:
+        strategy = IpifyStrategy(url=simulator.url("ipify"))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await strategy.get_ip()
+
+    assert loop.time() - started >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_close_with_idle_keepalive_connections():
+    """Test that closing the simulator does not wait for idle pooled connections."""
+    pool = HttpClientPool()
+    simulator = ProviderSimulator()
+    await simulator.start()
+    await pool.start()
+    try:
+        await IpifyStrategy(http_pool=pool, url=simulator.url("ipify")).get_ip()
+        await asyncio.wait_for(simulator.close(), timeout=1.0)
+    finally:
+        await pool.close()
@@ -0,0 +1,125 @@
+"""Tests for adaptive per-provider timeouts."""
+
+import asyncio
+
+import pytest
+
+from ipbot.fetchers.base import FetchStrategy
+from ipbot.fetchers.custom import CustomStrategy
+from ipbot.latency import LatencyTracker
+from ipbot.orchestrator import ParallelFetchOrchestrator
+from ipbot.timeouts import TimeoutPolicy
+
+
+class StubFetcher(FetchStrategy):
+    """Fetcher answering with a fixed IP after a delay."""
+
+    def __init__(self, name: str, ip: str, delay: float = 0.0):
+        self._name = name
+        self._ip = ip
+        self._delay = delay
+        self.timeouts: list[float | None] = []
+
+    def get_name(self) -> str:
+        return self._name
+
+    async def get_ip(self, timeout: float | None = None) -> str:
+        self.timeouts.append(timeout)
+        await asyncio.sleep(self._delay)
+        return self._ip
+
+
+def make_tracker(name: str, samples: list[float]) -> LatencyTracker:
+    """Create a tracker holding the given latency samples."""
+    tracker = LatencyTracker()
+    for seconds in samples:
+        tracker.record(name, seconds)
+    return tracker
+
+
+def test_timeout_scales_with_observed_latency():
+    """Test that the timeout is the latency percentile times the factor."""
+    policy = TimeoutPolicy(percentile=0.99, factor=2.0, floor=0.1, ceiling=3.0, min_samples=3)
+    tracker = make_tracker("a", [0.1, 0.2, 0.3])
+
+    assert policy.timeout_for("a", tracker) == pytest.approx(0.6)
+
+
+def test_timeout_clamped_to_floor_and_ceiling():
+    """Test that derived timeouts stay between the floor and the ceiling."""
+    policy = TimeoutPolicy(factor=2.0, floor=0.25, ceiling=1.0, min_samples=1)
+
+    assert policy.timeout_for("fast", make_tracker("fast", [0.01])) == 0.25
+    assert policy.timeout_for("slow", make_tracker("slow", [2.0])) == 1.0
+
+
+def test_no_timeout_without_enough_samples():
+    """Test that providers are not cut short before enough samples exist."""
+    policy = TimeoutPolicy(min_samples=20)
+
+    assert policy.timeout_for("a", make_tracker("a", [0.1] * 19)) is None
+
+
+def test_override_takes_precedence():
+    """Test that configured overrides replace the derived timeout."""
+    policy = TimeoutPolicy(adaptive=False, overrides={"a": 1.5})
+
+    assert policy.timeout_for("a", LatencyTracker()) == 1.5
+    assert policy.timeout_for("b", make_tracker("b", [0.1] * 50)) is None
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_times_out_slow_provider():
+    """Test that a provider slower than its timeout is reported as a timeout."""
+    fetchers = [StubFetcher("fast", "10.10.10.1"), StubFetcher("slow", "10.10.10.1", delay=5.0)]
+    policy = TimeoutPolicy(adaptive=False, overrides={"slow": 0.05})
+
+    orchestrator = ParallelFetchOrchestrator(fetchers, timeouts=policy)
+    result = await asyncio.wait_for(orchestrator.fetch_all(), timeout=1.0)
+
+    assert result.consensus_ip == "10.10.10.1"
+    assert result.results[1].success is False
+    assert result.results[1].error_type == "Timeout"
+
+
+@pytest.mark.asyncio
+async def test_timeout_passed_to_strategy():
+    """Test that the strategy is given the provider's timeout, or none without one."""
+    fetchers = [StubFetcher("a", "10.10.10.1"), StubFetcher("b", "10.10.10.1")]
+    policy = TimeoutPolicy(adaptive=False, overrides={"a": 6.0})
+
+    orchestrator = ParallelFetchOrchestrator(fetchers, timeouts=policy)
+    await orchestrator.fetch_all()
+
+    assert fetchers[0].timeouts == [6.0]
+    assert fetchers[1].timeouts == [None]
+
+
+@pytest.mark.asyncio
+async def test_override_above_default_http_timeout():
+    """Test that an override longer than the strategy's 3 s lets a slow endpoint answer."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while (await reader.readline()).strip():
+            pass
+        await asyncio.sleep(0.3)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\nConnection: close\r\n\r\n")
+        writer.write(b"203.0.113.42")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    strategy = CustomStrategy(url=f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/")
+    # Scaled down: the default HTTP timeout stands in for 3 s, the endpoint takes longer
+    strategy.TIMEOUT = 0.1
+    policy = TimeoutPolicy(adaptive=False, overrides={strategy.get_name(): 1.0})
+
+    try:
+        result = await ParallelFetchOrchestrator([strategy], timeouts=policy).fetch_all()
+        assert result.consensus_ip == "203.0.113.42"
+
+        result = await ParallelFetchOrchestrator([strategy]).fetch_all()
+        assert result.results[0].error_type == "Timeout"
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,99 @@
+"""Tests for TLS session resumption in the shared HTTP pool."""
+
+import asyncio
+import datetime
+import ssl
+from pathlib import Path
+
+import pytest
+
+from ipbot.fetchers.http_pool import HttpClientPool
+from ipbot.fetchers.tls_sessions import TlsSessionCache
+from ipbot.metrics import FetchMetrics
+
+
+def write_self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    """Write a self-signed certificate for localhost and return (cert, key) paths."""
+    x509 = pytest.importorskip("cryptography.x509")
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.UTC)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(key.public_key()), critical=False)
+        .add_extension(
+            x509.AuthorityKeyIdentifier.from_issuer_public_key(key.public_key()), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = directory / "cert.pem"
+    key_path = directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return cert_path, key_path
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_session(tmp_path):
+    """Test that a new connection to the same host resumes the TLS session."""
+    cert_path, key_path = write_self_signed_cert(tmp_path)
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert_path, key_path)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while (await reader.readline()).strip():
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\nConnection: close\r\n\r\n")
+        writer.write(b"203.0.113.42")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=server_context)
+    url = f"https://localhost:{server.sockets[0].getsockname()[1]}/"
+    tls_sessions = TlsSessionCache(cafile=str(cert_path))
+    pool = HttpClientPool(max_keepalive_connections=0, tls_sessions=tls_sessions)
+
+    try:
+        await pool.start()
+        assert pool.client is not None
+        for _ in range(3):
+            response = await pool.client.get(url)
+            assert response.text == "203.0.113.42"
+    finally:
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+
+    assert tls_sessions.full_handshakes == 1
+    assert tls_sessions.resumed_handshakes == 2
+
+
+def test_handshake_counters_rendered():
+    """Test that handshake counters are exported with the fetch metrics."""
+    tls_sessions = TlsSessionCache()
+    tls_sessions.full_handshakes = 1
+    tls_sessions.resumed_handshakes = 4
+
+    output = FetchMetrics(tls_sessions=tls_sessions).render()
+
+    assert 'ipbot_tls_handshakes_total{type="full"} 1' in output
+    assert 'ipbot_tls_handshakes_total{type="resumed"} 4' in output
@@ -0,0 +1,112 @@
+"""Tests for concurrent, per-chat ordered update processing."""
+
+import asyncio
+import datetime
+
+import pytest
+from telegram import Chat, Message, Update
+
+from ipbot.update_processor import ChatOrderedUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    """Return a message update from the given chat."""
+    chat = Chat(id=chat_id, type=Chat.PRIVATE)
+    message = Message(message_id=update_id, date=datetime.datetime.now(datetime.UTC), chat=chat)
+    return Update(update_id=update_id, message=message)
+
+
+class Handler:
+    """Records the order in which updates start and finish; they finish when released."""
+
+    def __init__(self):
+        self.events: list[str] = []
+        self.release: dict[int, asyncio.Event] = {}
+
+    async def handle(self, update_id: int) -> None:
+        self.events.append(f"start {update_id}")
+        await self.release.setdefault(update_id, asyncio.Event()).wait()
+        self.events.append(f"end {update_id}")
+
+    def finish(self, update_id: int) -> None:
+        self.release.setdefault(update_id, asyncio.Event()).set()
+
+
+async def process(processor: ChatOrderedUpdateProcessor, handler: Handler, update) -> None:
+    await processor.process_update(update, handler.handle(update.update_id))
+
+
+@pytest.mark.asyncio
+async def test_same_chat_in_order_without_blocking_other_chats():
+    """Test that a waiting update of a busy chat does not hold up other chats."""
+    processor = ChatOrderedUpdateProcessor(2)
+    handler = Handler()
+
+    tasks = [
+        asyncio.create_task(process(processor, handler, make_update(1, chat_id=10))),
+        asyncio.create_task(process(processor, handler, make_update(2, chat_id=10))),
+        asyncio.create_task(process(processor, handler, make_update(3, chat_id=20))),
+    ]
+    await asyncio.sleep(0)
+    assert handler.events == ["start 1", "start 3"]
+
+    handler.finish(3)
+    handler.finish(2)
+    await asyncio.sleep(0)
+    assert handler.events == ["start 1", "start 3", "end 3"]
+
+    handler.finish(1)
+    await asyncio.gather(*tasks)
+    assert handler.events == ["start 1", "start 3", "end 3", "end 1", "start 2", "end 2"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    """Test that no more than max_concurrent_updates chats are processed at once."""
+    processor = ChatOrderedUpdateProcessor(2)
+    handler = Handler()
+
+    tasks = [
+        asyncio.create_task(process(processor, handler, make_update(i, chat_id=i)))
+        for i in range(1, 4)
+    ]
+    await asyncio.sleep(0)
+    assert handler.events == ["start 1", "start 2"]
+
+    for i in range(1, 4):
+        handler.finish(i)
+    await asyncio.gather(*tasks)
+    assert "start 3" in handler.events
+
+
+@pytest.mark.asyncio
+async def test_failed_update_does_not_stop_chat_queue():
+    """Test that updates queued behind a failing one are still processed."""
+    processor = ChatOrderedUpdateProcessor(1)
+    processed = []
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def succeed():
+        processed.append(2)
+
+    first = asyncio.create_task(processor.process_update(make_update(1, 10), fail()))
+    second = asyncio.create_task(processor.process_update(make_update(2, 10), succeed()))
+    await asyncio.gather(first, second)
+
+    assert processed == [2]
+
+
+@pytest.mark.asyncio
+async def test_updates_without_chat_are_processed_directly():
+    """Test that non-chat updates are processed without per-chat ordering."""
+    processor = ChatOrderedUpdateProcessor(1)
+    processed = []
+
+    async def handle():
+        processed.append("custom")
+
+    await processor.process_update(object(), handle())
+
+    assert processed == ["custom"]